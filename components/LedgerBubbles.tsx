@@ -2,7 +2,7 @@
 
 import { useEffect, useState, useMemo } from 'react'
 import { useLedgerStore } from '../store/ledgerStore'
-import { getDataFile } from '../utils/dataPath'
+import { fetchDataFile } from '../utils/dataPath'
 import type { VendorYearlyPayments } from '@/types'
 
 interface Bubble {
@@ -30,7 +30,7 @@ export default function LedgerBubbles({ year, width, height }: LedgerBubblesProp
   useEffect(() => {
     let cancelled = false
     
-    fetch(getDataFile('vendors_master.json'))
+    fetchDataFile('vendors_master.json')
       .then(r => {
         if (!r.ok) {
           throw new Error(`HTTP ${r.status}`)
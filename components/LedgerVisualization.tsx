@@ -2,7 +2,7 @@
 
 import { useEffect, useRef, useState, useCallback } from 'react'
 import { useLedgerStore } from '../store/ledgerStore'
-import { getDataFile } from '../utils/dataPath'
+import { fetchDataFile } from '../utils/dataPath'
 import * as d3 from 'd3'
 import type { VendorYearlyPayments, SystemComposition } from '../types'
 
@@ -38,8 +38,8 @@ export default function LedgerVisualization() {
     const loadData = async () => {
       try {
         const [compositionRes, vendorsRes] = await Promise.all([
-          fetch(getDataFile('system_composition.json')).catch(() => null),
-          fetch(getDataFile('vendors_master.json')).catch(() => null),
+          fetchDataFile('system_composition.json').catch(() => null),
+          fetchDataFile('vendors_master.json').catch(() => null),
         ])
         
         let composition = null
@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from 'react'
 import type { Payment, Vendor } from '../types'
-import { getDataFile } from '../utils/dataPath'
+import { fetchDataFile } from '../utils/dataPath'
 
 interface VendorCardProps {
   vendorId: string
@@ -18,8 +18,8 @@ export default function VendorCard({ vendorId }: VendorCardProps) {
       setLoading(true)
       try {
         const [vendorsList, paymentsList] = await Promise.all([
-          fetch(getDataFile('vendors_master.json')).then(r => r.json()).catch(() => []),
-          fetch(getDataFile('payments_by_year.json')).then(r => r.json()).catch(() => []),
+          fetchDataFile('vendors_master.json').then(r => r.json()).catch(() => []),
+          fetchDataFile('payments_by_year.json').then(r => r.json()).catch(() => []),
         ])
 
         const vendorData = Array.isArray(vendorsList) 
@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from 'react'
 import { useLedgerStore } from '../store/ledgerStore'
-import { getDataFile } from '../utils/dataPath'
+import { fetchDataFile } from '../utils/dataPath'
 
 interface Vendor {
   vendor_id: string
@@ -23,8 +23,7 @@ export default function VendorList() {
     setError(null)
     setLoading(true)
     try {
-      const url = getDataFile('vendors_master.json')
-      const response = await fetch(url)
+      const response = await fetchDataFile('vendors_master.json')
       if (!response.ok) {
         throw new Error(`HTTP ${response.status}: ${response.statusText}`)
       }
@@ -2,7 +2,9 @@
 
 import { motion } from 'framer-motion'
 import { useEffect, useState } from 'react'
-import { getDataFile } from '../../utils/dataPath'
+import { fetchDataFile } from '../../utils/dataPath'
+import { cubeSeries } from '../../utils/ledgerCube'
+import type { LedgerCube } from '../../types'
 
 interface SystemComposition {
   year: number
@@ -15,11 +17,18 @@ export default function SectionBeforeAfter() {
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    fetch(getDataFile('system_composition.json'))
+    fetchDataFile('ledger_cube.json')
       .then(r => r.json())
-      .then(d => {
-        const sorted = d.sort((a: SystemComposition, b: SystemComposition) => a.year - b.year)
-        setData(sorted)
+      .then((cube: LedgerCube) => {
+        // Yearly public and for-profit totals are roll-up cells of the cube
+        const publicByYear = cubeSeries(cube, 'year', { type: 'public' })
+        const forProfitByYear = cubeSeries(cube, 'year', { type: 'for_profit' })
+        const years = (cube.members.year as number[]).slice().sort((a, b) => a - b)
+        setData(years.map(year => ({
+          year,
+          public_total: publicByYear.get(year) ?? 0,
+          for_profit_total: forProfitByYear.get(year) ?? 0,
+        })))
         setLoading(false)
       })
       .catch(() => setLoading(false))
@@ -4,7 +4,7 @@ import { motion, useScroll, useTransform } from 'framer-motion'
 import { useRef, useState, useEffect, useMemo, useCallback } from 'react'
 import Link from 'next/link'
 import { useLedgerStore } from '../../store/ledgerStore'
-import { getDataFile } from '../../utils/dataPath'
+import { fetchDataFile } from '../../utils/dataPath'
 
 interface SystemComposition {
   year: number
@@ -57,15 +57,8 @@ export default function SectionLedgerEnhanced() {
       }
     }, 10000) // 10 second timeout
     
-    const dataUrl = getDataFile('system_composition.json')
-    console.log('Fetching data from:', dataUrl)
-    
-    fetch(dataUrl, {
-      cache: 'no-cache',
-      headers: {
-        'Cache-Control': 'no-cache',
-      },
-    })
+    // Hashed files from the manifest are immutable, so the browser cache can serve them
+    fetchDataFile('system_composition.json')
       .then(r => {
         console.log('Response status:', r.status, r.statusText)
         if (!r.ok) throw new Error(`HTTP ${r.status}: ${r.statusText}`)
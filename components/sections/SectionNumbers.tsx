@@ -2,7 +2,7 @@
 
 import { motion } from 'framer-motion'
 import { useEffect, useState } from 'react'
-import { getDataFile } from '../../utils/dataPath'
+import { fetchDataFile } from '../../utils/dataPath'
 
 interface SystemComposition {
   year: number
@@ -27,15 +27,8 @@ export default function SectionNumbers() {
       }
     }, 10000) // 10 second timeout
     
-    const dataUrl = getDataFile('system_composition.json')
-    console.log('Fetching data from:', dataUrl)
-    
-    fetch(dataUrl, {
-      cache: 'no-cache',
-      headers: {
-        'Cache-Control': 'no-cache',
-      },
-    })
+    // Hashed files from the manifest are immutable, so the browser cache can serve them
+    fetchDataFile('system_composition.json')
       .then(r => {
         console.log('Response status:', r.status, r.statusText)
         if (!r.ok) {
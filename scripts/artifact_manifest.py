@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Content-hashed artifact names for The Ledger
+Each published artifact also gets an immutable copy named after its content
+(vendors_master.<hash>.json), and manifest.json maps logical names to those
+copies. The hashed files can be cached forever; only the manifest has to be
+revalidated after a rebuild.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+MANIFEST_FILE = "manifest.json"
+
+# Hex digits of the sha256 kept in the file name
+HASH_CHARS = 12
+
+HASHED_NAME = re.compile(rf"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{{{HASH_CHARS}}})(?P<suffix>\.[^.]+)$")
+
+
+def file_sha256(path: Path) -> str:
+    """Hex sha256 of a file, read in chunks rather than loaded whole"""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()  # Python < 3.11
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def hashed_name(path: Path) -> str:
+    return f"{path.stem}.{file_sha256(path)[:HASH_CHARS]}{path.suffix}"
+
+
+def read_manifest(directory: Path) -> Optional[Dict]:
+    path = directory / MANIFEST_FILE
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ArtifactManifest:
+    """
+    Collects the hashed copies for one published generation. Files from the
+    previous manifest are kept when pruning, so a client that fetched the old
+    manifest just before a rebuild can still load what it points to.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.files: Dict[str, str] = {}
+        self.bytes_written = 0
+
+    def add(self, path: Path) -> str:
+        """Hashed copy of a published file (written unless it already exists)"""
+        hashed = path.with_name(hashed_name(path))
+        if not hashed.exists():
+            tmp_path = hashed.with_name(f".{hashed.name}.{os.getpid()}.tmp")
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, hashed)
+            self.bytes_written += hashed.stat().st_size
+        logical = path.relative_to(self.directory).as_posix()
+        self.files[logical] = hashed.relative_to(self.directory).as_posix()
+        return self.files[logical]
+
+    def write(self, generation: int) -> Dict:
+        """Replace manifest.json (atomically) and prune unreferenced hashed copies"""
+        previous = read_manifest(self.directory) or {}
+        manifest = {
+            'generation': generation,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'files': dict(sorted(self.files.items())),
+        }
+        path = self.directory / MANIFEST_FILE
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+        keep = set(manifest['files'].values()) | set(previous.get('files', {}).values())
+        self.prune(keep)
+        return manifest
+
+    def prune(self, keep):
+        for path in self.directory.glob("*.json"):
+            if HASHED_NAME.match(path.name) and path.name not in keep:
+                path.unlink()
+
+
+def republish(directory: Path, paths) -> Optional[Dict]:
+    """
+    Refresh the hashed copies of files rewritten after a build (by the
+    classification scripts), keeping the rest of the manifest and its
+    generation. Does nothing if no build has written a manifest yet.
+    """
+    previous = read_manifest(directory)
+    if previous is None:
+        return None
+    manifest = ArtifactManifest(directory)
+    manifest.files = dict(previous.get('files', {}))
+    for path in paths:
+        manifest.add(Path(path))
+    return manifest.write(previous.get('generation', 0))
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Requests/sec benchmark for serving the prebuilt Ledger from Flask
+Compares flask_ledger.register_ledger with the original serve_ledger route
+(FLASK_ROUTE_IMPROVED.txt, kept below) through Flask's WSGI test client, on
+a built out/ directory or a synthetic one shaped like a Next.js export.
+
+Usage:
+    python scripts/bench_flask_serving.py                 # synthetic build
+    python scripts/bench_flask_serving.py --out out/ --requests 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from flask import Flask
+
+import flask_ledger
+
+SEED = 20180629
+
+
+def legacy_app(ledger_out: Path) -> Flask:
+    """serve_ledger as originally written, probing the candidates per request"""
+    app = Flask(__name__)
+
+    @app.route('/ledger')
+    @app.route('/ledger/')
+    @app.route('/ledger/<path:path>')
+    def serve_ledger(path='index.html'):
+        from flask import send_from_directory, jsonify
+
+        possible_paths = [
+            str(ledger_out),
+            os.path.join('/opt/render/project/src', 'ledger', 'out'),
+            os.path.join('/opt/render/project/src', 'ledger', 'out'),
+        ]
+
+        ledger_dir = None
+        for test_path in possible_paths:
+            if os.path.exists(test_path) and os.path.isdir(test_path):
+                ledger_dir = test_path
+                break
+
+        if not ledger_dir:
+            return jsonify({"error": "Ledger not built yet", "checked_paths": possible_paths}), 503
+
+        index_path = os.path.join(ledger_dir, 'index.html')
+        if not os.path.exists(index_path):
+            return jsonify({"error": "Ledger index.html not found", "ledger_dir": ledger_dir}), 503
+
+        if path == 'index.html' or not path:
+            return send_from_directory(ledger_dir, 'index.html')
+
+        file_path = os.path.join(ledger_dir, path)
+        if not os.path.exists(file_path) or not os.path.isfile(file_path):
+            if os.path.exists(index_path):
+                return send_from_directory(ledger_dir, 'index.html')
+            return jsonify({"error": "File not found", "requested_path": path, "ledger_dir": ledger_dir}), 404
+
+        return send_from_directory(ledger_dir, path)
+
+    return app
+
+
+def current_app(ledger_out: Path) -> Flask:
+    app = Flask(__name__)
+    flask_ledger.register_ledger(app, [ledger_out])
+    return app
+
+
+def synthetic_build(directory: Path, rng: random.Random) -> Path:
+    """index.html, a few pages, JS/CSS chunks and data JSON, then precompressed"""
+    out = directory / 'out'
+    files: Dict[str, int] = {'index.html': 12_000, 'water.html': 9_000, 'receipts.html': 9_000}
+    for i in range(40):
+        files[f"_next/static/chunks/{i:02d}-{rng.getrandbits(48):012x}.js"] = rng.randint(2_000, 120_000)
+    files[f"_next/static/css/{rng.getrandbits(48):012x}.css"] = 30_000
+    for name in ['system_composition', 'rankings', 'vendors_master']:
+        files[f"data/processed/{name}.{rng.getrandbits(48):012x}.json"] = rng.randint(5_000, 300_000)
+    files['data/processed/manifest.json'] = 800
+
+    words = [f"vendor{i}" for i in range(500)] + ['{', '}', '"amount":', 'function', 'return']
+    for relative, size in files.items():
+        path = out / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text = ' '.join(rng.choice(words) for _ in range(size // 7))
+        path.write_text(text[:size])
+    flask_ledger.precompress(out)
+    return out
+
+
+def request_paths(out: Path, n: int, rng: random.Random) -> List[str]:
+    """Mostly assets and data, some page loads and unknown client-side routes"""
+    assets = [p.relative_to(out).as_posix() for p in out.rglob('*')
+              if p.is_file() and p.suffix not in ('.gz', '.br')]
+    paths = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.10:
+            paths.append('/ledger/')
+        elif roll < 0.15:
+            paths.append('/ledger/vendors/some-client-route')
+        else:
+            paths.append('/ledger/' + rng.choice(assets))
+    return paths
+
+
+def requests_per_second(app: Flask, paths: List[str], headers: Dict[str, str],
+                        repeat: int, conditional: bool = False) -> float:
+    """Best requests/sec over `repeat` passes (optionally sending If-None-Match)"""
+    client = app.test_client()
+    etags: Dict[str, str] = {}
+    if conditional:
+        for path in set(paths):
+            etag = client.get(path, headers=headers).headers.get('ETag')
+            if etag:
+                etags[path] = etag
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            request_headers = headers
+            if conditional and path in etags:
+                request_headers = {**headers, 'If-None-Match': etags[path]}
+            response = client.get(path, headers=request_headers)
+            response.close()
+        best = min(best, time.perf_counter() - start)
+    return len(paths) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Flask ledger route against the original one")
+    parser.add_argument('--out', type=Path, help="Built ledger directory (default: a synthetic build)")
+    parser.add_argument('--requests', type=int, default=3000, help="Requests per measurement (default: 3000)")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes per measurement, best is kept (default: 3)")
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    with tempfile.TemporaryDirectory(prefix='ledger-serve-') as tmp:
+        out = args.out or synthetic_build(Path(tmp), rng)
+        paths = request_paths(out, args.requests, rng)
+        apps: Dict[str, Callable[[Path], Flask]] = {'legacy': legacy_app, 'current': current_app}
+        built = {name: make(out) for name, make in apps.items()}
+
+        cases = [
+            ('identity', {}, False),
+            ('gzip/br', {'Accept-Encoding': 'br, gzip'}, False),
+            ('revalidate', {'Accept-Encoding': 'br, gzip'}, True),
+        ]
+        print(f"{'Case':<12} {'Legacy':>12} {'Current':>12} {'Speedup':>9}")
+        print("-" * 48)
+        for case, headers, conditional in cases:
+            legacy = requests_per_second(built['legacy'], paths, headers, args.repeat, conditional)
+            current = requests_per_second(built['current'], paths, headers, args.repeat, conditional)
+            print(f"{case:<12} {legacy:>8,.0f}/s {current:>8,.0f}/s {current / legacy:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for process_data.parse_amount
+Compares the current parser with the original implementation (kept below)
+on amount distributions like those in the Public Accounts CSVs, reporting
+values/sec for each and how often the two disagree.
+
+Usage:
+    python scripts/bench_parse_amount.py
+    python scripts/bench_parse_amount.py --values 500000 --repeat 5
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import process_data
+
+SEED = 20180629
+
+
+def legacy_parse_amount(amount_str: str) -> float:
+    """parse_amount as originally written (four replaces, strip, paren check, float)"""
+    if not amount_str:
+        return 0.0
+
+    cleaned = str(amount_str).strip().replace('$', '').replace(',', '').replace('"', '').replace("'", '')
+
+    if cleaned.startswith('(') and cleaned.endswith(')'):
+        cleaned = '-' + cleaned[1:-1]
+
+    try:
+        return float(cleaned)
+    except ValueError:
+        return 0.0
+
+
+def _amount(rng: random.Random) -> float:
+    return round(rng.lognormvariate(11, 2), 2)
+
+
+def _french(amount: float) -> str:
+    """1 234 567,89 with a non-breaking or narrow no-break space"""
+    sep = random.Random(amount).choice([' ', ' ', ' '])
+    return f"{amount:,.2f}".replace(',', sep).replace('.', ',')
+
+
+# Distribution name -> (format, weight) pairs sampled per value
+DISTRIBUTIONS: Dict[str, List[tuple]] = {
+    'clean': [(lambda a: f"{a:.2f}", 1.0)],
+    'english': [
+        (lambda a: f"{a:,.2f}", 0.80),
+        (lambda a: f"${a:,.2f}", 0.10),
+        (lambda a: f"({a:,.2f})", 0.02),
+        (lambda a: f"{a:.2f}", 0.08),
+    ],
+    'french': [
+        (_french, 0.85),
+        (lambda a: f"{_french(a)} $", 0.10),
+        (lambda a: f"{a:.2f}", 0.05),
+    ],
+    'mixed': [
+        (lambda a: f"{a:.2f}", 0.50),
+        (lambda a: f"{a:,.2f}", 0.30),
+        (_french, 0.15),
+        (lambda a: "", 0.03),
+        (lambda a: "n/a", 0.02),
+    ],
+}
+
+
+def generate_values(distribution: str, n: int) -> List[str]:
+    rng = random.Random(SEED)
+    formats = DISTRIBUTIONS[distribution]
+    fns = [fn for fn, _ in formats]
+    weights = [w for _, w in formats]
+    return [rng.choices(fns, weights)[0](_amount(rng)) for _ in range(n)]
+
+
+def time_parsers(parsers: List[Callable[[str], float]], values: List[str], repeat: int) -> List[float]:
+    """Best values/sec for each parser over `repeat` interleaved passes"""
+    best = [float('inf')] * len(parsers)
+    for _ in range(repeat):
+        for i, parse in enumerate(parsers):
+            start = time.perf_counter()
+            for value in values:
+                parse(value)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return [len(values) / seconds for seconds in best]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_amount against the original implementation")
+    parser.add_argument('--values', type=int, default=200_000, help="Values per distribution (default: 200000)")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes per measurement, best is kept (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'Distribution':<14} {'Legacy':>14} {'Current':>14} {'Speedup':>9} {'Differ':>8}")
+    print("-" * 63)
+    for name in DISTRIBUTIONS:
+        values = generate_values(name, args.values)
+        legacy, current = time_parsers([legacy_parse_amount, process_data.parse_amount], values, args.repeat)
+        differ = sum(1 for v in values if abs(legacy_parse_amount(v) - process_data.parse_amount(v)) > 0.005)
+        print(f"{name:<14} {legacy:>10,.0f}/s {current:>10,.0f}/s {current / legacy:>8.2f}x {differ:>8,}")
+
+    print("\nDiffer counts values the two parsers read differently (expected for French formats).")
+
+
+if __name__ == "__main__":
+    main()
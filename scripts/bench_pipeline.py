@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the data processing pipeline
+Times each stage of process_data.py (plus classification and fix-ups) against
+fixed synthetic datasets and writes machine-readable results for comparison
+between commits.
+
+Usage:
+    python scripts/bench_pipeline.py                       # 10k rows
+    python scripts/bench_pipeline.py --scale 10k --scale 1m
+    python scripts/bench_pipeline.py --compare data/benchmarks/pipeline_abc1234.json
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pipeline_metrics import peak_rss_mb
+
+SCRIPTS_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPTS_DIR.parent
+BENCH_DIR = ROOT_DIR / "data" / "benchmarks"
+DATASET_DIR = BENCH_DIR / "datasets"
+
+SCALES = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+# Fiscal years covered by every synthetic dataset (one file per year)
+FISCAL_YEARS = list(range(2014, 2024))
+
+SEED = 20180629  # Fixed so datasets are identical between runs and machines
+
+# Name templates roughly follow the mix seen in the real Public Accounts
+VENDOR_TEMPLATES = [
+    ('{place} General Hospital {n}', 0.10),
+    ('{place} District School Board {n}', 0.06),
+    ('City Of {place} {n}', 0.05),
+    ('{place} Community Living Association {n}', 0.08),
+    ('{surname} Consulting {n} Inc.', 0.12),
+    ('{surname} Staffing Solutions {n} Ltd', 0.08),
+    ('{surname} Health Services {n} Inc', 0.08),
+    ('{surname} Technology Group {n}', 0.08),
+    ('{surname} & {surname2} {n} LLP In Trust', 0.03),
+    ('{surname} {surname2} Holdings {n} Corp', 0.12),
+    ('{surname} {surname2} {n}', 0.20),
+]
+
+PLACES = [
+    'Toronto', 'Ottawa', 'Hamilton', 'London', 'Kingston', 'Sudbury', 'Windsor',
+    'Barrie', 'Guelph', 'Peel', 'Durham', 'Halton', 'Niagara', 'Waterloo',
+    'Thunder Bay', 'Simcoe', 'Muskoka', 'Brant', 'Lambton', 'Renfrew',
+]
+
+SURNAMES = [
+    'Smith', 'Tremblay', 'Martin', 'Roy', 'Wilson', 'Macdonald', 'Gagnon',
+    'Johnson', 'Taylor', 'Cote', 'Campbell', 'Anderson', 'Leblanc', 'Lee',
+    'Brown', 'Bouchard', 'Scott', 'Stewart', 'Morin', 'Young', 'Singh',
+    'Patel', 'Nguyen', 'Chen', 'Wong', 'Kelly', 'Randstad', 'Altis',
+]
+
+MINISTRIES = [
+    'Health', 'Education', 'Children, Community and Social Services',
+    'Transportation', 'Infrastructure', 'Long-Term Care', 'Colleges and Universities',
+    'Municipal Affairs and Housing', 'Attorney General', 'Solicitor General',
+    'Environment, Conservation and Parks', 'Finance', 'Public and Business Service Delivery',
+]
+
+# Rows the ingest filters are expected to drop
+NOISE_ROWS = [
+    ('Accounts under $50,000', 'Other'),
+    ('Payments made for services', 'Other'),
+    ('Interest on Ontario Securities', 'Interest'),
+    ('Aucune valeur', 'Other'),
+]
+
+
+def _vendor_pool(rng: random.Random, size: int) -> List[str]:
+    """Build a fixed pool of distinct vendor names"""
+    templates = [t for t, _ in VENDOR_TEMPLATES]
+    weights = [w for _, w in VENDOR_TEMPLATES]
+    pool = []
+    for i in range(size):
+        template = rng.choices(templates, weights)[0]
+        # {n} keeps names unique so the vendor count tracks the pool size
+        pool.append(template.format(
+            place=rng.choice(PLACES),
+            surname=rng.choice(SURNAMES),
+            surname2=rng.choice(SURNAMES),
+            n=f"{i:06d}",
+        ))
+    return pool
+
+
+def generate_dataset(rows: int, out_dir: Path) -> Path:
+    """
+    Write a deterministic synthetic dataset of roughly `rows` payment rows,
+    split into one Detailed Schedule of Payments file per fiscal year.
+    Existing datasets are reused.
+    """
+    marker = out_dir / ".complete"
+    if marker.exists():
+        return out_dir
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(SEED + rows)
+    pool = _vendor_pool(rng, max(50, rows // 50))
+    per_year = rows // len(FISCAL_YEARS)
+
+    for year in FISCAL_YEARS:
+        path = out_dir / f"public_accounts_detailed_schedule_of_payments_{year}-{(year + 1) % 100:02d}.csv"
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Ministry', 'Recipient', 'Amount $', 'Category'])
+            for i in range(per_year):
+                if i % 97 == 0:
+                    vendor, category = rng.choice(NOISE_ROWS)
+                else:
+                    vendor, category = rng.choice(pool), 'Transfer Payments'
+                    # Occasional raw-name variants that normalize to the same vendor
+                    if i % 7 == 0:
+                        vendor = vendor.upper()
+                amount = round(rng.lognormvariate(11, 2), 2)
+                writer.writerow([rng.choice(MINISTRIES), vendor, f"{amount:,.2f}", category])
+
+    marker.write_text(str(rows))
+    return out_dir
+
+
+def _time_stage(name: str, fn: Callable[[], Any], rows: int, trace_memory: bool) -> Tuple[Any, Dict[str, Any]]:
+    """Run one stage with output suppressed, returning its result and measurements"""
+    if trace_memory:
+        tracemalloc.start()
+
+    rss_before = peak_rss_mb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+
+    stats = {
+        'seconds': round(elapsed, 4),
+        'rows_per_sec': round(rows / elapsed, 1) if elapsed > 0 else None,
+        # High-water mark for the whole scale so far, and how far this stage raised it
+        'process_peak_rss_mb': peak_rss_mb(),
+    }
+    stats['peak_rss_growth_mb'] = round(stats['process_peak_rss_mb'] - rss_before, 1)
+    if trace_memory:
+        stats['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        tracemalloc.stop()
+
+    print(f"   {name:<22} {elapsed:>9.3f}s {stats['rows_per_sec'] or 0:>14,.0f} rows/s {stats['process_peak_rss_mb']:>9.1f} MB (+{stats['peak_rss_growth_mb']:.1f})")
+    return result, stats
+
+
+def run_scale(scale: str, trace_memory: bool = False) -> Dict[str, Any]:
+    """Run every stage once against the dataset for `scale` in an isolated work tree"""
+    rows = SCALES[scale]
+    dataset = generate_dataset(rows, DATASET_DIR / scale)
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import process_data
+    import classify_vendors
+
+    with tempfile.TemporaryDirectory(prefix=f"ledger-bench-{scale}-") as tmp:
+        work = Path(tmp)
+        processed = work / "data" / "processed"
+        public = work / "public" / "data" / "processed"
+        processed.mkdir(parents=True)
+        public.mkdir(parents=True)
+
+        # Point the pipeline at the synthetic dataset and a throwaway output tree
+        process_data.RAW_DIR = dataset
+        process_data.PROCESSED_DIR = processed
+        process_data.PUBLIC_DIR = public
+        classify_vendors.DATA_DIR = processed
+        classify_vendors.PUBLIC_DIR = public
+        classify_vendors.VENDORS_FILE = processed / "vendors_master.json"
+        classify_vendors.PUBLIC_VENDORS_FILE = public / "vendors_master.json"
+
+        def build_lenses(aggregated):
+            # Lens lists are built lazily; force them so this stage measures the work
+            vendors = process_data.build_public_vendors(aggregated['vendor_year_totals'])
+            lenses = process_data.build_lens_data(vendors, aggregated['vendor_ministries'])
+            for name in lenses.names:
+                lenses.vendors_in(name)
+            aggregated['vendors_master'] = vendors
+            return lenses
+
+        print(f"\n⏱️  Scale {scale} ({rows:,} rows)")
+        stages: Dict[str, Dict[str, Any]] = {}
+
+        payments, stages['ingest'] = _time_stage(
+            'ingest', process_data.ingest_raw_data, rows, trace_memory)
+        name_to_id, stages['normalize_vendors'] = _time_stage(
+            'normalize_vendors', lambda: process_data.normalize_vendors(payments), rows, trace_memory)
+        aggregated, stages['aggregate_payments'] = _time_stage(
+            'aggregate_payments', lambda: process_data.aggregate_payments(payments, name_to_id), rows, trace_memory)
+        lenses, stages['build_lens_data'] = _time_stage(
+            'build_lens_data', lambda: build_lenses(aggregated), rows, trace_memory)
+        _, stages['save_processed_data'] = _time_stage(
+            'save_processed_data', lambda: process_data.save_processed_data(aggregated, lenses), rows, trace_memory)
+        _, stages['classify_vendors'] = _time_stage(
+            'classify_vendors', classify_vendors.main, rows, trace_memory)
+
+        # fix_data_issues.py works on paths relative to the repo root
+        cwd = os.getcwd()
+        os.chdir(work)
+        try:
+            _, stages['fix_data_issues'] = _time_stage(
+                'fix_data_issues', lambda: runpy.run_path(str(SCRIPTS_DIR / "fix_data_issues.py"), run_name='__main__'),
+                rows, trace_memory)
+        finally:
+            os.chdir(cwd)
+
+    return {
+        'rows': rows,
+        'payments_loaded': len(payments),
+        'vendors': len(name_to_id),
+        'total_seconds': round(sum(s['seconds'] for s in stages.values()), 4),
+        'stages': stages,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Print per-stage ratios against a previous result file; returns False on regression"""
+    print(f"\n📊 Compared with {baseline.get('commit') or 'baseline'} (regression threshold {threshold:.0%})")
+    ok = True
+    for scale, result in current['results'].items():
+        base = baseline.get('results', {}).get(scale)
+        if not base:
+            continue
+        print(f"\n   Scale {scale}")
+        for stage, stats in result['stages'].items():
+            base_stats = base['stages'].get(stage)
+            if not base_stats or not base_stats['seconds']:
+                continue
+            ratio = stats['seconds'] / base_stats['seconds']
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  ⚠️  regression'
+                ok = False
+            print(f"   {stage:<22} {base_stats['seconds']:>9.3f}s → {stats['seconds']:>9.3f}s  ({ratio:.2f}x){flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data processing pipeline")
+    parser.add_argument('--scale', action='append', choices=sorted(SCALES),
+                        help="Dataset scale to run (repeatable, default: 10k)")
+    parser.add_argument('--output', type=Path,
+                        help="Where to write results JSON (default: data/benchmarks/pipeline_<commit>.json)")
+    parser.add_argument('--compare', type=Path, help="Previous results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Slowdown ratio reported as a regression (default: 0.10)")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Also record Python allocation peaks per stage (slower)")
+    parser.add_argument('--run-scale', choices=sorted(SCALES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Child mode: one scale per process so peak RSS isn't shared between scales
+    if args.run_scale:
+        result = run_scale(args.run_scale, args.tracemalloc)
+        print('BENCH_RESULT ' + json.dumps(result))
+        return
+
+    scales = args.scale or ['10k']
+    commit = _git_commit()
+    results = {}
+
+    for scale in scales:
+        cmd = [sys.executable, __file__, '--run-scale', scale]
+        if args.tracemalloc:
+            cmd.append('--tracemalloc')
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        for line in proc.stdout.splitlines():
+            if line.startswith('BENCH_RESULT '):
+                results[scale] = json.loads(line[len('BENCH_RESULT '):])
+            else:
+                print(line)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            sys.exit(f"❌ Benchmark failed at scale {scale}")
+
+    report = {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': SEED,
+        'results': results,
+    }
+
+    output = args.output or BENCH_DIR / f"pipeline_{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Wrote benchmark results to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare_results(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
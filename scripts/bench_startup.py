@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the ledger CLI and pipeline modules
+Times fresh interpreter launches (bare Python, `import ledger`, quick reports
+through the CLI, and importing the ingest pipeline) in a throwaway work tree
+built from the 10k synthetic dataset, and checks that importing every
+pipeline module leaves the tree untouched. Results are written as JSON for
+comparison between commits, like bench_pipeline.py.
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --repeat 50 --compare data/benchmarks/startup_abc1234.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+from bench_pipeline import BENCH_DIR, DATASET_DIR, SCALES, _git_commit, generate_dataset
+
+SCRIPTS_DIR = Path(__file__).parent
+
+IMPORT_ALL = (
+    "import ledger\n"
+    "for name in ledger.MODULES:\n"
+    "    try:\n"
+    "        getattr(ledger, name)\n"
+    "    except ImportError:\n"  # optional dependency (e.g. flask) not installed
+    "        pass\n"
+)
+
+
+def cases(work: Path) -> Dict[str, List[str]]:
+    cli = str(work / "scripts" / "ledger")
+    return {
+        'python': [sys.executable, '-c', 'pass'],
+        'import ledger': [sys.executable, '-c', 'import ledger'],
+        'ledger --help': [sys.executable, cli, '--help'],
+        'ledger report drift': [sys.executable, cli, 'report', 'drift'],
+        'ledger report top': [sys.executable, cli, 'report', 'top'],
+        'import process_data': [sys.executable, '-c', 'import process_data'],
+        'import all modules': [sys.executable, '-c', IMPORT_ALL],
+    }
+
+
+def build_work_tree(work: Path):
+    """Scripts plus a processed 10k dataset, so reports read real artifacts"""
+    shutil.copytree(SCRIPTS_DIR, work / "scripts", ignore=shutil.ignore_patterns('__pycache__'))
+    dataset = generate_dataset(SCALES['10k'], DATASET_DIR / '10k')
+    (work / "data").mkdir()
+    (work / "data" / "raw").symlink_to(dataset.resolve(), target_is_directory=True)
+    subprocess.run([sys.executable, str(work / "scripts" / "ledger"), 'ingest'], cwd=work,
+                   stdout=subprocess.DEVNULL, check=True)
+
+
+def snapshot(work: Path) -> Set[str]:
+    """Every path in the work tree except bytecode caches and the raw dataset"""
+    paths = set()
+    for root, dirs, files in os.walk(work):
+        dirs[:] = [d for d in dirs if d != '__pycache__' and not (Path(root) / d).is_symlink()]
+        paths.update(str(Path(root, name).relative_to(work)) for name in dirs + files)
+    return paths
+
+
+def time_command(cmd: List[str], cwd: Path, env: Dict[str, str], repeat: int) -> Dict[str, float]:
+    """Min and median wall-clock milliseconds over `repeat` launches (after one warm-up)"""
+    samples = []
+    for i in range(repeat + 1):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        if i:
+            samples.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': round(min(samples), 2), 'median_ms': round(statistics.median(samples), 2)}
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Print per-case ratios against a previous result file; returns False on regression"""
+    print(f"\n📊 Compared with {baseline.get('commit') or 'baseline'} (regression threshold {threshold:.0%})")
+    ok = True
+    for case, stats in current['results'].items():
+        base = baseline.get('results', {}).get(case)
+        if not base or not base['min_ms']:
+            continue
+        ratio = stats['min_ms'] / base['min_ms']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  ⚠️  regression'
+            ok = False
+        print(f"   {case:<22} {base['min_ms']:>8.1f}ms → {stats['min_ms']:>8.1f}ms  ({ratio:.2f}x){flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ledger CLI and module cold-start time")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed launches per case (default: 20)")
+    parser.add_argument('--output', type=Path,
+                        help="Where to write results JSON (default: data/benchmarks/startup_<commit>.json)")
+    parser.add_argument('--compare', type=Path, help="Previous results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help="Slowdown ratio reported as a regression (default: 0.20)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='ledger-startup-') as tmp:
+        work = Path(tmp)
+        print("🔧 Building a 10k work tree...")
+        build_work_tree(work)
+        env = dict(os.environ, PYTHONPATH=str(work / "scripts"))
+
+        # Importing modules must not create, move or delete anything
+        before = snapshot(work)
+        subprocess.run([sys.executable, '-c', IMPORT_ALL], cwd=work, env=env, check=True)
+        changed = sorted(before ^ snapshot(work))
+        if changed:
+            print(f"❌ Importing the pipeline modules changed the work tree: {', '.join(changed)}")
+        else:
+            print("✅ Importing every pipeline module leaves the work tree untouched")
+
+        print(f"\n{'Case':<22} {'Min':>9} {'Median':>9}")
+        print("-" * 42)
+        results = {}
+        for case, cmd in cases(work).items():
+            results[case] = time_command(cmd, work, env, args.repeat)
+            print(f"{case:<22} {results[case]['min_ms']:>7.1f}ms {results[case]['median_ms']:>7.1f}ms")
+
+    commit = _git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'import_side_effects': changed,
+        'results': results,
+    }
+    output = args.output or BENCH_DIR / f"startup_{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Wrote benchmark results to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare_results(report, baseline, args.threshold):
+            sys.exit(1)
+    if changed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
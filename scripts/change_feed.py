@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Change feed between pipeline runs
+Diffs the newly built vendor master and system composition against the
+previously published generation (vendors added/removed/reclassified/renamed,
+yearly amount changes, composition deltas) so consumers can apply a small
+patch instead of re-downloading everything.
+"""
+
+import time
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+FEED_FILE = "change_feed.json"
+HISTORY_DIR = "changes"
+
+# Generations kept in changes/ for consumers catching up several runs
+HISTORY_KEEP = 20
+
+# Amounts closer than this (dollars) are treated as unchanged
+AMOUNT_TOLERANCE = 0.005
+
+COMPOSITION_FIELDS = ['public_total', 'non_profit_total', 'for_profit_total', 'unknown_total']
+
+
+def _type(vendor: Dict[str, Any]) -> str:
+    return vendor.get('type', vendor.get('vendor_type', 'unknown'))
+
+
+def _category(vendor: Dict[str, Any]) -> Optional[str]:
+    return vendor.get('category', vendor.get('service_category'))
+
+
+def _yearly_patch(old: Dict[str, float], new: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """Years whose amount changed, with the new amount (None = year removed)"""
+    patch: Dict[str, Optional[float]] = {}
+    for year in old.keys() | new.keys():
+        if year not in new:
+            patch[year] = None
+        elif year not in old or abs(new[year] - old[year]) > AMOUNT_TOLERANCE:
+            patch[year] = new[year]
+    return {year: patch[year] for year in sorted(patch)}
+
+
+def diff_vendors(previous: Iterable[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Vendor changes from `previous` to `current`. The previous master is read
+    one record at a time (e.g. from json_stream.iter_json_records), so only
+    the current one has to be in memory.
+    """
+    new_by_id = {v['vendor_id']: v for v in current if v.get('vendor_id')}
+    old_ids = set()
+    removed = []
+    reclassified = []
+    renamed = []
+    amount_changes = []
+
+    for old in previous:
+        vid = old.get('vendor_id')
+        if not vid or vid in old_ids:
+            continue
+        old_ids.add(vid)
+        new = new_by_id.get(vid)
+        if new is None:
+            removed.append(vid)
+            continue
+
+        if _type(old) != _type(new) or _category(old) != _category(new):
+            reclassified.append({
+                'vendor_id': vid,
+                'type': [_type(old), _type(new)],
+                'category': [_category(old), _category(new)],
+            })
+
+        if old.get('name') != new.get('name'):
+            renamed.append({'vendor_id': vid, 'name': [old.get('name'), new.get('name')]})
+
+        patch = _yearly_patch(old.get('yearly_payments', {}), new.get('yearly_payments', {}))
+        if patch:
+            amount_changes.append({
+                'vendor_id': vid,
+                'yearly_payments': patch,
+                'total_paid': new.get('total_paid'),
+            })
+
+    added = [new_by_id[vid] for vid in new_by_id.keys() - old_ids]
+    by_id = itemgetter('vendor_id')
+    return {
+        'vendors_added': sorted(added, key=by_id),
+        'vendors_removed': sorted(removed),
+        'vendors_reclassified': sorted(reclassified, key=by_id),
+        'vendors_renamed': sorted(renamed, key=by_id),
+        'amount_changes': sorted(amount_changes, key=by_id),
+    }
+
+
+def diff_composition(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-year deltas for every composition total that moved"""
+    old_by_year = {c['year']: c for c in previous}
+    deltas = []
+    for entry in current:
+        old = old_by_year.get(entry['year'], {})
+        delta = {
+            field: entry.get(field, 0) - old.get(field, 0)
+            for field in COMPOSITION_FIELDS
+            if abs(entry.get(field, 0) - old.get(field, 0)) > AMOUNT_TOLERANCE
+        }
+        if delta or entry['year'] not in old_by_year:
+            deltas.append(dict(delta, year=entry['year']))
+    for year in sorted(old_by_year.keys() - {c['year'] for c in current}):
+        deltas.append({'year': year, 'removed': True})
+    return deltas
+
+
+def build_change_feed(
+    previous_feed: Optional[Dict[str, Any]],
+    previous_vendors: Optional[Iterable[Dict[str, Any]]],
+    current_vendors: List[Dict[str, Any]],
+    previous_composition: Optional[List[Dict[str, Any]]],
+    current_composition: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    The change feed for a new generation. Without a previous vendor master
+    there is nothing to diff against and the feed is marked full_rebuild.
+    """
+    base_generation = (previous_feed or {}).get('generation', 0)
+    feed: Dict[str, Any] = {
+        'generation': base_generation + 1,
+        'base_generation': base_generation,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'full_rebuild': previous_vendors is None,
+    }
+    if previous_vendors is not None:
+        feed.update(diff_vendors(previous_vendors, current_vendors))
+    if previous_composition is not None:
+        feed['composition_deltas'] = diff_composition(previous_composition, current_composition)
+
+    feed['summary'] = {
+        key: len(feed.get(key, []))
+        for key in ('vendors_added', 'vendors_removed', 'vendors_reclassified',
+                    'vendors_renamed', 'amount_changes', 'composition_deltas')
+    }
+    return feed
+
+
+def history_path(base_dir: Path, generation: int) -> Path:
+    return base_dir / HISTORY_DIR / f"gen_{generation:06d}.json"
+
+
+def prune_history(base_dir: Path, generation: int):
+    """Drop archived generations older than the last HISTORY_KEEP"""
+    for path in (base_dir / HISTORY_DIR).glob("gen_*.json"):
+        try:
+            gen = int(path.stem[len("gen_"):])
+        except ValueError:
+            continue
+        if gen <= generation - HISTORY_KEEP:
+            path.unlink()
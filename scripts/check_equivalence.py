@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Equivalence harness for process_data.py
+Runs a legacy revision of the pipeline (default: the repository's root
+commit) and the working tree side by side on the same inputs, checks that
+system_composition.json, vendors_master.json and the lens files agree, and
+times both. An artifact passes if it is byte-identical, or if every field the
+legacy output has is present and equal, with dollar amounts within tolerance.
+Fields only the current output has are reported, not failed. Vendors are
+matched by name, since vendor IDs are allocated differently between versions.
+
+Each dataset is built twice per side: a cold run, then a rerun after both
+trees are given the same seeded classifications, so type splits and lens
+membership are exercised too.
+
+Usage:
+    python scripts/check_equivalence.py                              # 10k synthetic + fixture
+    python scripts/check_equivalence.py --scale 10k --scale 1m --legacy HEAD~5
+    python scripts/check_equivalence.py --dataset data/raw --current-arg=--memory-budget=64
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench_pipeline import DATASET_DIR, SCALES, SEED, generate_dataset
+
+SCRIPTS_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPTS_DIR.parent
+
+# Published artifacts compared, plus every lens_*.json the legacy side writes
+ARTIFACTS = ['system_composition.json', 'vendors_master.json']
+
+# Allocated differently between versions; records are matched by name instead
+IGNORED_FIELDS = {'vendor_id'}
+
+# Seeded classifications given to both sides before the second run
+VENDOR_TYPES = ['public', 'non_profit', 'for_profit', 'unknown']
+CATEGORIES = [None, None, 'staffing', 'consulting', 'healthcare_delivery', 'IT', 'other']
+
+# Differences printed per artifact (all of them go to --json)
+MAX_SHOWN = 5
+
+
+def root_commit() -> str:
+    return subprocess.run(
+        ['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT_DIR,
+        capture_output=True, text=True, check=True,
+    ).stdout.split()[-1]
+
+
+def export_scripts(ref: str, dest: Path) -> Path:
+    """scripts/ as of a git revision, extracted under dest"""
+    archive = subprocess.run(
+        ['git', 'archive', '--format=tar', ref, 'scripts'], cwd=ROOT_DIR,
+        capture_output=True, check=True,
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    return dest / 'scripts'
+
+
+def write_fixture(out_dir: Path) -> Path:
+    """
+    A small dataset of the format quirks ingest has to handle: French and
+    English headers, semicolon delimiters, a UTF-8 BOM, quoted amounts with
+    currency symbols, negative and zero amounts, aggregate and excluded-category
+    rows, and raw-name variants of the same vendor.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(SEED)
+    vendors = [
+        'Acme Staffing Inc.', 'ACME STAFFING INC', 'Acme Staffing Inc',
+        'Hôpital Général de Sudbury', 'City of Ottawa', 'Brant Consulting Ltd.',
+        'Kelly Services (Canada) Ltd', 'Lakeridge Health', 'Altis Recruitment',
+        'Ontario Power Generation', 'Deloitte LLP', 'Deloitte  LLP',
+    ]
+    ministries = ['Health', 'Education', 'Long-Term Care', ' Finance ', 'Solicitor General']
+    noise = [
+        ('Accounts under $50,000', 'Other'),
+        ('Payments made for services', 'Other'),
+        ('Aucune valeur', 'Other'),
+        ('Interest on Ontario Securities', 'Interest'),
+        ('Smith Travel Agency', 'Travel'),
+        ('Payroll Staff', 'Salary and wages'),
+    ]
+
+    def amount() -> str:
+        value = round(rng.lognormvariate(11, 1.5), 2)
+        return rng.choice([f"{value:.2f}", f"{value:,.2f}", f"${value:,.2f}", f"\"{value:,.2f}\""])
+
+    english = ['Ministry', 'Recipient', 'Amount $', 'Category']
+    for year in (2017, 2018, 2019):
+        path = out_dir / f"public_accounts_detailed_schedule_of_payments_{year}-{(year + 1) % 100:02d}.csv"
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(english)
+            for i in range(200):
+                vendor, category = rng.choice(noise) if i % 11 == 0 else (rng.choice(vendors), 'Transfer Payments')
+                writer.writerow([rng.choice(ministries), vendor, amount(), category])
+            writer.writerow(['Health', 'Acme Staffing Inc.', '(1,250.00)', 'Transfer Payments'])
+            writer.writerow(['Health', 'Acme Staffing Inc.', '0.00', 'Transfer Payments'])
+            writer.writerow(['Health', '', '5,000.00', 'Transfer Payments'])
+
+    french = ['Ministère', 'Bénéficiaire', 'Montant $', 'Categorie']
+    for year in (2020, 2021):
+        path = out_dir / f"paiements_detailles_{year}-{(year + 1) % 100:02d}.csv"
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(french)
+            for i in range(200):
+                vendor, category = rng.choice(noise) if i % 13 == 0 else (rng.choice(vendors), 'Paiements de transfert')
+                writer.writerow([rng.choice(ministries), vendor, f"{round(rng.lognormvariate(11, 1.5), 2):.2f}", category])
+    return out_dir
+
+
+def seed_classifications(work: Path, seed: int):
+    """
+    Give every vendor a seeded type and category, in the public vendor
+    master and in the data-side master (keyed by normalized name, which
+    keeps vendor IDs stable across runs for revisions that look them up by name)
+    """
+    public_path = work / "public" / "data" / "processed" / "vendors_master.json"
+    with open(public_path, 'r') as f:
+        vendors = json.load(f)
+
+    master = []
+    for vendor in vendors:
+        rng = random.Random(f"{seed}:{vendor['name']}")
+        vendor['type'] = rng.choice(VENDOR_TYPES)
+        vendor['category'] = rng.choice(CATEGORIES)
+        master.append({
+            'vendor_id': vendor['vendor_id'],
+            'vendor_name_normalized': vendor['name'],
+            'vendor_type': vendor['type'],
+            'service_category': vendor['category'],
+            'confidence': 'seeded',
+        })
+
+    with open(public_path, 'w') as f:
+        json.dump(vendors, f, indent=2)
+    with open(work / "data" / "processed" / "vendors_master.json", 'w') as f:
+        json.dump(master, f, indent=2)
+
+
+class Side:
+    """One pipeline revision in its own work tree over a shared raw dataset"""
+
+    def __init__(self, name: str, scripts: Path, work: Path, args: List[str]):
+        self.name = name
+        self.work = work
+        self.args = args
+        self.log = work / "process_data.log"
+        shutil.copytree(scripts, work / "scripts", ignore=shutil.ignore_patterns('__pycache__'))
+        (work / "public" / "data" / "processed").mkdir(parents=True)
+        (work / "data" / "processed").mkdir(parents=True)
+
+    def use_dataset(self, dataset: Path):
+        (self.work / "data" / "raw").symlink_to(dataset.resolve(), target_is_directory=True)
+
+    @property
+    def output_dir(self) -> Path:
+        return self.work / "public" / "data" / "processed"
+
+    def run(self) -> float:
+        """Run process_data.py, returning wall-clock seconds"""
+        with open(self.log, 'a') as log:
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "scripts/process_data.py", *self.args], cwd=self.work,
+                stdout=log, stderr=subprocess.STDOUT,
+            )
+            seconds = time.perf_counter() - start
+        if result.returncode != 0:
+            tail = self.log.read_text(errors='replace').splitlines()[-15:]
+            raise RuntimeError(f"{self.name} process_data.py exited with {result.returncode}:\n" + "\n".join(tail))
+        return seconds
+
+
+class Comparison:
+    """Field-by-field comparison of a legacy artifact against the current one"""
+
+    def __init__(self, abs_tol: float, rel_tol: float):
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+        self.differences: List[str] = []
+        self.added_fields = set()
+        self.max_deviation = 0.0
+
+    def compare(self, legacy: Any, current: Any, path: str = '$'):
+        if isinstance(legacy, bool) or isinstance(current, bool):
+            if legacy is not current:
+                self.differences.append(f"{path}: {legacy!r} → {current!r}")
+        elif isinstance(legacy, (int, float)) and isinstance(current, (int, float)):
+            deviation = abs(legacy - current)
+            self.max_deviation = max(self.max_deviation, deviation)
+            if deviation > max(self.abs_tol, self.rel_tol * max(abs(legacy), abs(current))):
+                self.differences.append(f"{path}: {legacy!r} → {current!r}")
+        elif isinstance(legacy, dict) and isinstance(current, dict):
+            for key, value in legacy.items():
+                if key in IGNORED_FIELDS:
+                    continue
+                if key not in current:
+                    self.differences.append(f"{path}.{key}: missing")
+                else:
+                    self.compare(value, current[key], f"{path}.{key}")
+            self.added_fields.update(key for key in current if key not in legacy)
+        elif isinstance(legacy, list) and isinstance(current, list):
+            legacy_keyed, current_keyed = _by_name(legacy), _by_name(current)
+            if legacy_keyed is not None and current_keyed is not None:
+                for key, record in legacy_keyed.items():
+                    if key not in current_keyed:
+                        self.differences.append(f"{path}[{key[0]!r}]: missing")
+                    else:
+                        self.compare(record, current_keyed[key], f"{path}[{key[0]!r}]")
+                extra = len(current_keyed.keys() - legacy_keyed.keys())
+                if extra:
+                    self.differences.append(f"{path}: {extra} records only in current")
+            else:
+                if len(legacy) != len(current):
+                    self.differences.append(f"{path}: {len(legacy)} items → {len(current)}")
+                for i, (a, b) in enumerate(zip(legacy, current)):
+                    self.compare(a, b, f"{path}[{i}]")
+        elif legacy != current:
+            self.differences.append(f"{path}: {legacy!r} → {current!r}")
+
+
+def _by_name(records: List[Any]) -> Optional[Dict[Tuple[str, int], Any]]:
+    """Vendor-like records keyed by (name, occurrence), or None for other lists"""
+    if not records or not all(isinstance(r, dict) and 'name' in r for r in records):
+        return None
+    keyed: Dict[Tuple[str, int], Any] = {}
+    seen: Dict[str, int] = {}
+    for record in records:
+        n = seen.get(record['name'], 0)
+        seen[record['name']] = n + 1
+        keyed[record['name'], n] = record
+    return keyed
+
+
+def compare_artifact(legacy_path: Path, current_path: Path, abs_tol: float, rel_tol: float) -> Dict[str, Any]:
+    if not current_path.exists():
+        return {'status': 'missing', 'differences': [f"{current_path.name} not written"]}
+    if legacy_path.read_bytes() == current_path.read_bytes():
+        return {'status': 'identical', 'differences': []}
+
+    with open(legacy_path, 'r') as f:
+        legacy = json.load(f)
+    with open(current_path, 'r') as f:
+        current = json.load(f)
+    comparison = Comparison(abs_tol, rel_tol)
+    comparison.compare(legacy, current)
+    return {
+        'status': 'different' if comparison.differences else 'equivalent',
+        'max_deviation': comparison.max_deviation,
+        'added_fields': sorted(comparison.added_fields),
+        'differences': comparison.differences,
+    }
+
+
+def artifacts_of(output_dir: Path) -> List[str]:
+    lenses = sorted(p.name for p in output_dir.glob("lens_*.json") if p.name.count('.') == 1)
+    return [name for name in ARTIFACTS if (output_dir / name).exists()] + lenses
+
+
+def check_dataset(name: str, dataset: Path, legacy_scripts: Path, current_args: List[str],
+                  abs_tol: float, rel_tol: float, seed: int) -> Dict[str, Any]:
+    """Cold and classified runs of both sides on one dataset"""
+    print(f"\n📦 {name} ({dataset})")
+    result: Dict[str, Any] = {'dataset': str(dataset), 'phases': {}}
+
+    with tempfile.TemporaryDirectory(prefix='ledger-equivalence-') as tmp:
+        legacy = Side('legacy', legacy_scripts, Path(tmp) / 'legacy', [])
+        current = Side('current', SCRIPTS_DIR, Path(tmp) / 'current', current_args)
+        for side in (legacy, current):
+            side.use_dataset(dataset)
+
+        for phase in ('cold', 'classified'):
+            if phase == 'classified':
+                for side in (legacy, current):
+                    seed_classifications(side.work, seed)
+            seconds = {side.name: side.run() for side in (legacy, current)}
+            speedup = seconds['legacy'] / seconds['current'] if seconds['current'] else float('inf')
+            print(f"   {phase:<11} legacy {seconds['legacy']:>7.2f}s   current {seconds['current']:>7.2f}s   "
+                  f"({speedup:.2f}x)")
+
+            artifacts = {}
+            for artifact in artifacts_of(legacy.output_dir):
+                outcome = compare_artifact(legacy.output_dir / artifact, current.output_dir / artifact,
+                                           abs_tol, rel_tol)
+                artifacts[artifact] = outcome
+                status = outcome['status']
+                if status == 'equivalent':
+                    status += f" (max |Δ| {outcome['max_deviation']:.4g}"
+                    if outcome['added_fields']:
+                        status += f", +{len(outcome['added_fields'])} new fields"
+                    status += ")"
+                marker = '✅' if outcome['status'] in ('identical', 'equivalent') else '❌'
+                print(f"      {marker} {artifact:<28} {status}")
+                for difference in outcome['differences'][:MAX_SHOWN]:
+                    print(f"           {difference}")
+                hidden = len(outcome['differences']) - MAX_SHOWN
+                if hidden > 0:
+                    print(f"           ... and {hidden} more")
+            result['phases'][phase] = {'seconds': seconds, 'speedup': speedup, 'artifacts': artifacts}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the working tree's pipeline output against a legacy revision")
+    parser.add_argument('--legacy', metavar='REF', help="Git revision to compare against (default: the root commit)")
+    parser.add_argument('--scale', action='append', choices=sorted(SCALES),
+                        help="Synthetic dataset scale (repeatable, default: 10k)")
+    parser.add_argument('--dataset', action='append', type=Path, default=[], metavar='DIR',
+                        help="Directory of real Public Accounts CSVs to check as well (repeatable)")
+    parser.add_argument('--no-fixture', action='store_true', help="Skip the built-in format-quirks fixture")
+    parser.add_argument('--current-arg', action='append', default=[], metavar='ARG',
+                        help="Extra process_data.py argument for the current side, e.g. "
+                             "--current-arg=--memory-budget=64 (repeatable)")
+    parser.add_argument('--abs-tol', type=float, default=0.005,
+                        help="Dollar difference always tolerated (default: 0.005, half a cent)")
+    parser.add_argument('--rel-tol', type=float, default=1e-9,
+                        help="Relative difference tolerated (default: 1e-9)")
+    parser.add_argument('--seed', type=int, default=SEED, help="Seed for the classifications given to both sides")
+    parser.add_argument('--json', type=Path, metavar='PATH', help="Also write the full results as JSON")
+    args = parser.parse_args()
+
+    legacy_ref = args.legacy or root_commit()
+    with tempfile.TemporaryDirectory(prefix='ledger-legacy-') as tmp:
+        legacy_scripts = export_scripts(legacy_ref, Path(tmp))
+        print(f"🔁 Comparing the working tree against {legacy_ref}")
+        if args.current_arg:
+            print(f"   Current side runs with: {' '.join(args.current_arg)}")
+
+        datasets: List[Tuple[str, Path]] = [
+            (f"synthetic-{scale}", generate_dataset(SCALES[scale], DATASET_DIR / scale))
+            for scale in (args.scale or ['10k'])
+        ]
+        fixture_dir = Path(tmp) / 'fixture'
+        if not args.no_fixture:
+            datasets.append(('fixture', write_fixture(fixture_dir)))
+        datasets.extend((path.name, path) for path in args.dataset)
+
+        results = {
+            name: check_dataset(name, dataset, legacy_scripts, args.current_arg,
+                                args.abs_tol, args.rel_tol, args.seed)
+            for name, dataset in datasets
+        }
+
+    failed = [
+        f"{name}/{phase}/{artifact}"
+        for name, result in results.items()
+        for phase, phase_result in result['phases'].items()
+        for artifact, outcome in phase_result['artifacts'].items()
+        if outcome['status'] not in ('identical', 'equivalent')
+    ]
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump({'legacy': legacy_ref, 'current_args': args.current_arg, 'results': results}, f, indent=2)
+
+    if failed:
+        print(f"\n❌ {len(failed)} artifact(s) differ: {', '.join(failed)}")
+        sys.exit(1)
+    print("\n✅ All artifacts match the legacy pipeline")
+
+
+if __name__ == "__main__":
+    main()
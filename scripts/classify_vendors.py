@@ -9,6 +9,10 @@ import re
 from pathlib import Path
 from typing import Dict, List, Any
 
+from artifact_manifest import republish
+from topk import RANKINGS_FILE, top_k, write_rankings
+from vendor_metrics import assign_ranks, build_rankings, vendor_total
+
 DATA_DIR = Path(__file__).parent.parent / "data" / "processed"
 PUBLIC_DIR = Path(__file__).parent.parent / "public" / "data" / "processed"
 VENDORS_FILE = DATA_DIR / "vendors_master.json"
@@ -196,13 +200,8 @@ def main():
     
     print(f"📊 Classifying {len(vendors)} vendors...")
     
-    # Calculate totals for sorting
-    for vendor in vendors:
-        yearly = vendor.get('yearly_payments', {})
-        vendor['_total_calculated'] = sum(float(amt) for amt in yearly.values() if amt)
-    
-    # Sort by total (descending)
-    vendors_sorted = sorted(vendors, key=lambda v: v.get('_total_calculated', 0), reverse=True)
+    # Top 2000 by total (descending, precomputed by process_data.py)
+    vendors_sorted = top_k(vendors, 2000, key=vendor_total)
     
     # Classify top 2000 vendors (expanded for better coverage)
     classified_count = 0
@@ -228,9 +227,8 @@ def main():
     
     print(f"✅ Classified {classified_count} vendors (out of 2000 reviewed)")
     
-    # Remove internal calculation field
-    for v in vendors:
-        v.pop('_total_calculated', None)
+    # Types and categories changed, so rank_in_type/rank_in_category must follow
+    assign_ranks(vendors)
     
     # Save updated vendors to both locations
     print("💾 Saving classified vendors...")
@@ -261,6 +259,15 @@ def main():
         with open(VENDORS_FILE, 'w') as f:
             json.dump(full_vendors, f, indent=2)
     
+    # Prebuilt rankings carry vendor types too; the reports read them first
+    rankings = build_rankings(vendors)
+    for rankings_dir in (PUBLIC_DIR, DATA_DIR):
+        if rankings_dir.exists():
+            write_rankings(rankings_dir, rankings)
+    
+    # The site loads data through manifest.json, so point it at the new copies
+    republish(PUBLIC_DIR, [PUBLIC_VENDORS_FILE, PUBLIC_DIR / RANKINGS_FILE])
+    
     print(f"✅ Saved {len(vendors)} vendors")
     
     # Print summary
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the processed ledger for ad-hoc analysis
+Writes the payment rows, the vendor and ministry dimensions and the system
+and ministry composition as tables that pandas, DuckDB or Arrow can scan
+column by column. Payments are partitioned by fiscal year in Hive layout
+(payments/fiscal_year=2021/part-00000.parquet), so a query on one year only
+reads that year's files. Tables are Parquet with dictionary-encoded strings
+when pyarrow is installed, and plain CSV in the same layout otherwise.
+
+Layout:
+    payments/fiscal_year=<year>/part-<n>   vendor_id, vendor_name_raw, ministry, amount_paid
+    vendors                                one row per vendor with its derived metrics
+    ministries                             one row per ministry with row, vendor and dollar totals
+                                           (scaled and flagged as estimates in sampled builds)
+    system_composition                     as system_composition.json
+    ministry_composition                   as ministry_composition.json
+"""
+
+import csv
+import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+from change_feed import COMPOSITION_FIELDS
+from ledger_cube import LedgerCube
+from vendor_metrics import derive_metrics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # CSV fallback
+    pa = pq = None
+
+PAYMENTS_DIR = "payments"
+PARTITION_KEY = "fiscal_year"
+TABLES = ['vendors', 'ministries', 'system_composition', 'ministry_composition']
+
+Columns = Dict[str, List[Any]]
+
+
+class ParquetTables:
+    """Parquet files with string columns dictionary-encoded"""
+
+    format = 'parquet'
+    suffix = '.parquet'
+
+    def write(self, path: Path, columns: Columns):
+        arrays = {}
+        for name, values in columns.items():
+            array = pa.array(values)
+            if pa.types.is_string(array.type):
+                array = array.dictionary_encode()
+            arrays[name] = array
+        pq.write_table(pa.table(arrays), path, use_dictionary=True)
+
+
+class CsvTables:
+    """CSV files with a header row (empty cells are nulls)"""
+
+    format = 'csv'
+    suffix = '.csv'
+
+    def write(self, path: Path, columns: Columns):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(zip(*columns.values()))
+
+
+def table_writer(table_format: str = 'auto'):
+    """Parquet if pyarrow is installed (or required), else CSV"""
+    if table_format == 'parquet' or (table_format == 'auto' and pa is not None):
+        if pa is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        return ParquetTables()
+    return CsvTables()
+
+
+def records_to_columns(records: Iterable[Dict[str, Any]]) -> Columns:
+    """Column lists for records, over the union of their keys (missing keys are null)"""
+    records = list(records)
+    names = list(dict.fromkeys(key for record in records for key in record))
+    return {name: [record.get(name) for record in records] for name in names}
+
+
+class ColumnarExport:
+    """Writes one run's tables into an export directory, replacing the last export"""
+
+    def __init__(self, directory: Path, table_format: str = 'auto'):
+        self.directory = directory
+        self.writer = table_writer(table_format)
+        self.rows: Dict[str, int] = defaultdict(int)
+        self.files: List[Path] = []
+        # Per-ministry tallies gathered while the payments go by
+        self._ministry_rows: Dict[str, int] = defaultdict(int)
+        self._ministry_vendors: Dict[str, Set[str]] = defaultdict(set)
+
+    def clear(self):
+        """Remove the previous export's tables (in either format), and nothing else"""
+        shutil.rmtree(self.directory / PAYMENTS_DIR, ignore_errors=True)
+        for name in TABLES:
+            for suffix in (ParquetTables.suffix, CsvTables.suffix):
+                (self.directory / f"{name}{suffix}").unlink(missing_ok=True)
+
+    def write_table(self, path: Path, columns: Columns):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.writer.write(path, columns)
+        self.files.append(path)
+
+    def write_payments(self, payments, name_to_id: Dict[str, str],
+                       normalize: Callable[[str], str], first_year: int):
+        """
+        One file per partition and fiscal year, so out-of-core runs export
+        one partition at a time. Rows are kept in input order within a file.
+        """
+        for part, partition in enumerate(payments.partitions()):
+            vendor_of = [name_to_id.get(normalize(raw_name)) for raw_name in partition.vendor_names.values]
+            names, ministries = partition.vendor_names.values, partition.ministries.values
+            by_year: Dict[int, Columns] = {}
+
+            for year, name_id, ministry_id, amount in partition.columns():
+                vendor_id = vendor_of[name_id]
+                if vendor_id is None or year < first_year:
+                    continue
+                columns = by_year.get(year)
+                if columns is None:
+                    columns = by_year[year] = {
+                        'vendor_id': [], 'vendor_name_raw': [], 'ministry': [], 'amount_paid': [],
+                    }
+                ministry = ministries[ministry_id]
+                columns['vendor_id'].append(vendor_id)
+                columns['vendor_name_raw'].append(names[name_id])
+                columns['ministry'].append(ministry)
+                columns['amount_paid'].append(amount)
+                self._ministry_rows[ministry] += 1
+                self._ministry_vendors[ministry].add(vendor_id)
+
+            for year, columns in sorted(by_year.items()):
+                path = (self.directory / PAYMENTS_DIR / f"{PARTITION_KEY}={year}"
+                        / f"part-{part:05d}{self.writer.suffix}")
+                self.write_table(path, columns)
+                self.rows['payments'] += len(columns['amount_paid'])
+            del by_year
+
+    def write_vendors(self, vendors: List[Dict[str, Any]]):
+        records = []
+        for vendor in vendors:
+            metrics = derive_metrics(vendor.get('yearly_payments', {}))
+            records.append({
+                'vendor_id': vendor['vendor_id'],
+                'name': vendor.get('name'),
+                'type': vendor.get('type'),
+                'category': vendor.get('category'),
+                'first_year': metrics['first_year'],
+                'last_year': metrics['last_year'],
+                'total_paid': metrics['total_paid'],
+                'total_since_2018': metrics['total_since_2018'],
+                'growth_rate': metrics['growth_rate'],
+                'cagr': metrics['cagr'],
+            })
+        self.write_records('vendors', records)
+
+    def write_ministries(self, cube: Dict[str, Any]):
+        """
+        Ministry dimension; dollar totals are the cube's exact roll-ups. In a
+        sampled build the cube is scaled up, so the row and vendor counts are
+        scaled by the same fraction and every row is flagged as an estimate.
+        """
+        lookup = LedgerCube(cube)
+        fraction = cube.get('sample_fraction') if cube.get('estimated') else None
+        records = []
+        for ministry in lookup.members['ministry']:
+            by_year = lookup.series('year', ministry=ministry)
+            paid_years = [year for year, amount in by_year.items() if amount]
+            record = {
+                'ministry': ministry,
+                'first_year': min(paid_years, default=None),
+                'last_year': max(paid_years, default=None),
+                'payments': self._ministry_rows.get(ministry, 0),
+                'vendors': len(self._ministry_vendors.get(ministry, ())),
+                'total_paid': lookup.value(ministry=ministry),
+            }
+            if fraction is not None:
+                record['payments'] = round(record['payments'] / fraction)
+                record['vendors'] = round(record['vendors'] / fraction)
+                record['estimated'] = True
+                record['sample_fraction'] = fraction
+            records.append(record)
+        self.write_records('ministries', records)
+
+    def write_composition(self, name: str, records: List[Dict[str, Any]]):
+        # Totals with no payments are int 0 in the JSON; keep the columns float
+        self.write_records(name, [
+            {**record, **{field: float(record[field]) for field in COMPOSITION_FIELDS}}
+            for record in records
+        ])
+
+    def write_records(self, name: str, records: List[Dict[str, Any]]):
+        self.write_table(self.directory / f"{name}{self.writer.suffix}", records_to_columns(records))
+        self.rows[name] += len(records)
+
+    def bytes_written(self) -> int:
+        return sum(path.stat().st_size for path in self.files)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'directory': str(self.directory),
+            'format': self.writer.format,
+            'files': len(self.files),
+            'rows': dict(self.rows),
+            'bytes': self.bytes_written(),
+        }
+
+
+def export_columnar(directory: Path, payments, name_to_id: Dict[str, str], normalize: Callable[[str], str],
+                    aggregated: Dict[str, Any], first_year: int, table_format: str = 'auto') -> Dict[str, Any]:
+    """
+    Export payments (one partition at a time), the vendor and ministry
+    dimensions and the composition tables; returns a summary of what was written
+    """
+    export = ColumnarExport(directory, table_format)
+    export.clear()
+    export.write_payments(payments, name_to_id, normalize, first_year)
+    export.write_vendors(aggregated['vendors_master'])
+    export.write_ministries(aggregated['ledger_cube'])
+    export.write_composition('system_composition', aggregated['system_composition'])
+    export.write_composition('ministry_composition', aggregated['ministry_composition'])
+    return export.summary()
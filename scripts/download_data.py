@@ -4,16 +4,15 @@ Download Ontario Public Accounts data
 Attempts to fetch data from Ontario's open data portal
 """
 
-import requests
+import argparse
 import csv
 import json
 from pathlib import Path
 import time
-from typing import Optional
+from typing import List, Optional
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 RAW_DIR = DATA_DIR / "raw"
-RAW_DIR.mkdir(parents=True, exist_ok=True)
 
 # Ontario Open Data Portal URLs
 ONTARIO_DATA_BASE = "https://data.ontario.ca"
@@ -21,6 +20,8 @@ PUBLIC_ACCOUNTS_DATASET = "https://data.ontario.ca/en/dataset/public-accounts-mi
 
 def download_file(url: str, output_path: Path) -> bool:
     """Download a file from URL"""
+    # requests is only needed online; --sample-only works without it
+    import requests
     try:
         print(f"📥 Downloading {url}...")
         response = requests.get(url, timeout=30, stream=True)
@@ -38,6 +39,7 @@ def download_file(url: str, output_path: Path) -> bool:
 
 def find_resource_urls(dataset_url: str) -> list:
     """Try to find resource URLs from dataset page"""
+    import requests
     try:
         response = requests.get(dataset_url, timeout=30)
         response.raise_for_status()
@@ -225,7 +227,17 @@ def create_sample_data():
     print(f"   Saved to {output_file}")
     return True
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Download Ontario Public Accounts data (or generate sample data)")
+    parser.add_argument('--sample-only', action='store_true',
+                        help="Only write the generated sample dataset (offline)")
+    args = parser.parse_args(argv)
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+    
+    if args.sample_only:
+        create_sample_data()
+        return
+    
     print("🔄 Attempting to download Ontario Public Accounts data...")
     print()
     
@@ -4,7 +4,6 @@ Fetch real Ontario Public Accounts data from the open data portal
 Uses the CKAN API to find and download resources
 """
 
-import requests
 import json
 import csv
 from pathlib import Path
@@ -13,7 +12,6 @@ from urllib.parse import urljoin
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 RAW_DIR = DATA_DIR / "raw"
-RAW_DIR.mkdir(parents=True, exist_ok=True)
 
 # Ontario Open Data Portal CKAN API
 CKAN_BASE = "https://data.ontario.ca"
@@ -21,6 +19,8 @@ CKAN_API = f"{CKAN_BASE}/api/3/action"
 
 def search_datasets(query: str, limit: int = 10):
     """Search for datasets using CKAN API"""
+    # requests is imported on use, so importing this module stays offline-safe
+    import requests
     try:
         url = f"{CKAN_API}/package_search"
         params = {
@@ -36,6 +36,7 @@ def search_datasets(query: str, limit: int = 10):
 
 def get_dataset_resources(package_id: str):
     """Get all resources for a dataset"""
+    import requests
     try:
         url = f"{CKAN_API}/package_show"
         params = {'id': package_id}
@@ -49,6 +50,7 @@ def get_dataset_resources(package_id: str):
 
 def download_resource(resource_url: str, output_path: Path):
     """Download a resource file"""
+    import requests
     try:
         print(f"  📥 Downloading {resource_url}...")
         response = requests.get(resource_url, timeout=60, stream=True)
@@ -114,6 +116,7 @@ def fetch_public_accounts_data():
     return downloaded
 
 def main():
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
     print("🔄 Fetching Ontario Public Accounts data from open data portal...")
     print()
     
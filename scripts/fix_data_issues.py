@@ -9,12 +9,9 @@ Fix data classification issues identified in audit
 import json
 from pathlib import Path
 
-# Load vendors
-vendors_file = Path('public/data/processed/vendors_master.json')
-with open(vendors_file, 'r') as f:
-    vendors = json.load(f)
-
-print("Fixing data classification issues...\n")
+from artifact_manifest import republish
+from topk import RANKINGS_FILE, write_rankings
+from vendor_metrics import assign_ranks, build_rankings, vendor_total
 
 # 1. Payment processors and pass-throughs (should be unknown)
 payment_processors = [
@@ -67,98 +64,123 @@ aggregate_categories = [
     'Interest Payment',
 ]
 
-fixes_applied = {
-    'payment_processors': 0,
-    'public_institutions': 0,
-    'trusts': 0,
-    'aggregates': 0,
-}
-
-for vendor in vendors:
-    name = vendor.get('name', '')
-    original_type = vendor.get('type', 'unknown')
-    
-    # Check for payment processors (fix regardless of current type if it's a known processor)
-    if any(proc.lower() in name.lower() for proc in payment_processors):
-        if vendor.get('type') != 'unknown':
-            vendor['type'] = 'unknown'
-            vendor['category'] = None
-            vendor['exclusion_reason'] = 'Payment processor/pass-through - funds flow through to end recipients'
-            fixes_applied['payment_processors'] += 1
-            print(f"✅ Fixed payment processor: {name}")
-            print(f"   Changed from {original_type} to unknown")
-    
-    # Check for misclassified public institutions
-    if any(inst.lower() in name.lower() for inst in public_institutions):
-        if vendor.get('type') == 'for_profit':
-            vendor['type'] = 'public'
-            vendor['category'] = None
-            vendor['exclusion_reason'] = 'Public institution (hospital/municipality/crown corporation)'
-            fixes_applied['public_institutions'] += 1
-            print(f"✅ Fixed public institution: {name}")
-            print(f"   Changed from {original_type} to public")
-    
-    # Check for trusts (usually pass-throughs, but be careful)
-    if any(pattern in name for pattern in trust_patterns):
-        # Only fix if it's a large amount and classified as for-profit
-        total = sum(vendor.get('yearly_payments', {}).values())
-        if vendor.get('type') == 'for_profit' and total > 10_000_000:
-            # Check if it's a known trust that should be excluded
-            trust_keywords = ['pension', 'student loan', 'settlement', 'litigation', 'remediation']
-            if any(kw in name.lower() for kw in trust_keywords):
-                vendor['type'] = 'unknown'
-                vendor['category'] = None
-                vendor['exclusion_reason'] = 'Trust/pass-through entity - funds flow through to beneficiaries'
-                fixes_applied['trusts'] += 1
-                print(f"✅ Fixed trust/pass-through: {name}")
-                print(f"   Changed from {original_type} to unknown")
-    
-    # Check for aggregate categories
-    if any(agg.lower() in name.lower() for agg in aggregate_categories):
-        if vendor.get('type') != 'unknown':
-            vendor['type'] = 'unknown'
-            vendor['category'] = None
-            vendor['exclusion_reason'] = 'Aggregate category - not a specific vendor'
-            fixes_applied['aggregates'] += 1
-            print(f"✅ Fixed aggregate category: {name}")
-            print(f"   Changed from {original_type} to unknown")
-
-# Save updated vendors
-with open(vendors_file, 'w') as f:
-    json.dump(vendors, f, indent=2)
-
-# Also update data/processed version
-data_vendors_file = Path('data/processed/vendors_master.json')
-if data_vendors_file.exists():
-    with open(data_vendors_file, 'r') as f:
-        data_vendors = json.load(f)
-    
-    for vendor in data_vendors:
+
+def main():
+    # Load vendors
+    vendors_file = Path('public/data/processed/vendors_master.json')
+    with open(vendors_file, 'r') as f:
+        vendors = json.load(f)
+
+    print("Fixing data classification issues...\n")
+
+    fixes_applied = {
+        'payment_processors': 0,
+        'public_institutions': 0,
+        'trusts': 0,
+        'aggregates': 0,
+    }
+
+    for vendor in vendors:
         name = vendor.get('name', '')
+        original_type = vendor.get('type', 'unknown')
         
-        # Apply same fixes
+        # Check for payment processors (fix regardless of current type if it's a known processor)
         if any(proc.lower() in name.lower() for proc in payment_processors):
-            if vendor.get('vendor_type') == 'for_profit' or vendor.get('type') == 'for_profit':
-                vendor['vendor_type'] = 'unknown'
+            if vendor.get('type') != 'unknown':
                 vendor['type'] = 'unknown'
-                vendor['service_category'] = None
                 vendor['category'] = None
+                vendor['exclusion_reason'] = 'Payment processor/pass-through - funds flow through to end recipients'
+                fixes_applied['payment_processors'] += 1
+                print(f"✅ Fixed payment processor: {name}")
+                print(f"   Changed from {original_type} to unknown")
         
+        # Check for misclassified public institutions
         if any(inst.lower() in name.lower() for inst in public_institutions):
-            if vendor.get('vendor_type') == 'for_profit' or vendor.get('type') == 'for_profit':
-                vendor['vendor_type'] = 'public'
+            if vendor.get('type') == 'for_profit':
                 vendor['type'] = 'public'
-                vendor['service_category'] = None
                 vendor['category'] = None
-    
-    with open(data_vendors_file, 'w') as f:
-        json.dump(data_vendors, f, indent=2)
-
-print(f"\n{'='*80}")
-print("FIXES APPLIED:")
-print(f"  Payment processors: {fixes_applied['payment_processors']}")
-print(f"  Public institutions: {fixes_applied['public_institutions']}")
-print(f"  Trusts/pass-throughs: {fixes_applied['trusts']}")
-print(f"  Aggregate categories: {fixes_applied['aggregates']}")
-print(f"{'='*80}")
-print("\n⚠️  Next step: Re-run process_data.py to regenerate system_composition.json")
+                vendor['exclusion_reason'] = 'Public institution (hospital/municipality/crown corporation)'
+                fixes_applied['public_institutions'] += 1
+                print(f"✅ Fixed public institution: {name}")
+                print(f"   Changed from {original_type} to public")
+        
+        # Check for trusts (usually pass-throughs, but be careful)
+        if any(pattern in name for pattern in trust_patterns):
+            # Only fix if it's a large amount and classified as for-profit
+            total = vendor_total(vendor)
+            if vendor.get('type') == 'for_profit' and total > 10_000_000:
+                # Check if it's a known trust that should be excluded
+                trust_keywords = ['pension', 'student loan', 'settlement', 'litigation', 'remediation']
+                if any(kw in name.lower() for kw in trust_keywords):
+                    vendor['type'] = 'unknown'
+                    vendor['category'] = None
+                    vendor['exclusion_reason'] = 'Trust/pass-through entity - funds flow through to beneficiaries'
+                    fixes_applied['trusts'] += 1
+                    print(f"✅ Fixed trust/pass-through: {name}")
+                    print(f"   Changed from {original_type} to unknown")
+        
+        # Check for aggregate categories
+        if any(agg.lower() in name.lower() for agg in aggregate_categories):
+            if vendor.get('type') != 'unknown':
+                vendor['type'] = 'unknown'
+                vendor['category'] = None
+                vendor['exclusion_reason'] = 'Aggregate category - not a specific vendor'
+                fixes_applied['aggregates'] += 1
+                print(f"✅ Fixed aggregate category: {name}")
+                print(f"   Changed from {original_type} to unknown")
+
+    # Types changed, so rank_in_type/rank_in_category must follow
+    assign_ranks(vendors)
+
+    # Save updated vendors
+    with open(vendors_file, 'w') as f:
+        json.dump(vendors, f, indent=2)
+
+    # Also update data/processed version
+    data_vendors_file = Path('data/processed/vendors_master.json')
+    if data_vendors_file.exists():
+        with open(data_vendors_file, 'r') as f:
+            data_vendors = json.load(f)
+        
+        for vendor in data_vendors:
+            name = vendor.get('name', '')
+            
+            # Apply same fixes
+            if any(proc.lower() in name.lower() for proc in payment_processors):
+                if vendor.get('vendor_type') == 'for_profit' or vendor.get('type') == 'for_profit':
+                    vendor['vendor_type'] = 'unknown'
+                    vendor['type'] = 'unknown'
+                    vendor['service_category'] = None
+                    vendor['category'] = None
+            
+            if any(inst.lower() in name.lower() for inst in public_institutions):
+                if vendor.get('vendor_type') == 'for_profit' or vendor.get('type') == 'for_profit':
+                    vendor['vendor_type'] = 'public'
+                    vendor['type'] = 'public'
+                    vendor['service_category'] = None
+                    vendor['category'] = None
+        
+        with open(data_vendors_file, 'w') as f:
+            json.dump(data_vendors, f, indent=2)
+
+    # Prebuilt rankings carry vendor types too; the reports read them first
+    rankings = build_rankings(vendors)
+    for rankings_dir in (vendors_file.parent, data_vendors_file.parent):
+        if rankings_dir.exists():
+            write_rankings(rankings_dir, rankings)
+
+    # The site loads data through manifest.json, so point it at the new copies
+    republish(vendors_file.parent, [vendors_file, vendors_file.parent / RANKINGS_FILE])
+
+    print(f"\n{'='*80}")
+    print("FIXES APPLIED:")
+    print(f"  Payment processors: {fixes_applied['payment_processors']}")
+    print(f"  Public institutions: {fixes_applied['public_institutions']}")
+    print(f"  Trusts/pass-throughs: {fixes_applied['trusts']}")
+    print(f"  Aggregate categories: {fixes_applied['aggregates']}")
+    print(f"{'='*80}")
+    print("\n⚠️  Next step: Re-run process_data.py to regenerate system_composition.json")
+
+
+if __name__ == "__main__":
+    main()
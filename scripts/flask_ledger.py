@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Production Flask serving for the prebuilt Ledger (out/)
+Replaces the serve_ledger route in FLASK_ROUTE_*.txt. The ledger directory is
+resolved once when the route is registered, and out/ is indexed in memory
+with each file's size, ETag, content type and any precompressed .br/.gz
+variants, so a request is a dict lookup rather than a series of os.path
+checks. Conditional requests (If-None-Match) get a 304.
+
+Usage in app.py:
+    from flask_ledger import register_ledger
+    register_ledger(app)                                  # /ledger, /ledger/<path>
+
+Precompress a build before deploying (brotli only if the package is installed):
+    python scripts/flask_ledger.py precompress out/
+"""
+
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from flask import Flask, Response, jsonify, request
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+except ImportError:  # .br variants are only served if they were built elsewhere
+    brotli = None
+
+# Where the built ledger may live, in order (local checkout, then Render)
+DEFAULT_CANDIDATES = [
+    Path(__file__).parent.parent / 'out',
+    Path('/opt/render/project/src/ledger/out'),
+]
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Files at most this size are held in memory; larger ones are read per request
+MEMORY_MAX_BYTES = 512 * 1024
+
+# Precompress only text-like files at least this size
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_SUFFIXES = {'.html', '.js', '.css', '.json', '.svg', '.txt', '.xml', '.map'}
+
+# Names that change whenever their content does: Next.js build assets and the
+# content-hashed data artifacts listed in manifest.json
+IMMUTABLE_PATH = re.compile(r'(^|/)_next/static/|\.[0-9a-f]{12}\.json$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+
+class StaticFile:
+    """One servable file: its encoded variants and their precomputed headers"""
+
+    __slots__ = ('content_type', 'cache_control', 'variants')
+
+    def __init__(self, path: Path, relative: str):
+        self.content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type in ('application/javascript', 'application/json'):
+            self.content_type += '; charset=utf-8'
+        self.cache_control = IMMUTABLE_CACHE if IMMUTABLE_PATH.search(relative) else REVALIDATE_CACHE
+        # encoding (None = identity) -> (path, size, etag, bytes if held in memory)
+        self.variants: Dict[Optional[str], tuple] = {None: self._variant(path, None)}
+        for encoding, suffix in ENCODINGS:
+            encoded = path.with_name(path.name + suffix)
+            if encoded.is_file():
+                self.variants[encoding] = self._variant(encoded, encoding)
+
+    @staticmethod
+    def _variant(path: Path, encoding: Optional[str]) -> tuple:
+        content = path.read_bytes()
+        etag = hashlib.blake2b(content, digest_size=12).hexdigest()
+        if encoding:
+            etag = f"{etag}-{encoding}"
+        return path, len(content), etag, content if len(content) <= MEMORY_MAX_BYTES else None
+
+    def variant(self, accept_encodings) -> tuple:
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and accept_encodings[encoding]:
+                return encoding, self.variants[encoding]
+        return None, self.variants[None]
+
+
+class LedgerIndex:
+    """In-memory index of a built ledger directory, keyed by URL path"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.files: Dict[str, StaticFile] = {}
+        self.refresh()
+
+    def refresh(self):
+        """Re-scan the directory (after a rebuild)"""
+        files = {}
+        encoded_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(encoded_suffixes):
+                    continue
+                path = Path(root) / name
+                relative = path.relative_to(self.directory).as_posix()
+                files[relative] = StaticFile(path, relative)
+        self.files = files
+
+    def lookup(self, path: str) -> Optional[StaticFile]:
+        """
+        File for a URL path: exact, then Next.js export forms (page.html,
+        page/index.html), then index.html for client-side routing
+        """
+        path = path.strip('/') or 'index.html'
+        files = self.files
+        return (files.get(path) or files.get(f"{path}.html")
+                or files.get(f"{path}/index.html") or files.get('index.html'))
+
+
+def resolve_ledger_dir(candidates: Sequence[Path] = DEFAULT_CANDIDATES) -> Optional[Path]:
+    """First candidate that is a built ledger (has index.html)"""
+    for candidate in candidates:
+        if (Path(candidate) / 'index.html').is_file():
+            return Path(candidate)
+    return None
+
+
+def serve(index: LedgerIndex, path: str) -> Response:
+    static = index.lookup(path)
+    if static is None:
+        return jsonify({"error": "File not found", "requested_path": path}), 404
+
+    encoding, (file_path, size, etag, content) = static.variant(request.accept_encodings)
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': static.cache_control,
+        'Vary': 'Accept-Encoding',
+    }
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    headers['Content-Length'] = str(size)
+    if content is None:
+        content = wrap_file(request.environ, open(file_path, 'rb'))
+    return Response(content, headers=headers, content_type=static.content_type,
+                    direct_passthrough=True)
+
+
+def register_ledger(app: Flask, candidates: Sequence[Path] = DEFAULT_CANDIDATES,
+                    url_prefix: str = '/ledger') -> Optional[LedgerIndex]:
+    """
+    Add the ledger routes to an app. The directory is resolved and indexed
+    here, once; if no build is found the routes answer 503 until restart.
+    """
+    ledger_dir = resolve_ledger_dir(candidates)
+    index = LedgerIndex(ledger_dir) if ledger_dir else None
+
+    def serve_ledger(path: str = ''):
+        if index is None:
+            return jsonify({
+                "error": "Ledger not built yet",
+                "checked_paths": [str(c) for c in candidates],
+            }), 503
+        return serve(index, path)
+
+    app.add_url_rule(url_prefix, 'serve_ledger', serve_ledger)
+    app.add_url_rule(f"{url_prefix}/", 'serve_ledger', serve_ledger)
+    app.add_url_rule(f"{url_prefix}/<path:path>", 'serve_ledger', serve_ledger)
+    return index
+
+
+def precompress(directory: Path) -> List[Path]:
+    """Write .gz (and .br, if brotli is installed) next to compressible files"""
+    outputs = [('.gz', lambda c: gzip.compress(c, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        outputs.append(('.br', lambda c: brotli.compress(c, quality=11)))
+
+    written = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = Path(root) / name
+            if path.suffix not in COMPRESSIBLE_SUFFIXES or path.stat().st_size < COMPRESS_MIN_BYTES:
+                continue
+            content = path.read_bytes()
+            for suffix, compress in outputs:
+                encoded = compress(content)
+                if len(encoded) >= len(content):
+                    continue
+                target = path.with_name(name + suffix)
+                target.write_bytes(encoded)
+                written.append(target)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve or precompress the built Ledger")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    precompress_parser = subparsers.add_parser('precompress', help="Write .gz/.br variants for a build")
+    precompress_parser.add_argument('directory', type=Path, help="Built ledger directory (e.g. out/)")
+
+    serve_parser = subparsers.add_parser('serve', help="Serve a build locally with the production route")
+    serve_parser.add_argument('directory', type=Path, help="Built ledger directory (e.g. out/)")
+    serve_parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.command == 'precompress':
+        written = precompress(args.directory)
+        print(f"✅ Wrote {len(written)} precompressed files"
+              + ("" if brotli is not None else " (gzip only; install brotli for .br)"))
+    else:
+        app = Flask(__name__)
+        if register_ledger(app, [args.directory]) is None:
+            parser.error(f"no index.html in {args.directory}")
+        app.run(port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Duplicate detection for ingesting Public Accounts CSVs
+The same fiscal year can land in data/raw/ twice (French and English
+variants, or a re-download under another name), which would double-count
+its payments. Byte-identical files are caught before parsing by comparing
+sizes, then digests of the files whose sizes match.
+
+Other files are grouped by fiscal year and file family. The family is the
+volume or part marker in the file name (part 2, vol. II, tome 1), or none.
+Files of one year and family are alternative copies of one document, and a
+row is dropped if an earlier copy already had it. Files of different
+families (split volumes) complement each other and are never compared, so
+payments that genuinely repeat across volumes are kept. The report says
+how many dollars the drops removed.
+
+Rows are fingerprinted by normalized vendor and amount, without the
+ministry: ministry names differ between the French and English copies,
+and there is no translation table to match them on. Matches are counted
+per fingerprint, so within a copy the vendor and amount repeated under two
+ministries is still only dropped as often as the earlier copy had it. The
+catch is that two files of one year and family whose contents really
+differ (no volume marker, different documents) can lose rows that match on
+vendor and amount alone.
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from artifact_manifest import file_sha256
+
+# Row fingerprints are 64-bit hashes, stored in sorted array('Q') per file.
+# They come from hash(), which is only stable within a process; that's all
+# that's needed, since fingerprints never outlive the ingest run.
+FINGERPRINT_MASK = (1 << 64) - 1
+
+# Volume or part markers in a file name, in English or French
+VOLUME_MARKER = re.compile(r'(?:^|[^a-z])(?:part|partie|vol|volume|tome|book|livre)[\s._-]*(\d+|[ivx]+)(?![a-z0-9])')
+ROMAN = {'i': 1, 'ii': 2, 'iii': 3, 'iv': 4, 'v': 5, 'vi': 6, 'vii': 7, 'viii': 8, 'ix': 9, 'x': 10}
+
+
+def file_family(name: str) -> str:
+    """Volume of a file name ('2' for payments_2019-20_part2.csv), or '' for a whole document"""
+    match = VOLUME_MARKER.search(name.lower())
+    if match is None:
+        return ''
+    number = match.group(1)
+    return str(ROMAN.get(number, number)).lstrip('0') or '0'
+
+
+def identical_files(files: List[Path]) -> Dict[Path, Path]:
+    """{copy: original} for byte-identical files (the first by name is the original)"""
+    by_size: Dict[int, List[Path]] = defaultdict(list)
+    for path in files:
+        by_size[path.stat().st_size].append(path)
+
+    copies = {}
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        originals: Dict[str, Path] = {}
+        for path in sorted(same_size):
+            digest = file_sha256(path)
+            if digest in originals:
+                copies[path] = originals[digest]
+            else:
+                originals[digest] = path
+    return copies
+
+
+class FileRows:
+    """
+    Fingerprints of one file's rows, checked against the earlier files of
+    its fiscal year and family. Counts are compared per fingerprint, so a
+    payment that legitimately appears twice in one file is only dropped as
+    often as some earlier file already had it.
+    """
+
+    def __init__(self, owner: 'DuplicateFilter', path: Path, group: tuple):
+        self.owner = owner
+        self.path = path
+        self.group = group
+        self.earlier: List[array] = owner.seen[group]
+        self.fingerprints = array('Q')
+        self._normalize = owner.normalize
+        self._matched: Dict[int, int] = {}
+
+    def duplicate(self, vendor_name: str, amount: float) -> bool:
+        """Record a row, returning True if it duplicates an earlier file's row"""
+        fingerprint = hash((self._normalize(vendor_name), amount)) & FINGERPRINT_MASK
+        self.fingerprints.append(fingerprint)
+        if not self.earlier:
+            return False
+
+        earlier_count = 0
+        for fingerprints in self.earlier:
+            i = bisect_left(fingerprints, fingerprint)
+            if i < len(fingerprints) and fingerprints[i] == fingerprint:
+                earlier_count = max(earlier_count, bisect_right(fingerprints, fingerprint, i) - i)
+        if not earlier_count:
+            return False
+        matched = self._matched.get(fingerprint, 0)
+        if matched >= earlier_count:
+            return False
+        self._matched[fingerprint] = matched + 1
+        self.owner.drop(self.path, amount)
+        return True
+
+    def close(self):
+        self.earlier.append(array('Q', sorted(self.fingerprints)))
+
+
+class DuplicateFilter:
+    """Plans and tallies duplicate checks for one ingest run"""
+
+    def __init__(self, files: List[Path], fiscal_year_of: Callable[[str], Optional[int]],
+                 normalize: Callable[[str], str]):
+        self.normalize = normalize
+        self.copies = identical_files(files)
+        groups = Counter(
+            (fiscal_year_of(path.name), file_family(path.name)) for path in files if path not in self.copies
+        )
+        # (fiscal year, family) claimed by more than one file
+        self.shared_groups = {group for group, count in groups.items() if group[0] and count > 1}
+        self.seen: Dict[tuple, List[array]] = defaultdict(list)
+        self.accepted: Dict[Path, tuple] = {}
+        self.skipped: List[Dict[str, Any]] = []
+        self.rows: Dict[str, int] = defaultdict(int)
+        self.dollars: Dict[str, float] = defaultdict(float)
+
+    def copy_of(self, path: Path) -> Optional[Path]:
+        """The file this one is a byte-identical copy of, if any"""
+        return self.copies.get(path)
+
+    def skip(self, path: Path, original: Path):
+        # A copy would have added every row of the original that passed the
+        # filters, including any the original itself lost as duplicates
+        rows, dollars = self.accepted.get(original, (0, 0.0))
+        rows += self.rows.get(original.name, 0)
+        dollars += self.dollars.get(original.name, 0.0)
+        self.skipped.append({
+            'file': path.name,
+            'identical_to': original.name,
+            'rows': rows,
+            'dollars': round(dollars, 2),
+        })
+
+    def rows_for(self, path: Path, fiscal_year: int) -> Optional[FileRows]:
+        """Row checker for a file, or None when no other file has its fiscal year and family"""
+        group = (fiscal_year, file_family(path.name))
+        if group not in self.shared_groups:
+            return None
+        return FileRows(self, path, group)
+
+    def drop(self, path: Path, amount: float):
+        self.rows[path.name] += 1
+        self.dollars[path.name] += amount
+
+    def accept(self, path: Path, rows: int, dollars: float):
+        self.accepted[path] = (rows, dollars)
+
+    def rows_dropped(self) -> int:
+        return sum(self.rows.values()) + sum(s['rows'] for s in self.skipped)
+
+    def dollars_dropped(self) -> float:
+        return sum(self.dollars.values()) + sum(s['dollars'] for s in self.skipped)
+
+    def summary(self) -> Dict[str, Any]:
+        """Identical files skipped, and duplicate rows dropped per file"""
+        return {
+            'identical_files': self.skipped,
+            'shared_fiscal_years': sorted({year for year, _ in self.shared_groups}),
+            'duplicate_rows': {
+                name: {'rows': self.rows[name], 'dollars': round(self.dollars[name], 2)}
+                for name in sorted(self.rows)
+            },
+            'rows_dropped': self.rows_dropped(),
+            'dollars_dropped': round(self.dollars_dropped(), 2),
+        }
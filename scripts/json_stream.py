@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Record-at-a-time JSON artifacts
+write_json_records() encodes an iterable of records straight to a file and
+produces exactly the bytes json.dump(list(records), f, indent=2) would, so
+artifacts don't change and records can be generated as they're written.
+iter_json_records() reads a JSON array (or NDJSON) back one record at a
+time from fixed-size chunks, so memory stays flat whatever the file size.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO, Union
+
+# Characters read per refill; a record larger than this grows the read
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DELIMITERS = ' \t\n\r,]'
+
+
+def write_json_records(f: TextIO, records: Iterable[Any]):
+    """Write records as an indent=2 JSON array, one record at a time"""
+    first = True
+    for record in records:
+        f.write('[\n  ' if first else ',\n  ')
+        # JSON strings can't contain raw newlines, so every newline is indentation
+        f.write(json.dumps(record, indent=2).replace('\n', '\n  '))
+        first = False
+    f.write('[]' if first else '\n]')
+
+
+def iter_json_records(source: Union[str, Path]) -> Iterator[Any]:
+    """Records of a JSON array file, or of an NDJSON file (one record per line)"""
+    with open(source, 'r', encoding='utf-8') as f:
+        head = f.read(CHUNK_SIZE)
+        start = _WHITESPACE.match(head).end()
+        while start == len(head):
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            head += chunk
+            start = _WHITESPACE.match(head, start).end()
+        if head[start] == '[':
+            yield from _iter_array(f, head, start + 1)
+        else:
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _iter_array(f: TextIO, buffer: str, pos: int) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    eof = False
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if char == ']':
+                return
+            if char == ',':
+                pos += 1
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number cut off by the chunk edge still decodes ("12." as 12),
+                # so a record only counts once the delimiter after it is in view
+                if end < len(buffer) and buffer[end] in _DELIMITERS:
+                    yield record
+                    pos = end
+                    continue
+                if eof:
+                    raise ValueError(f"Malformed JSON array in {f.name} at offset {end}")
+        elif eof:
+            raise ValueError(f"Unterminated JSON array in {f.name}")
+
+        # Need more input: drop what's been consumed and read the next chunk
+        chunk = f.read(max(CHUNK_SIZE, len(buffer) - pos))
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
@@ -0,0 +1,69 @@
+"""
+The Ledger data pipeline as an importable package
+The pipeline modules live flat in scripts/ and import each other by name, so
+this package puts scripts/ on sys.path and exposes them as lazy attributes:
+nothing is imported until it is used.
+
+    import ledger
+    ledger.ledger_cube.LedgerCube(cube).value(ministry='Health')
+    ledger.process_data.aggregate_payments(payments, name_to_id)
+
+Importing a pipeline module has no side effects (no directories created, no
+files read or written); the work is in each module's main(), which the
+`ledger` command line dispatches to (python scripts/ledger --help).
+"""
+
+import importlib
+import os
+import sys
+
+# os.path rather than pathlib: pathlib alone would double `import ledger`
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+# Pipeline modules reachable as ledger.<name> (benchmarks and dev tools aren't listed)
+MODULES = [
+    'artifact_manifest',
+    'change_feed',
+    'classify_vendors',
+    'columnar_export',
+    'download_data',
+    'fetch_ontario_data',
+    'fix_data_issues',
+    'flask_ledger',
+    'ingest_dedup',
+    'json_stream',
+    'ledger_cube',
+    'ledger_index',
+    'ledger_records',
+    'ledger_server',
+    'ledger_store',
+    'lenses',
+    'pipeline_metrics',
+    'pipeline_watch',
+    'process_data',
+    'row_filters',
+    'show_drift',
+    'show_top_vendors',
+    'spill',
+    'topk',
+    'vendor_ids',
+    'vendor_metrics',
+]
+
+
+def __getattr__(name: str):
+    if name in MODULES:
+        module = importlib.import_module(name)
+        globals()[name] = module
+        return module
+    if name == 'main':
+        from ledger.cli import main
+        return main
+    raise AttributeError(f"module 'ledger' has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(MODULES) | {'main'})
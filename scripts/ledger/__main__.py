@@ -0,0 +1,12 @@
+"""Entry point for python scripts/ledger and python -m ledger"""
+
+import os
+import sys
+
+if not __package__:
+    # Run as a directory (python scripts/ledger): make the package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger.cli import main
+
+main()
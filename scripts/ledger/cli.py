@@ -0,0 +1,117 @@
+"""
+`ledger` command line: one entry point for the pipeline scripts
+
+    python scripts/ledger ingest [process_data.py options]
+    python scripts/ledger classify
+    python scripts/ledger fix
+    python scripts/ledger report [drift|top] [--store [DB]] [--server URL]
+    python scripts/ledger fetch [--portal | --sample-only]
+
+Each command imports only the module it runs, so a report starts without
+loading the ingest pipeline, and offline commands never import requests.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+from typing import List, Optional
+
+from ledger import SCRIPTS_DIR
+
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+
+# Command -> one-line help
+COMMANDS = {
+    'ingest': "Ingest raw CSVs and build the processed datasets (process_data.py)",
+    'classify': "Classify vendors by name patterns (classify_vendors.py)",
+    'fix': "Apply the audit fix-ups to vendor classifications (fix_data_issues.py)",
+    'report': "Print the drift report (default) or the top vendors: report [drift|top]",
+    'fetch': "Download Public Accounts CSVs into data/raw (fetch_ontario_data.py)",
+}
+
+# report <name> -> module whose main() prints it
+REPORTS = {
+    'drift': 'show_drift',
+    'top': 'show_top_vendors',
+}
+
+
+def run_main(module_name: str, argv: Optional[List[str]] = None):
+    module = importlib.import_module(module_name)
+    if argv is None:
+        module.main()
+    else:
+        module.main(argv)
+
+
+def no_arguments(command: str, argv: List[str]):
+    if argv:
+        sys.exit(f"ledger {command}: unexpected arguments: {' '.join(argv)}")
+
+
+def fetch(argv: List[str]):
+    parser = argparse.ArgumentParser(prog='ledger fetch', description=COMMANDS['fetch'])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--portal', action='store_true',
+                        help="Scrape the dataset page instead of using the CKAN API, then write "
+                             "sample data (download_data.py)")
+    source.add_argument('--sample-only', action='store_true',
+                        help="Only generate the sample dataset (offline, no requests needed)")
+    args = parser.parse_args(argv)
+    if args.sample_only:
+        run_main('download_data', ['--sample-only'])
+        return
+    # Both online sources download with requests
+    if importlib.util.find_spec('requests') is None:
+        sys.exit("ledger fetch needs requests (pip install requests); --sample-only works offline")
+    if args.portal:
+        run_main('download_data', [])
+    else:
+        run_main('fetch_ontario_data')
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='ledger',
+        description="The Ledger data pipeline",
+        epilog="commands:\n" + "\n".join(f"  {name:<10} {text}" for name, text in COMMANDS.items())
+               + "\n\nArguments after the command go to it, e.g. ledger ingest --help",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('command', nargs='?', choices=COMMANDS, metavar='command', help="One of the commands below")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        sys.exit(2)
+    command, rest = args.command, args.args
+
+    # Scripts build their usage line from argv[0]
+    sys.argv[0] = f"ledger {command}"
+
+    if command == 'ingest':
+        run_main('process_data', rest)
+    elif command == 'classify':
+        no_arguments(command, rest)
+        run_main('classify_vendors')
+    elif command == 'fix':
+        no_arguments(command, rest)
+        # fix_data_issues.py works on paths relative to the repo root
+        os.chdir(ROOT_DIR)
+        run_main('fix_data_issues')
+    elif command == 'report':
+        report = 'drift'
+        if rest and not rest[0].startswith('-'):
+            report, rest = rest[0], rest[1:]
+        if report not in REPORTS:
+            sys.exit(f"ledger report: unknown report {report!r} (choose from {', '.join(REPORTS)})")
+        sys.argv[0] = f"ledger report {report}"
+        run_main(REPORTS[report], rest)
+    elif command == 'fetch':
+        fetch(rest)
+
+
+if __name__ == "__main__":
+    main()
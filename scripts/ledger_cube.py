@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Aggregate cube over vendor type x service category x ministry x fiscal year
+Built in the aggregation pass from exact per-cell partial sums, then rolled
+up along every combination of dimensions. Each dimension gets an extra ALL
+member, so any slice or drill-down (e.g. for-profit staffing paid by Health
+in 2021, or all categories for one ministry across years) is a single index
+into one dense array instead of a scan over vendors.
+
+ledger_cube.json layout:
+    dimensions  ["type", "category", "ministry", "year"]
+    members     {dimension: [member, ...]}; ALL is index len(members)
+    shape       [len(members) + 1 per dimension]
+    values      row-major amounts, the last dimension varying fastest
+"""
+
+from itertools import product
+from math import fsum
+from typing import Any, Dict, List, Optional
+
+CUBE_FILE = "ledger_cube.json"
+
+DIMENSIONS = ['type', 'category', 'ministry', 'year']
+
+# Placeholder for "rolled up over this dimension" in lookups
+ALL = '*'
+
+# Vendor types with their own system_composition column; the rest are unknown
+COMPOSITION_TYPES = ['public', 'non_profit', 'for_profit']
+
+
+def _member_order(value):
+    return (value is None, value)
+
+
+def build_cube(cells: Dict[tuple, List[float]]) -> Dict[str, Any]:
+    """
+    Cube from {(type, category, ministry, year): exact partial sums}. Every
+    roll-up cell is the fsum of the partials beneath it, so roll-ups are
+    exact rather than sums of rounded cells.
+    """
+    members = [
+        sorted({key[d] for key in cells}, key=_member_order)
+        for d in range(len(DIMENSIONS))
+    ]
+    positions = [{member: i for i, member in enumerate(dim)} for dim in members]
+    shape = [len(dim) + 1 for dim in members]
+    strides = [1] * len(shape)
+    for d in range(len(shape) - 2, -1, -1):
+        strides[d] = strides[d + 1] * shape[d + 1]
+
+    partials: List[List[float]] = [[] for _ in range(strides[0] * shape[0])]
+    for key, cell_partials in cells.items():
+        # Each base cell lands in 2^4 cells: itself and every roll-up over it
+        coordinates = [(positions[d][key[d]], shape[d] - 1) for d in range(len(DIMENSIONS))]
+        for point in product(*coordinates):
+            partials[sum(i * s for i, s in zip(point, strides))].extend(cell_partials)
+
+    return {
+        'dimensions': DIMENSIONS,
+        'members': {name: dim for name, dim in zip(DIMENSIONS, members)},
+        'shape': shape,
+        'values': [fsum(p) for p in partials],
+    }
+
+
+class LedgerCube:
+    """Constant-time lookups into an exported cube"""
+
+    def __init__(self, cube: Dict[str, Any]):
+        self.dimensions: List[str] = cube['dimensions']
+        self.members: Dict[str, List[Any]] = cube['members']
+        self.values: List[float] = cube['values']
+        shape = cube['shape']
+        self._positions = [
+            {member: i for i, member in enumerate(self.members[name])} for name in self.dimensions
+        ]
+        self._all = [size - 1 for size in shape]
+        self._strides = [1] * len(shape)
+        for d in range(len(shape) - 2, -1, -1):
+            self._strides[d] = self._strides[d + 1] * shape[d + 1]
+
+    def _index(self, coordinates: Dict[str, Any]) -> Optional[int]:
+        index = 0
+        for d, name in enumerate(self.dimensions):
+            member = coordinates.get(name, ALL)
+            if member == ALL:
+                position = self._all[d]
+            else:
+                position = self._positions[d].get(member)
+                if position is None:
+                    return None
+            index += position * self._strides[d]
+        return index
+
+    def value(self, **coordinates) -> float:
+        """Total for the given members (dimensions left out are rolled up)"""
+        index = self._index(coordinates)
+        return 0.0 if index is None else self.values[index]
+
+    def series(self, dimension: str, **coordinates) -> Dict[Any, float]:
+        """Totals for each member of one dimension, e.g. by year for a ministry"""
+        return {
+            member: self.value(**{**coordinates, dimension: member})
+            for member in self.members[dimension]
+        }
+
+    def composition(self) -> List[Dict[str, Any]]:
+        """Per-year totals by vendor type, in the system_composition.json layout"""
+        other_types = [t for t in self.members['type'] if t not in COMPOSITION_TYPES]
+        composition = []
+        for year in sorted(self.members['year']):
+            entry: Dict[str, Any] = {'year': year}
+            for vendor_type in COMPOSITION_TYPES:
+                entry[f'{vendor_type}_total'] = self.value(type=vendor_type, year=year)
+            entry['unknown_total'] = fsum(self.value(type=t, year=year) for t in other_types)
+            composition.append(entry)
+        return composition
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+In-memory index over the processed ledger
+Vendors are summarized and ranked once at load, with a pre-ranked list per
+(type, category) view, so drift, top-N, per-vendor and per-lens queries are
+lookups. Served over HTTP by ledger_server.py; scan_vendors() and
+build_drift() also back the JSON fallbacks of the show_* reports. Kept free
+of networking imports so quick reports start fast.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from artifact_manifest import HASHED_NAME
+from json_stream import iter_json_records
+from vendor_metrics import derive_metrics
+
+PUBLIC_DIR = Path(__file__).parent.parent / "public" / "data" / "processed"
+
+# How often (seconds) a request may trigger a check for rebuilt artifacts
+RELOAD_CHECK_INTERVAL = 1.0
+
+TYPE_COLUMNS = ['public_total', 'non_profit_total', 'for_profit_total', 'unknown_total']
+
+
+def vendor_summary(vendor: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Total, active years and first-to-last growth for one vendor record, taken
+    from the metrics precomputed by process_data.py when present
+    """
+    if 'total_paid' in vendor:
+        metrics = vendor
+    else:
+        metrics = derive_metrics(vendor.get('yearly_payments', {}))
+    return {
+        'vendor_id': vendor.get('vendor_id'),
+        'name': vendor.get('name', vendor.get('vendor_name_normalized', 'Unknown')),
+        'type': vendor.get('type', vendor.get('vendor_type', 'unknown')),
+        'category': vendor.get('category', vendor.get('service_category')),
+        'total': metrics['total_paid'],
+        'first_year': metrics['first_year'],
+        'last_year': metrics['last_year'],
+        'growth': metrics['growth_rate'],
+        'yearly_payments': vendor.get('yearly_payments', {}),
+    }
+
+
+def scan_vendors(path: Path, n: int, vendor_type: Optional[str] = None) -> tuple:
+    """
+    Top n vendor summaries (optionally of one type) and the vendor count per
+    type, streamed from a vendor master so only the running top n is held
+    """
+    from topk import top_k
+
+    type_counts: Dict[str, int] = {}
+    if not path.exists():
+        return [], type_counts
+
+    def summaries():
+        for record in iter_json_records(path):
+            summary = vendor_summary(record)
+            type_counts[summary['type']] = type_counts.get(summary['type'], 0) + 1
+            if vendor_type is None or summary['type'] == vendor_type:
+                yield summary
+
+    return top_k(summaries(), n, key=lambda v: v['total']), type_counts
+
+
+def build_drift(composition: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-year totals with for-profit share, plus first-to-last growth by type"""
+    years = []
+    for entry in composition:
+        total = sum(entry.get(col, 0) for col in TYPE_COLUMNS)
+        years.append(dict(entry, total=total,
+                          for_profit_pct=(entry.get('for_profit_total', 0) / total * 100) if total > 0 else 0))
+
+    growth = {}
+    if composition:
+        first, last = composition[0], composition[-1]
+        for col in ('public_total', 'for_profit_total'):
+            first_amt, last_amt = first.get(col, 0), last.get(col, 0)
+            growth[col] = {
+                'first': first_amt,
+                'last': last_amt,
+                'pct': ((last_amt - first_amt) / first_amt * 100) if first_amt > 0 else None,
+            }
+    return {'years': years, 'growth': growth}
+
+
+def _non_negative(params: Dict[str, str], name: str, default: int) -> int:
+    """Integer query parameter; ValueError (a 400 from the servers) unless it is >= 0"""
+    value = params.get(name)
+    if value is None:
+        return default
+    if not value.isdigit():
+        raise ValueError(f"{name} must be a non-negative integer, got {value!r}")
+    return int(value)
+
+
+class LedgerIndex:
+    """
+    The processed ledger held in memory. Vendors are ranked by total once at
+    load, and every (type, category) view keeps its own pre-ranked list, so
+    top-N queries are O(N) slices.
+    """
+
+    def __init__(self, data_dir: Path = PUBLIC_DIR):
+        self.data_dir = Path(data_dir)
+        self._mtimes: Dict[str, float] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    def _artifact_mtimes(self) -> Dict[str, float]:
+        mtimes = {}
+        for path in self.data_dir.glob('*.json'):
+            try:
+                mtimes[path.name] = path.stat().st_mtime
+            except OSError:
+                continue
+        return mtimes
+
+    def _read(self, name: str, default: Any) -> Any:
+        path = self.data_dir / name
+        if not path.exists():
+            return default
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _records(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Records of a JSON array artifact, one at a time (none if it's missing)"""
+        path = self.data_dir / name
+        if path.exists():
+            yield from iter_json_records(path)
+
+    def load(self):
+        start = time.perf_counter()
+        mtimes = self._artifact_mtimes()
+
+        composition = sorted(self._read('system_composition.json', []), key=lambda x: x['year'])
+        # Summarize while streaming, so the raw records are never all in memory
+        vendors = [vendor_summary(v) for v in self._records('vendors_master.json')]
+        vendors.sort(key=lambda v: v['total'], reverse=True)
+
+        by_id = {v['vendor_id']: v for v in vendors if v['vendor_id']}
+        ranked: Dict[tuple, List[Dict[str, Any]]] = {(None, None): vendors}
+        for v in vendors:
+            # Appending in global rank order keeps every index list ranked
+            keys = {(v['type'], None), (None, v['category']), (v['type'], v['category'])}
+            keys.discard((None, None))
+            for key in keys:
+                ranked.setdefault(key, []).append(v)
+
+        lenses = {}
+        for path in self.data_dir.glob('lens_*.json'):
+            if HASHED_NAME.match(path.name):
+                continue  # Content-hashed copy, possibly from the previous generation
+            with open(path, 'r') as f:
+                lens = json.load(f)
+            lenses[lens.get('lens', path.stem[len('lens_'):])] = lens
+
+        # Swap everything in at once so concurrent readers never see a partial load
+        self.composition = composition
+        self.vendors_by_id = by_id
+        self.ranked = ranked
+        self.lenses = lenses
+        self.drift_summary = build_drift(composition)
+        self._mtimes = mtimes
+        self.load_seconds = time.perf_counter() - start
+
+    def reload_if_changed(self):
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._last_check = now
+            if self._artifact_mtimes() != self._mtimes:
+                self.load()
+
+    # -- Queries ---------------------------------------------------------
+
+    def drift(self) -> Dict[str, Any]:
+        return self.drift_summary
+
+    def top(self, n: int = 50, vendor_type: Optional[str] = None, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.ranked.get((vendor_type, category), [])[:n]
+
+    def vendor(self, vendor_id: str) -> Optional[Dict[str, Any]]:
+        return self.vendors_by_id.get(vendor_id)
+
+    def lens(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.lenses.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        all_vendors = self.ranked[(None, None)]
+        return {
+            'vendors': len(all_vendors),
+            'unclassified': len(self.ranked.get(('unknown', None), [])),
+            'years': [c['year'] for c in self.composition],
+            'lenses': sorted(self.lenses),
+            'load_seconds': round(self.load_seconds, 4),
+        }
+
+    def query(self, path: str, params: Dict[str, str]) -> Optional[Any]:
+        """Dispatch a request path to a query; None means not found"""
+        parts = [p for p in path.split('/') if p]
+        if parts == ['drift']:
+            return self.drift()
+        if parts == ['top']:
+            return self.top(_non_negative(params, 'n', 50), params.get('type'), params.get('category'))
+        if parts == ['stats']:
+            return self.stats()
+        if len(parts) == 2 and parts[0] == 'vendor':
+            return self.vendor(parts[1])
+        if len(parts) == 2 and parts[0] == 'lens':
+            return self.lens(parts[1])
+        return None
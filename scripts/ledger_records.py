@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compact payment records for The Ledger
+Payments are held column-wise in typed arrays, with vendor names and
+ministries stored once in string tables and referenced by small-int ids,
+instead of one dict per row.
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+
+class StringTable:
+    """Interns strings to dense ids (0, 1, 2, ...) in first-seen order"""
+
+    __slots__ = ('_ids', '_values')
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def id_of(self, value: str) -> int:
+        ids = self._ids
+        return ids.setdefault(value, len(ids))
+
+    @property
+    def values(self) -> List[str]:
+        """Strings indexed by id (dict order is id order)"""
+        if len(self._values) != len(self._ids):
+            self._values = list(self._ids)
+        return self._values
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.values[string_id]
+
+
+class PaymentTable:
+    """
+    Payment rows as parallel columns: fiscal year (uint16), vendor name id and
+    ministry id (uint32) and amount (float64), about 18 bytes per row.
+    """
+
+    __slots__ = ('fiscal_years', 'name_ids', 'ministry_ids', 'amounts', 'vendor_names', 'ministries')
+
+    def __init__(self, vendor_names: Optional[StringTable] = None, ministries: Optional[StringTable] = None):
+        self.fiscal_years = array('H')
+        self.name_ids = array('I')
+        self.ministry_ids = array('I')
+        self.amounts = array('d')
+        # String tables can be shared between tables (e.g. spill partitions)
+        self.vendor_names = vendor_names if vendor_names is not None else StringTable()
+        self.ministries = ministries if ministries is not None else StringTable()
+
+    def append(self, fiscal_year: int, vendor_name_raw: str, amount_paid: float, ministry: str):
+        self.fiscal_years.append(fiscal_year)
+        self.name_ids.append(self.vendor_names.id_of(vendor_name_raw))
+        self.ministry_ids.append(self.ministries.id_of(ministry))
+        self.amounts.append(amount_paid)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def partitions(self) -> Iterator['PaymentTable']:
+        """The table itself, as the single partition of an in-memory run"""
+        yield self
+
+    def columns(self) -> Iterator[tuple]:
+        """(fiscal_year, vendor name id, ministry id, amount) per row, without building records"""
+        return zip(self.fiscal_years, self.name_ids, self.ministry_ids, self.amounts)
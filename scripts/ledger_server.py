@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Local query service over the processed ledger
+Loads the processed JSON once into indexed in-memory structures (totals,
+growth, type/category indexes, pre-ranked vendor lists) and answers drift,
+top-N, per-vendor and per-lens queries over local HTTP or a Unix socket.
+
+Usage:
+    python scripts/ledger_server.py                        # http://127.0.0.1:8765
+    python scripts/ledger_server.py --socket /tmp/ledger.sock
+    LEDGER_SERVER=http://127.0.0.1:8765 python scripts/show_drift.py
+
+Endpoints:
+    GET /drift                          composition by year + growth summary
+    GET /top?n=50&type=for_profit&category=staffing
+    GET /vendor/<vendor_id>
+    GET /lens/<name>
+    GET /stats
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from ledger_index import PUBLIC_DIR, LedgerIndex
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class LedgerRequestHandler(BaseHTTPRequestHandler):
+    index: LedgerIndex = None
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.index.reload_if_changed()
+        try:
+            result = self.index.query(url.path, params)
+        except ValueError as e:
+            return self._send(400, {'error': str(e)})
+        if result is None:
+            return self._send(404, {'error': f"Not found: {url.path}"})
+        self._send(200, result)
+
+    def _send(self, status: int, payload: Any):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        if os.environ.get('LEDGER_SERVER_LOG'):
+            super().log_message(format, *args)
+
+
+class UnixLedgerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def query_server(server: str, path: str, params: Optional[Dict[str, Any]] = None, timeout: float = 2.0) -> Any:
+    """
+    Query a running ledger server. `server` is an http://host:port URL or
+    unix:/path/to/socket. Raises OSError if the server is unreachable,
+    LookupError if it answers with an error status and ValueError if the
+    body is not JSON.
+    """
+    query = urlencode({k: v for k, v in (params or {}).items() if v is not None})
+    target = f"{path}?{query}" if query else path
+
+    if server.startswith('unix:'):
+        conn = _UnixHTTPConnection(server[len('unix:'):], timeout)
+    else:
+        url = urlparse(server)
+        conn = http.client.HTTPConnection(url.hostname, url.port or DEFAULT_PORT, timeout=timeout)
+    try:
+        conn.request('GET', target)
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        conn.close()
+    if response.status != 200:
+        error = payload.get('error') if isinstance(payload, dict) else None
+        raise LookupError(error or f"HTTP {response.status}")
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve ledger queries from memory")
+    parser.add_argument('--data-dir', type=Path, default=PUBLIC_DIR,
+                        help="Directory with the processed JSON artifacts (default: public/data/processed)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', type=Path, help="Listen on a Unix socket instead of TCP")
+    args = parser.parse_args()
+
+    LedgerRequestHandler.index = LedgerIndex(args.data_dir)
+    stats = LedgerRequestHandler.index.stats()
+    print(f"📚 Loaded {stats['vendors']} vendors, {len(stats['years'])} years in {stats['load_seconds']:.3f}s")
+
+    if args.socket:
+        if args.socket.exists():
+            args.socket.unlink()
+        server = UnixLedgerServer(str(args.socket), LedgerRequestHandler)
+        print(f"🚀 Serving ledger queries on unix:{args.socket}")
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), LedgerRequestHandler)
+        print(f"🚀 Serving ledger queries on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and args.socket.exists():
+            args.socket.unlink()
+
+
+if __name__ == "__main__":
+    main()
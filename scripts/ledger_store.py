@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+SQLite store for The Ledger
+Optional system of record for the pipeline: payments, vendors, aliases,
+classifications and overrides live in indexed tables, and system composition,
+the public vendor master and the top-vendor lists are produced by SQL
+aggregation. Lenses are still built in Python from the vendor master.
+"""
+
+import sqlite3
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ledger_records import PaymentTable
+
+DEFAULT_STORE = Path(__file__).parent.parent / "data" / "processed" / "ledger.db"
+
+# Composition and lenses only cover 2018 onwards (when Doug Ford took office)
+FIRST_YEAR = 2018
+
+BATCH_SIZE = 50_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS payments (
+    fiscal_year     INTEGER NOT NULL,
+    vendor_id       TEXT NOT NULL,
+    vendor_name_raw TEXT NOT NULL,
+    ministry        TEXT NOT NULL,
+    amount_paid     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_payments_vendor_year ON payments (vendor_id, fiscal_year);
+CREATE INDEX IF NOT EXISTS idx_payments_year ON payments (fiscal_year);
+
+CREATE TABLE IF NOT EXISTS vendors (
+    vendor_id              TEXT PRIMARY KEY,
+    vendor_name_normalized TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS aliases (
+    vendor_id TEXT NOT NULL,
+    alias     TEXT NOT NULL,
+    PRIMARY KEY (vendor_id, alias)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS classifications (
+    vendor_id        TEXT PRIMARY KEY,
+    name             TEXT,
+    vendor_type      TEXT NOT NULL DEFAULT 'unknown',
+    service_category TEXT,
+    confidence       TEXT,
+    evidence_note    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_classifications_type ON classifications (vendor_type);
+CREATE INDEX IF NOT EXISTS idx_classifications_category ON classifications (service_category);
+
+CREATE TABLE IF NOT EXISTS overrides (
+    vendor_id        TEXT PRIMARY KEY,
+    vendor_type      TEXT NOT NULL,
+    service_category TEXT,
+    exclusion_reason TEXT NOT NULL
+);
+
+-- Materialized vendor x year totals, rebuilt from payments after each load
+CREATE TABLE IF NOT EXISTS vendor_year_totals (
+    vendor_id   TEXT NOT NULL,
+    fiscal_year INTEGER NOT NULL,
+    total_paid  REAL NOT NULL,
+    PRIMARY KEY (vendor_id, fiscal_year)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_vendor_year_totals_year ON vendor_year_totals (fiscal_year);
+
+-- Effective classification: fix-up overrides win over heuristic classifications
+CREATE VIEW IF NOT EXISTS vendor_classification AS
+SELECT v.vendor_id,
+       COALESCE(c.name, v.vendor_name_normalized) AS name,
+       CASE WHEN o.vendor_id IS NOT NULL THEN o.vendor_type
+            ELSE COALESCE(c.vendor_type, 'unknown') END AS vendor_type,
+       CASE WHEN o.vendor_id IS NOT NULL THEN o.service_category
+            ELSE c.service_category END AS service_category
+FROM vendors v
+LEFT JOIN classifications c ON c.vendor_id = v.vendor_id
+LEFT JOIN overrides o ON o.vendor_id = v.vendor_id;
+"""
+
+
+def _batches(rows: Iterable[Tuple], size: int = BATCH_SIZE) -> Iterator[List[Tuple]]:
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+class LedgerStore:
+    """
+    Thin wrapper around a SQLite connection holding the processed ledger.
+    Read-only stores (for reports) must already exist; they are never created.
+    """
+
+    def __init__(self, path: Path = DEFAULT_STORE, readonly: bool = False):
+        self.path = Path(path)
+        if readonly:
+            if not self.path.is_file():
+                raise FileNotFoundError(f"No SQLite store at {self.path} (build one with process_data.py --store)")
+            self.conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'LedgerStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- Loading ---------------------------------------------------------
+
+    def load_vendors(self, aliases: Dict[str, List[str]], name_to_id: Dict[str, str]):
+        """
+        Replace the vendors with those seen in this run, with their raw-name
+        aliases ({vendor_id: [alias, ...]}). Vendors that left the dataset are
+        dropped, and a name whose ID changed is simply stored under the new one.
+        """
+        seen = set(name_to_id.values())
+        with self.conn:
+            self.conn.execute("DELETE FROM vendors")
+            self.conn.executemany(
+                "INSERT INTO vendors (vendor_id, vendor_name_normalized) VALUES (?, ?) "
+                "ON CONFLICT (vendor_id) DO UPDATE SET vendor_name_normalized = excluded.vendor_name_normalized",
+                ((vid, normalized) for normalized, vid in name_to_id.items()),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO aliases (vendor_id, alias) VALUES (?, ?)",
+                (
+                    (vid, alias)
+                    for vid, names in aliases.items() if vid in seen
+                    for alias in names
+                ),
+            )
+            self.conn.execute("DELETE FROM aliases WHERE vendor_id NOT IN (SELECT vendor_id FROM vendors)")
+
+    def load_payments(self, payments: PaymentTable, name_to_id: Dict[str, str], normalize) -> int:
+        """
+        Replace the payments table with this run's rows (bulk inserts in one
+        transaction) and rebuild the vendor x year totals
+        """
+        # Normalize each distinct raw name once rather than once per row
+        names = payments.vendor_names.values
+        vendor_of = [name_to_id.get(normalize(name)) for name in names]
+        ministries = payments.ministries.values
+
+        def rows():
+            for year, name_id, ministry_id, amount in payments.columns():
+                vendor_id = vendor_of[name_id]
+                if vendor_id:
+                    yield (year, vendor_id, names[name_id], ministries[ministry_id], amount)
+
+        count = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM payments")
+            for batch in _batches(rows()):
+                self.conn.executemany(
+                    "INSERT INTO payments (fiscal_year, vendor_id, vendor_name_raw, ministry, amount_paid) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+                count += len(batch)
+            self.conn.execute("DELETE FROM vendor_year_totals")
+            self.conn.execute(
+                "INSERT INTO vendor_year_totals (vendor_id, fiscal_year, total_paid) "
+                "SELECT vendor_id, fiscal_year, SUM(amount_paid) FROM payments GROUP BY vendor_id, fiscal_year"
+            )
+        return count
+
+    def sync_classifications(self, public_vendors: Iterable[Dict[str, Any]]):
+        """
+        Mirror classifications and fix-up overrides from the public vendor master
+        (written by classify_vendors.py and fix_data_issues.py)
+        """
+        classifications = []
+        overrides = []
+        for v in public_vendors:
+            vid = v.get('vendor_id')
+            if not vid:
+                continue
+            vendor_type = v.get('type', v.get('vendor_type', 'unknown')) or 'unknown'
+            category = v.get('category', v.get('service_category'))
+            classifications.append((
+                vid, v.get('name'), vendor_type, category,
+                v.get('confidence'), v.get('evidence_note'),
+            ))
+            if v.get('exclusion_reason'):
+                overrides.append((vid, vendor_type, category, v['exclusion_reason']))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM classifications")
+            self.conn.execute("DELETE FROM overrides")
+            self.conn.executemany(
+                "INSERT INTO classifications (vendor_id, name, vendor_type, service_category, confidence, evidence_note) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                classifications,
+            )
+            self.conn.executemany(
+                "INSERT INTO overrides (vendor_id, vendor_type, service_category, exclusion_reason) "
+                "VALUES (?, ?, ?, ?)",
+                overrides,
+            )
+
+    # -- Queries ---------------------------------------------------------
+
+    def system_composition(self) -> List[Dict[str, Any]]:
+        """Totals per year by vendor type, in the system_composition.json shape"""
+        columns = {
+            'public': 'public_total',
+            'non_profit': 'non_profit_total',
+            'for_profit': 'for_profit_total',
+        }
+        composition: Dict[int, Dict[str, Any]] = {}
+        rows = self.conn.execute(
+            "SELECT t.fiscal_year, c.vendor_type, SUM(t.total_paid) "
+            "FROM vendor_year_totals t JOIN vendor_classification c ON c.vendor_id = t.vendor_id "
+            "WHERE t.fiscal_year >= ? GROUP BY t.fiscal_year, c.vendor_type ORDER BY t.fiscal_year",
+            (FIRST_YEAR,),
+        )
+        for year, vendor_type, total in rows:
+            entry = composition.setdefault(year, {
+                'year': year,
+                'public_total': 0,
+                'non_profit_total': 0,
+                'for_profit_total': 0,
+                'unknown_total': 0,
+            })
+            entry[columns.get(vendor_type, 'unknown_total')] += total
+        return [composition[year] for year in sorted(composition)]
+
+    def _yearly_payments(self, where: str = "", params: Tuple = ()) -> Dict[str, Dict[str, float]]:
+        yearly: Dict[str, Dict[str, float]] = {}
+        rows = self.conn.execute(
+            "SELECT t.vendor_id, t.fiscal_year, t.total_paid FROM vendor_year_totals t "
+            "JOIN vendor_classification c ON c.vendor_id = t.vendor_id "
+            f"{where} ORDER BY t.vendor_id, t.fiscal_year",
+            params,
+        )
+        for vid, year, total in rows:
+            yearly.setdefault(vid, {})[str(year)] = total
+        return yearly
+
+    def vendors_master(self) -> List[Dict[str, Any]]:
+        """Public vendor master (vendor_id, name, type, category, yearly_payments)"""
+        yearly = self._yearly_payments()
+        rows = self.conn.execute(
+            "SELECT vendor_id, name, vendor_type, service_category FROM vendor_classification ORDER BY vendor_id"
+        )
+        return [
+            {
+                'vendor_id': vid,
+                'name': name,
+                'type': vendor_type,
+                'category': category,
+                'yearly_payments': yearly[vid],
+            }
+            for vid, name, vendor_type, category in rows if vid in yearly
+        ]
+
+    def top_vendors(self, limit: int = 50, vendor_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Vendors ranked by total paid across all years"""
+        where, params = "", ()
+        if vendor_type:
+            where, params = "WHERE c.vendor_type = ?", (vendor_type,)
+        rows = self.conn.execute(
+            "SELECT c.vendor_id, c.name, c.vendor_type, c.service_category, SUM(t.total_paid) AS total "
+            "FROM vendor_year_totals t JOIN vendor_classification c ON c.vendor_id = t.vendor_id "
+            f"{where} GROUP BY c.vendor_id ORDER BY total DESC LIMIT ?",
+            params + (limit,),
+        ).fetchall()
+        yearly = {}
+        if rows:
+            ids = [r[0] for r in rows]
+            placeholders = ','.join('?' * len(ids))
+            for vid, year, total in self.conn.execute(
+                f"SELECT vendor_id, fiscal_year, total_paid FROM vendor_year_totals WHERE vendor_id IN ({placeholders})",
+                ids,
+            ):
+                yearly.setdefault(vid, {})[str(year)] = total
+        return [
+            {
+                'vendor_id': vid,
+                'name': name,
+                'type': vendor_type,
+                'category': category,
+                'total': total,
+                'yearly_payments': yearly.get(vid, {}),
+            }
+            for vid, name, vendor_type, category, total in rows
+        ]
+
+    def unclassified_count(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM vendor_classification WHERE vendor_type = 'unknown'"
+        ).fetchone()[0]
+
+    def vendor_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM vendors").fetchone()[0]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Lens engine for The Ledger
+Lenses are declared as predicates over vendor type, service category and
+paying ministry. Membership is resolved through per-field indexes built once
+over the vendor master, and each lens_*.json artifact is only rebuilt when
+its inputs (the published vendor master and the lens definition) change.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Each lens selects vendors whose fields match every listed value set.
+# Fields: 'categories' (service category), 'types' (vendor type),
+# 'ministries' (paid by any of these ministries).
+LENSES: List[Dict[str, Any]] = [
+    {'name': 'staffing', 'categories': {'staffing'}},
+    {'name': 'consulting', 'categories': {'consulting'}},
+    {'name': 'healthcare', 'categories': {'healthcare_delivery'}},
+    {'name': 'it', 'categories': {'IT'}},
+]
+
+# Lens spec key -> vendor field it constrains
+PREDICATE_FIELDS = {
+    'categories': 'category',
+    'types': 'type',
+    'ministries': 'ministry',
+}
+
+
+def lens_description(spec: Dict[str, Any]) -> str:
+    return spec.get('description') or f"Vendors in the {spec['name']} category"
+
+
+def _spec_key(spec: Dict[str, Any]) -> str:
+    """Stable serialization of a lens definition (sets sorted)"""
+    return json.dumps(
+        {k: sorted(v) if isinstance(v, (set, frozenset, list)) else v for k, v in spec.items()},
+        sort_keys=True,
+    )
+
+
+class LensEngine:
+    """
+    Builds lens vendor lists from public vendor records (vendor_id, name, type,
+    category, yearly_payments). Indexes and lens lists are computed on first use.
+    """
+
+    def __init__(
+        self,
+        vendors: List[Dict[str, Any]],
+        vendor_ministries: Optional[Dict[str, Iterable[str]]] = None,
+        specs: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.vendors = vendors
+        self.vendor_ministries = vendor_ministries or {}
+        self.specs = {spec['name']: spec for spec in (specs or LENSES)}
+        self._index: Optional[Dict[tuple, List[int]]] = None
+        self._built: Dict[str, List[Dict[str, Any]]] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.specs)
+
+    def _build_index(self) -> Dict[tuple, List[int]]:
+        """(field, value) -> positions in the vendor list, in vendor order"""
+        index: Dict[tuple, List[int]] = {}
+        uses_ministries = any('ministries' in spec for spec in self.specs.values())
+        for i, vendor in enumerate(self.vendors):
+            index.setdefault(('category', vendor.get('category')), []).append(i)
+            index.setdefault(('type', vendor.get('type')), []).append(i)
+            if uses_ministries:
+                for ministry in self.vendor_ministries.get(vendor['vendor_id'], ()):
+                    index.setdefault(('ministry', ministry), []).append(i)
+        return index
+
+    def members(self, name: str) -> List[int]:
+        """Positions of the vendors in a lens, in vendor-master order"""
+        if self._index is None:
+            self._index = self._build_index()
+
+        spec = self.specs[name]
+        candidates: Optional[Set[int]] = None
+        for key, field in PREDICATE_FIELDS.items():
+            if key not in spec:
+                continue
+            matched: Set[int] = set()
+            for value in spec[key]:
+                matched.update(self._index.get((field, value), ()))
+            candidates = matched if candidates is None else candidates & matched
+        return sorted(candidates or ())
+
+    def vendors_in(self, name: str) -> List[Dict[str, Any]]:
+        """Lens vendor records (built once per lens)"""
+        if name not in self._built:
+            self._built[name] = [
+                {
+                    'vendor_id': vendor['vendor_id'],
+                    'name': vendor.get('name', ''),
+                    'type': vendor.get('type', 'unknown'),
+                    'category': vendor.get('category'),
+                    'yearly_payments': vendor.get('yearly_payments', {}),
+                }
+                for vendor in (self.vendors[i] for i in self.members(name))
+            ]
+        return self._built[name]
+
+    def artifact(self, name: str) -> Dict[str, Any]:
+        """The lens_<name>.json document"""
+        spec = self.specs[name]
+        return {
+            'lens': name,
+            'vendors': self.vendors_in(name),
+            'description': lens_description(spec),
+            'copy_angle': spec.get('copy_angle', ''),  # To be filled manually
+        }
+
+    def cache_key(self, name: str, input_generation: str) -> str:
+        """Changes whenever the lens definition or the pipeline inputs change"""
+        spec = self.specs[name]
+        digest = hashlib.sha256(input_generation.encode('utf-8'))
+        digest.update(_spec_key(spec).encode('utf-8'))
+        if 'ministries' in spec:
+            digest.update(json.dumps(
+                {vid: sorted(m) for vid, m in self.vendor_ministries.items()}, sort_keys=True,
+            ).encode('utf-8'))
+        return digest.hexdigest()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Run metrics for the data processing pipeline
+Stage timers, counters, cache hit rates, bytes read/written and peak RSS,
+collected into a structured JSON run report. Peak RSS is a process-wide
+high-water mark, so each stage records both the mark when it finished
+(process_peak_rss_mb, cumulative) and how far the stage raised it
+(peak_rss_growth_mb, zero when an earlier stage used more). Stages can optionally be wrapped
+in cProfile/tracemalloc.
+"""
+
+import cProfile
+import json
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+
+def peak_rss_mb() -> float:
+    """Process high-water RSS in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+class RunReport:
+    """
+    Collects per-stage measurements for one pipeline run.
+    Counters and byte totals recorded while a stage is active are attributed
+    to that stage as well as to the run as a whole.
+    """
+
+    def __init__(self, profile_stages: Optional[Set[str]] = None, profile_dir: Optional[Path] = None):
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        self.profile_stages = profile_stages or set()
+        self.profile_dir = profile_dir
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, float] = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.sections: Dict[str, Any] = {}
+        self._caches: Dict[str, Callable[[], Any]] = {}
+        self._active: Optional[Dict[str, Any]] = None
+        self._start = time.perf_counter()
+
+    def watch_cache(self, name: str, cache_info: Callable[[], Any]):
+        """Report hit rates for a functools.lru_cache (pass its cache_info)"""
+        self._caches[name] = cache_info
+
+    def count(self, name: str, n: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        if self._active is not None:
+            counters = self._active['counters']
+            counters[name] = counters.get(name, 0) + n
+
+    def add_section(self, name: str, data: Any):
+        """Attach a structured breakdown (e.g. row exclusions) to the report"""
+        self.sections[name] = data
+
+    def read_bytes(self, n: int):
+        self.bytes_read += n
+        if self._active is not None:
+            self._active['bytes_read'] += n
+
+    def wrote_bytes(self, n: int):
+        self.bytes_written += n
+        if self._active is not None:
+            self._active['bytes_written'] += n
+
+    def _profiled(self, name: str) -> bool:
+        return 'all' in self.profile_stages or name in self.profile_stages
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Time a pipeline stage, profiling it if it was selected with --profile"""
+        entry = {
+            'seconds': 0.0,
+            'counters': {},
+            'bytes_read': 0,
+            'bytes_written': 0,
+            'caches': {},
+        }
+        cache_before = {cache: info() for cache, info in self._caches.items()}
+        rss_before = peak_rss_mb()
+        parent = self._active
+        self._active = entry
+
+        profiler = None
+        if self._profiled(name):
+            profiler = cProfile.Profile()
+            tracemalloc.start()
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] = round(time.perf_counter() - start, 4)
+
+            if profiler is not None:
+                profiler.disable()
+                entry['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+                entry['profile'] = self._dump_profile(name, profiler, tracemalloc.take_snapshot())
+                tracemalloc.stop()
+
+            entry['process_peak_rss_mb'] = peak_rss_mb()
+            entry['peak_rss_growth_mb'] = round(entry['process_peak_rss_mb'] - rss_before, 1)
+            for cache, info in self._caches.items():
+                before, after = cache_before[cache], info()
+                hits, misses = after.hits - before.hits, after.misses - before.misses
+                if hits or misses:
+                    entry['caches'][cache] = {
+                        'hits': hits,
+                        'misses': misses,
+                        'hit_rate': round(hits / (hits + misses), 4),
+                    }
+
+            self.stages[name] = entry
+            self._active = parent
+            if parent is not None:
+                parent['bytes_read'] += entry['bytes_read']
+                parent['bytes_written'] += entry['bytes_written']
+
+    def _dump_profile(self, name: str, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot) -> Dict[str, str]:
+        """Write cProfile stats and the top allocation sites for a stage"""
+        profile_dir = self.profile_dir or Path('.')
+        profile_dir.mkdir(parents=True, exist_ok=True)
+
+        prof_path = profile_dir / f"{name}.prof"
+        profiler.dump_stats(prof_path)
+
+        summary_path = profile_dir / f"{name}.txt"
+        with open(summary_path, 'w') as f:
+            f.write(f"# cProfile: {name} (top 40 by cumulative time)\n")
+            pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(40)
+            f.write(f"\n# tracemalloc: {name} (top 25 allocation sites)\n")
+            for stat in snapshot.statistics('lineno')[:25]:
+                f.write(f"{stat}\n")
+
+        return {'cprofile': str(prof_path), 'summary': str(summary_path)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'started_at': self.started_at,
+            'total_seconds': round(time.perf_counter() - self._start, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'counters': self.counters,
+            'stages': self.stages,
+            **self.sections,
+        }
+
+    def write(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# Report for the run in progress; replaced by start_run()
+_current = RunReport()
+
+
+def current() -> RunReport:
+    return _current
+
+
+def start_run(profile_stages: Optional[Set[str]] = None, profile_dir: Optional[Path] = None) -> RunReport:
+    """Begin a fresh run report (carrying over watched caches)"""
+    global _current
+    caches = _current._caches
+    _current = RunReport(profile_stages, profile_dir)
+    _current._caches.update(caches)
+    return _current
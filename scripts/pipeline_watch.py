@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Watch mode for the data pipeline (process_data.py --watch)
+Monitors the raw CSVs, the classifier tables and the fix-up lists, and on a
+change reruns only the stages downstream of it: a raw file re-ingests, while
+a classifier or fix-up edit reclassifies and re-aggregates the payments kept
+in memory from the last ingest. Uses inotify (via inotify_simple) when it is
+installed and falls back to polling file mtimes.
+
+The pipeline module is passed in by process_data.main() rather than imported
+here: run as a script, process_data is __main__, and importing it by name
+would load a second copy with its own caches and run metrics.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pipeline_metrics
+
+try:
+    import inotify_simple
+except ImportError:  # polling fallback
+    inotify_simple = None
+
+SCRIPTS_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPTS_DIR.parent
+
+# Pipeline stages in order; a change reruns its stage and everything after it
+STAGES = ['ingest', 'classify', 'fix']
+
+# Scripts holding the classifier tables and fix-up lists
+STAGE_SCRIPTS = {
+    'classify': SCRIPTS_DIR / "classify_vendors.py",
+    'fix': SCRIPTS_DIR / "fix_data_issues.py",
+}
+
+# Seconds to wait for a burst of writes (editor save, file copy) to settle
+DEBOUNCE_SECONDS = 0.15
+POLL_INTERVAL = 0.25
+
+
+def stage_of(path: Path, raw_dir: Path) -> Optional[str]:
+    """Which stage a changed file invalidates (None if it isn't an input)"""
+    if path.parent == raw_dir:
+        return 'ingest' if path.suffix.lower() == '.csv' else None
+    for stage, script in STAGE_SCRIPTS.items():
+        if path == script:
+            return stage
+    return None
+
+
+class PollingWatcher:
+    """Detects changes by comparing (mtime, size) snapshots of the inputs"""
+
+    # A settle window shorter than one poll would never see a second scan
+    debounce = max(DEBOUNCE_SECONDS, POLL_INTERVAL)
+
+    def __init__(self, directories: Iterable[Path]):
+        self.directories = list(directories)
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for directory in self.directories:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        snapshot[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self, timeout: float) -> Set[Path]:
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed or time.monotonic() >= deadline:
+                return changed
+            time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Directory watches for writes, renames and deletes (editors save by rename)"""
+
+    debounce = DEBOUNCE_SECONDS
+
+    def __init__(self, directories: Iterable[Path]):
+        flags = inotify_simple.flags
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM | flags.CREATE | flags.DELETE
+        self._inotify = inotify_simple.INotify()
+        self._directories = {self._inotify.add_watch(str(d), mask): Path(d) for d in directories}
+
+    def changes(self, timeout: float) -> Set[Path]:
+        events = self._inotify.read(timeout=int(timeout * 1000))
+        return {self._directories[event.wd] / event.name for event in events if event.name}
+
+    def close(self):
+        self._inotify.close()
+
+
+def make_watcher(directories: List[Path]):
+    if inotify_simple is not None:
+        try:
+            return InotifyWatcher(directories)
+        except OSError as e:  # e.g. inotify watch limit reached
+            print(f"⚠️  inotify unavailable ({e}), polling instead")
+    return PollingWatcher(directories)
+
+
+class IncrementalPipeline:
+    """
+    Keeps the last ingest (payments and vendor IDs) in memory so stages after
+    ingest can rerun without re-reading the CSVs
+    """
+
+    def __init__(self, pipeline: ModuleType, report_path: Path, sample: Optional[float] = None):
+        self.pipeline = pipeline
+        self.report_path = report_path
+        self.sample = sample
+        self.payments = None
+        self.name_to_id: Dict[str, str] = {}
+
+    def run(self, stages: List[str]):
+        report = pipeline_metrics.start_run()
+        start = time.perf_counter()
+        if 'ingest' in stages:
+            with report.stage('ingest'):
+                self.payments = self.pipeline.ingest_raw_data(sample=self.sample)
+            with report.stage('normalize'):
+                self.name_to_id = self.pipeline.normalize_vendors(self.payments)
+            if len(stages) > 1:
+                # classify reads the published vendor master, so publish new vendors first
+                self.publish(report)
+        for stage in stages:
+            if stage in STAGE_SCRIPTS:
+                with report.stage(stage):
+                    self.run_script(STAGE_SCRIPTS[stage])
+        self.publish(report)
+        report.write(self.report_path)
+        print(f"\n👀 Rebuilt ({', '.join(stages)}) in {time.perf_counter() - start:.2f}s")
+
+    def publish(self, report: pipeline_metrics.RunReport):
+        if not self.payments:
+            print("⚠️  No payments ingested; nothing to publish")
+            return
+        with report.stage('aggregate'):
+            aggregated = self.pipeline.aggregate_payments(self.payments, self.name_to_id)
+            if self.sample is not None:
+                self.pipeline.scale_sample_estimates(aggregated, self.sample)
+        self.pipeline.save_outputs(aggregated, report)
+
+    @staticmethod
+    def run_script(script: Path):
+        """Run a stage script fresh, so edits to its tables take effect"""
+        result = subprocess.run([sys.executable, str(script)], cwd=ROOT_DIR,
+                                stdout=subprocess.DEVNULL)
+        if result.returncode != 0:
+            print(f"❌ {script.name} exited with status {result.returncode}")
+
+
+def watch(pipeline: ModuleType, report_path: Path, sample: Optional[float] = None):
+    """
+    Build once (like a plain run, without reclassifying), then rebuild from
+    the earliest affected stage on every change. `pipeline` is the running
+    process_data module.
+    """
+    raw_dir = pipeline.RAW_DIR
+    incremental = IncrementalPipeline(pipeline, report_path, sample)
+    incremental.run(['ingest'])
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    watcher = make_watcher([raw_dir, SCRIPTS_DIR])
+    mode = 'inotify' if isinstance(watcher, InotifyWatcher) else 'polling'
+    print(f"\n👀 Watching {raw_dir} and the classifier/fix-up tables ({mode}); Ctrl-C to stop")
+    try:
+        while True:
+            changed = watcher.changes(timeout=1.0)
+            if not changed:
+                continue
+            # Let the burst settle, then take everything that changed in it
+            while True:
+                more = watcher.changes(timeout=watcher.debounce)
+                if not more:
+                    break
+                changed |= more
+            stages = {stage_of(path, raw_dir) for path in changed} - {None}
+            if not stages:
+                continue
+            first_stage = min(stages, key=STAGES.index)
+            print(f"\n🔁 {', '.join(sorted(p.name for p in changed))} changed; rerunning from {first_stage}")
+            incremental.run(STAGES[STAGES.index(first_stage):])
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
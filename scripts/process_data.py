@@ -4,24 +4,58 @@ Data processing pipeline for The Ledger
 Processes Ontario Public Accounts CSV files into structured JSON datasets
 """
 
+import argparse
 import json
 import csv
+import hashlib
 import os
+import sys
+from functools import lru_cache
+from math import fsum, isfinite
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Iterable
 import re
 
+from artifact_manifest import ArtifactManifest, file_sha256
+import change_feed
+import pipeline_metrics
+from ingest_dedup import DuplicateFilter
+from ledger_cube import CUBE_FILE, build_cube
+from ledger_records import PaymentTable
+from json_stream import iter_json_records, write_json_records
+from lenses import LensEngine
+from row_filters import ColumnMap, RowFilter, first_value
+from topk import RANKINGS_FILE, GroupedTopK, VendorRankings
+from vendor_ids import ALIASES_FILE, REGISTRY_FILE, AliasRegistry, VendorIdRegistry
+from vendor_metrics import add_derived_metrics, derive_metrics
+
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "data"
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
+PUBLIC_DIR = Path(__file__).parent.parent / "public" / "data" / "processed"
+PROFILE_DIR = DATA_DIR / "profiles"
+COLUMNAR_DIR = DATA_DIR / "columnar"
+PREVIEW_DIR = DATA_DIR / "preview"
+DEFAULT_STORE = PROCESSED_DIR / "ledger.db"
+
+# (processed, public) directories a preview build reads classifications, vendor
+# IDs and aliases from; None when they are the output directories themselves
+CLASSIFIED_DIRS: Optional[tuple] = None
+
+# Only 2018 and later is published (when Doug Ford took office)
+FIRST_YEAR = 2018
+
+# Vendors kept per ministry in ministry_top_vendors.json
+MINISTRY_TOP_VENDORS = 25
 
-# Ensure directories exist
-PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-RAW_DIR.mkdir(parents=True, exist_ok=True)
 
+# Lens cache keys from the last save (lens name -> input hash)
+LENS_CACHE_FILE = "lens_cache.json"
 
+
+@lru_cache(maxsize=None)
 def normalize_vendor_name(name: str) -> str:
     """
     Normalize vendor names by:
@@ -49,14 +83,89 @@ def normalize_vendor_name(name: str) -> str:
     return normalized.title()
 
 
-def load_vendor_master() -> Dict[str, Dict[str, Any]]:
-    """Load or create vendor master table"""
-    master_path = PROCESSED_DIR / "vendors_master.json"
+pipeline_metrics.current().watch_cache('normalize_vendor_name', normalize_vendor_name.cache_info)
+
+
+def use_preview_dir(directory: Path):
+    """
+    Write this run's artifacts under `directory` (processed/ and public/, laid
+    out like the real ones) while still reading classifications, vendor IDs
+    and aliases from the real directories, which are left untouched
+    """
+    global CLASSIFIED_DIRS, PROCESSED_DIR, PUBLIC_DIR
+    CLASSIFIED_DIRS = classified_dirs()
+    PROCESSED_DIR = directory / "processed"
+    PUBLIC_DIR = directory / "public"
+
+
+def classified_dirs() -> tuple:
+    """(processed, public) directories holding the classifications, vendor IDs and aliases"""
+    return CLASSIFIED_DIRS or (PROCESSED_DIR, PUBLIC_DIR)
+
+
+def load_public_vendors() -> Optional[List[Dict[str, Any]]]:
+    """The classified public vendor master, if there is one"""
+    path = classified_dirs()[1] / "vendors_master.json"
+    if not path.exists():
+        return None
+    return read_json(path)
+
+
+def read_json(path: Path) -> Any:
+    """Load a JSON file, recording the bytes read in the run report"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    pipeline_metrics.current().read_bytes(path.stat().st_size)
+    return data
+
+
+def write_json(path: Path, data: Any):
+    """Write a JSON file, recording the bytes written in the run report"""
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    pipeline_metrics.current().wrote_bytes(path.stat().st_size)
+
+
+def write_json_stream(path: Path, records: Iterable[Any]):
+    """write_json for a JSON array whose records are produced as it's written"""
+    with open(path, 'w') as f:
+        write_json_records(f, records)
+    pipeline_metrics.current().wrote_bytes(path.stat().st_size)
+
+
+def publish(path: Path, manifest: Optional[ArtifactManifest] = None) -> Path:
+    """
+    Copy a processed file to the same place under the public directory for
+    Next.js, adding its content-hashed copy to the manifest if one is given
+    """
+    import shutil
+    target = PUBLIC_DIR / path.relative_to(PROCESSED_DIR)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(path, target)
+    pipeline_metrics.current().wrote_bytes(path.stat().st_size)
+    if manifest is not None:
+        manifest.add(target)
+    return target
+
+
+def read_published(name: str) -> Optional[Any]:
+    """Load the currently published copy of an artifact, if there is one"""
+    path = PUBLIC_DIR / name
+    if not path.exists():
+        return None
+    try:
+        return read_json(path)
+    except (OSError, ValueError):
+        return None
+
+
+def load_vendor_master(directory: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """Load or create vendor master table (from PROCESSED_DIR unless given another directory)"""
+    master_path = (directory or PROCESSED_DIR) / "vendors_master.json"
     
     if master_path.exists():
-        with open(master_path, 'r') as f:
-            data = json.load(f)
-            return {v['vendor_id']: v for v in data}
+        data = read_json(master_path)
+        return {v['vendor_id']: v for v in data}
     
     return {}
 
@@ -64,28 +173,81 @@ def load_vendor_master() -> Dict[str, Dict[str, Any]]:
 def save_vendor_master(vendors: Dict[str, Dict[str, Any]]):
     """Save vendor master table"""
     master_path = PROCESSED_DIR / "vendors_master.json"
-    vendor_list = list(vendors.values())
-    
-    with open(master_path, 'w') as f:
-        json.dump(vendor_list, f, indent=2)
+    write_json_stream(master_path, vendors.values())
+
+
+# Non-ASCII spaces used as thousands separators (non-breaking, narrow no-break, thin)
+_THOUSANDS_SPACES = ['\u00a0', '\u202f', '\u2009']
+
+# 1,234 or 1,234,567 (commas as English thousands separators, no decimals)
+_ENGLISH_THOUSANDS = re.compile(r'-?\d{1,3}(?:,\d{3})+$')
 
 
 def parse_amount(amount_str: str) -> float:
-    """Parse amount string, handling commas, quotes, and currency symbols"""
+    """
+    Parse amount string, handling commas, quotes, and currency symbols
+    Plain and English-formatted numbers ($1,234.56) go straight to float();
+    anything else takes the slow path (parentheses, quotes, French decimal
+    commas, space thousands separators).
+    Unparseable values are counted as rejected and returned as 0.0.
+    """
     if not amount_str:
         return 0.0
     
+    text = amount_str.replace('$', '') if '$' in amount_str else amount_str
+    if text[-3:-2] == '.' or ',' not in text:
+        # 1234.56 or 1,234.56 (with cents, commas can only be thousands separators)
+        try:
+            amount = float(text.replace(',', ''))
+        except ValueError:
+            amount = _parse_amount_slow(text)
+    else:
+        amount = _parse_amount_slow(text)
+    
+    if amount is None or not isfinite(amount):
+        pipeline_metrics.current().count('amounts_rejected')
+        return 0.0
+    return amount
+
+
+def _parse_amount_slow(amount_str: str) -> Optional[float]:
+    """Full cleanup for formatted amounts; None if it still isn't a number"""
     # Remove currency symbols, quotes, and whitespace
-    cleaned = str(amount_str).strip().replace('$', '').replace(',', '').replace('"', '').replace("'", '')
+    cleaned = amount_str.replace('$', '').replace('"', '').replace("'", '').replace(' ', '')
+    if not cleaned.isascii():
+        for space in _THOUSANDS_SPACES:
+            cleaned = cleaned.replace(space, '')
+    cleaned = cleaned.strip()
     
     # Handle negative amounts in parentheses
-    if cleaned.startswith('(') and cleaned.endswith(')'):
-        cleaned = '-' + cleaned[1:-1]
+    negative = cleaned.startswith('(') and cleaned.endswith(')')
+    if negative:
+        cleaned = cleaned[1:-1]
+    
+    comma = cleaned.rfind(',')
+    if comma != -1:
+        dot = cleaned.rfind('.')
+        if dot > comma:
+            # 1,234.56
+            cleaned = cleaned.replace(',', '')
+        elif dot != -1:
+            # 1.234,56
+            cleaned = cleaned.replace('.', '').replace(',', '.')
+        elif _ENGLISH_THOUSANDS.match(cleaned):
+            # 1,234
+            cleaned = cleaned.replace(',', '')
+        else:
+            # French decimal comma: 1234,56
+            cleaned = cleaned.replace(',', '.')
+    elif cleaned.count('.') > 1:
+        # 1.234.567
+        cleaned = cleaned.replace('.', '')
     
     try:
-        return float(cleaned)
+        amount = float(cleaned)
     except ValueError:
-        return 0.0
+        return None
+    return -amount if negative else amount
 
 
 def extract_fiscal_year(filename: str) -> Optional[int]:
@@ -108,13 +270,8 @@ def extract_fiscal_year(filename: str) -> Optional[int]:
     return None
 
 
-def ingest_raw_data() -> List[Dict[str, Any]]:
-    """
-    Load all raw CSV files from /data/raw/
-    Handles Ontario Public Accounts CSV formats (French and English)
-    """
-    all_payments = []
-    
+def payment_schedule_files() -> List[Path]:
+    """Detailed Schedule of Payments CSVs in /data/raw/, sorted by name"""
     # Filter to only Detailed Schedule of Payments files
     # Exclude ministry statements, revenue, capital assets, etc.
     exclude_keywords = [
@@ -140,15 +297,54 @@ def ingest_raw_data() -> List[Dict[str, Any]]:
         elif re.search(r'20\d{2}[-_]\d{2}', f.name) or re.search(r'20\d{2}-20\d{2}', f.name):
             csv_files.append(f)
     
-    csv_files.sort()
+    return sorted(csv_files)
+
+
+def vendor_sampler(fraction: float) -> Callable[[str], bool]:
+    """
+    Whether a raw vendor name falls in a `fraction` sample of vendors.
+    Decided by a hash of the normalized name, so all of a vendor's rows are
+    kept or dropped together, the same vendors are picked on every run, and
+    a smaller sample is a subset of a larger one.
+    """
+    threshold = int(fraction * 2 ** 64)
+    
+    @lru_cache(maxsize=None)
+    def in_sample(vendor_name_raw: str) -> bool:
+        key = normalize_vendor_name(vendor_name_raw).encode('utf-8')
+        digest = hashlib.blake2b(key, digest_size=8, person=b'ledger-sample').digest()
+        return int.from_bytes(digest, 'big') < threshold
+    
+    return in_sample
+
+
+def ingest_raw_data(all_payments: Optional[PaymentTable] = None, sample: Optional[float] = None) -> PaymentTable:
+    """
+    Load all raw CSV files from /data/raw/
+    Handles Ontario Public Accounts CSV formats (French and English)
+    Rows are appended to `all_payments` (a new PaymentTable by default, or
+    e.g. a spill.SpillPartitions for out-of-core runs). With `sample`, only
+    that fraction of vendors is kept (see vendor_sampler).
+    """
+    if all_payments is None:
+        all_payments = PaymentTable()
+    report = pipeline_metrics.current()
+    row_filter = RowFilter()
+    in_sample = vendor_sampler(sample) if sample is not None else None
+    rows_sampled_out = 0
+    
+    csv_files = payment_schedule_files()
     
     if not csv_files:
         print(f"⚠️  No payment schedule CSV files found in {RAW_DIR}")
         print(f"   Looking for files with 'payment', 'paiement', or 'schedule' in name")
-        return []
+        return all_payments
     
     print(f"Found {len(csv_files)} payment schedule files")
     
+    # Identical files and fiscal years claimed by several files are found up front
+    duplicates = DuplicateFilter(csv_files, extract_fiscal_year, normalize_vendor_name)
+    
     for csv_file in csv_files:
         print(f"📄 Processing {csv_file.name}...")
         
@@ -159,6 +355,14 @@ def ingest_raw_data() -> List[Dict[str, Any]]:
             continue
         
         print(f"   Detected fiscal year: {fiscal_year}")
+        original = duplicates.copy_of(csv_file)
+        if original is not None:
+            print(f"   ⏭️  Identical to {original.name}, skipping")
+            duplicates.skip(csv_file, original)
+            report.count('files_skipped_identical')
+            continue
+        report.count('files_read')
+        report.read_bytes(csv_file.stat().st_size)
         
         try:
             # Try different encodings
@@ -175,88 +379,60 @@ def ingest_raw_data() -> List[Dict[str, Any]]:
                         # Detect delimiter
                         delimiter = ',' if ',' in first_line else ';' if ';' in first_line else '\t'
                         
-                        reader = csv.DictReader(f, delimiter=delimiter)
+                        reader = csv.reader(f, delimiter=delimiter)
                         rows_processed = 0
+                        rows_read = 0
+                        dollars_accepted = 0.0
+                        file_rows = duplicates.rows_for(csv_file, fiscal_year)
                         
                         # Get fieldnames and strip BOM if present
-                        fieldnames = reader.fieldnames
+                        fieldnames = next(reader, [])
                         if fieldnames and fieldnames[0].startswith('\ufeff'):
                             fieldnames[0] = fieldnames[0].lstrip('\ufeff')
-                            reader.fieldnames = fieldnames
+                        
+                        # Resolve the French/English column variations once per file
+                        columns = ColumnMap(fieldnames)
+                        width = columns.width
                         
                         for row in reader:
-                            # Try multiple column name variations (French and English)
-                            vendor_name = (
-                                row.get('Bénéficiaire') or 
-                                row.get('Beneficiaire') or 
-                                row.get('Recipient') or
-                                row.get('Vendor') or
-                                row.get('vendor_name') or
-                                row.get('vendor') or
-                                row.get('recipient') or
-                                ''
-                            ).strip()
-                            
-                            # Try multiple amount column variations
-                            amount_str = (
-                                row.get('Montant $') or
-                                row.get('Montant') or
-                                row.get('Amount $') or
-                                row.get('Amount') or
-                                row.get('amount') or
-                                row.get('amount_paid') or
-                                row.get('total') or
-                                '0'
-                            )
-                            
-                            amount = parse_amount(amount_str)
-                            
-                            # Try multiple ministry column variations
-                            ministry = (
-                                row.get('Ministère') or
-                                row.get('Ministère') or
-                                row.get('Nom du ministere') or
-                                row.get('Ministry') or
-                                row.get('ministry') or
-                                row.get('department') or
-                                ''
-                            ).strip()
-                            
-                            # Skip if no vendor name or invalid amount
-                            if not vendor_name or vendor_name.lower() in ['aucune valeur', 'none', 'n/a', '']:
+                            if not row:
                                 continue
+                            rows_read += 1
+                            if len(row) < width:
+                                row += [''] * (width - len(row))
                             
-                            if amount <= 0:
+                            vendor_name = first_value(row, columns.vendor).strip()
+                            if in_sample is not None and not in_sample(vendor_name):
+                                rows_sampled_out += 1
                                 continue
+                            amount = parse_amount(first_value(row, columns.amount, '0'))
+                            ministry = first_value(row, columns.ministry).strip()
+                            category = row[columns.category] if columns.category is not None else ''
                             
-                            # Skip aggregate rows and irrelevant categories
-                            vendor_lower = vendor_name.lower()
-                            if any(skip in vendor_lower for skip in [
-                                'accounts under', 'comptes inf', 
-                                'payments made for services',  # Aggregate category
-                                'interest on',  # Interest payments (not service delivery)
-                                'aucune valeur', 'no value'
-                            ]):
+                            # Skip missing vendors, non-positive amounts, aggregate
+                            # rows and categories that aren't service delivery
+                            rule = row_filter.exclusion(vendor_name, amount, category)
+                            if rule is not None:
+                                row_filter.reject(rule, ministry, amount)
                                 continue
-                            
-                            # Skip if category suggests it's not service delivery
-                            category = row.get('Categorie', row.get('Category', row.get('category', ''))).lower()
-                            if any(skip in category for skip in [
-                                'interest', 'interet',  # Interest payments
-                                'salary', 'traitements',  # Internal salaries
-                                'travel', 'deplacement',  # Travel expenses (not service delivery)
-                            ]):
+                            # Already ingested from another file of this fiscal year
+                            if file_rows is not None and file_rows.duplicate(vendor_name, amount):
                                 continue
                             
-                            all_payments.append({
-                                'fiscal_year': fiscal_year,
-                                'vendor_name_raw': vendor_name,
-                                'amount_paid': amount,
-                                'ministry': ministry,
-                            })
+                            all_payments.append(fiscal_year, vendor_name, amount, ministry)
                             rows_processed += 1
+                            dollars_accepted += amount
                         
+                        if file_rows is not None:
+                            file_rows.close()
+                            dropped = duplicates.rows.get(csv_file.name, 0)
+                            if dropped:
+                                print(f"   ⚠️  Dropped {dropped} rows already ingested for {fiscal_year} "
+                                      f"(${duplicates.dollars.get(csv_file.name, 0):,.2f})")
+                        duplicates.accept(csv_file, rows_processed, dollars_accepted)
                         print(f"   ✅ Processed {rows_processed} payment records")
+                        report.count('rows_read', rows_read)
+                        report.count('rows_accepted', rows_processed)
                         file_opened = True
                         break
                         
@@ -272,46 +448,78 @@ def ingest_raw_data() -> List[Dict[str, Any]]:
             traceback.print_exc()
             continue
     
+    report.add_section('exclusions', row_filter.summary())
+    report.add_section('duplicates', duplicates.summary())
+    report.count('rows_duplicate', duplicates.rows_dropped())
+    if duplicates.rows_dropped():
+        print(f"\n⚠️  Dropped {duplicates.rows_dropped()} duplicate rows "
+              f"(${duplicates.dollars_dropped():,.2f}) from overlapping files")
+    report.count('rows_excluded', sum(row_filter.rows.values()))
+    if in_sample is not None:
+        report.count('rows_sampled_out', rows_sampled_out)
     print(f"\n✅ Total: Loaded {len(all_payments)} payment records")
     return all_payments
 
 
-def normalize_vendors(payments: List[Dict[str, Any]]) -> Dict[str, str]:
+def load_vendor_registry(vendor_master: Dict[str, Dict[str, Any]]) -> VendorIdRegistry:
+    """
+    The persisted name -> vendor_id registry. On first use it adopts the IDs
+    already in the vendor masters so published IDs (and classifications keyed
+    on them) carry over.
+    """
+    registry = VendorIdRegistry.load(classified_dirs()[0] / REGISTRY_FILE)
+    if not len(registry):
+        registry.seed(vendor_master.values())
+        try:
+            registry.seed(load_public_vendors() or [])
+        except (OSError, ValueError):
+            pass
+    return registry
+
+
+def load_vendor_aliases(vendor_master: Optional[Dict[str, Dict[str, Any]]] = None) -> AliasRegistry:
+    """
+    The vendor_id -> raw names registry, picking up any aliases still stored
+    in the vendor master by older runs
+    """
+    aliases = AliasRegistry.load(classified_dirs()[0] / ALIASES_FILE)
+    if vendor_master:
+        aliases.seed(vendor_master.values())
+    return aliases
+
+
+def normalize_vendors(payments: PaymentTable) -> Dict[str, str]:
     """
     Create vendor normalization mapping
     Returns: {vendor_name_normalized: vendor_id}
     """
-    vendor_master = load_vendor_master()
-    name_to_id: Dict[str, str] = {}
-    id_counter = len(vendor_master)
+    vendor_master = load_vendor_master(classified_dirs()[0])
+    registry = load_vendor_registry(vendor_master)
     
     # Group by normalized name
     normalized_groups: Dict[str, List[str]] = defaultdict(list)
     
-    for payment in payments:
-        raw_name = payment['vendor_name_raw']
+    for raw_name in payments.vendor_names.values:
         normalized = normalize_vendor_name(raw_name)
         
         if normalized:
             normalized_groups[normalized].append(raw_name)
     
-    # Create vendor IDs
-    for normalized, aliases in normalized_groups.items():
-        # Check if we already have this vendor
-        existing_id = None
-        for vid, vendor in vendor_master.items():
-            if vendor.get('vendor_name_normalized') == normalized:
-                existing_id = vid
-                break
+    # Look up (or allocate) vendor IDs
+    name_to_id = registry.assign(normalized_groups)
+    pipeline_metrics.current().count('vendor_ids_allocated', registry.added)
+    
+    # Raw names are already distinct here (interned at ingest)
+    aliases = load_vendor_aliases(vendor_master)
+    for normalized, raw_names in normalized_groups.items():
+        vendor_id = name_to_id[normalized]
+        for raw_name in raw_names:
+            aliases.add(raw_name, vendor_id)
         
-        if not existing_id:
-            vendor_id = f"V{id_counter:05d}"
-            id_counter += 1
-            
+        if vendor_id not in vendor_master:
             vendor_master[vendor_id] = {
                 'vendor_id': vendor_id,
                 'vendor_name_normalized': normalized,
-                'vendor_name_aliases': list(set(aliases)),
                 'vendor_type': 'unknown',
                 'service_category': None,
                 'confidence': 'low',
@@ -321,42 +529,97 @@ def normalize_vendors(payments: List[Dict[str, Any]]) -> Dict[str, str]:
                 'growth_rate': None,
             }
         else:
-            # Update aliases
-            existing_aliases = set(vendor_master[existing_id].get('vendor_name_aliases', []))
-            existing_aliases.update(aliases)
-            vendor_master[existing_id]['vendor_name_aliases'] = list(existing_aliases)
-        
-        name_to_id[normalized] = existing_id or vendor_id
+            # Aliases live in vendor_aliases.json now
+            vendor_master[vendor_id].pop('vendor_name_aliases', None)
+    pipeline_metrics.current().count('vendor_aliases_added', aliases.added)
     
+    registry.save(PROCESSED_DIR / REGISTRY_FILE)
+    if aliases.added or not (PROCESSED_DIR / ALIASES_FILE).exists():
+        write_json(PROCESSED_DIR / ALIASES_FILE, aliases.to_dict())
     save_vendor_master(vendor_master)
     return name_to_id
 
 
-def aggregate_payments(payments: List[Dict[str, Any]], name_to_id: Dict[str, str]) -> Dict[str, Any]:
+def aggregate_payments(payments: PaymentTable, name_to_id: Dict[str, str]) -> Dict[str, Any]:
     """
     Aggregate payments by vendor, year, and ministry
     Returns aggregated data structure
+    Payments are summed one partition at a time (all of a vendor's rows are
+    in one partition), so out-of-core runs only hold one partition of rows.
     """
-    # Group by vendor_id and year
-    vendor_year_totals: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
-    vendor_year_ministries: Dict[str, Dict[int, Dict[str, float]]] = defaultdict(
-        lambda: defaultdict(lambda: defaultdict(float))
-    )
+    vendor_master = load_vendor_master()
     
-    for payment in payments:
-        raw_name = payment['vendor_name_raw']
-        normalized = normalize_vendor_name(raw_name)
-        
-        if normalized not in name_to_id:
-            continue
+    # Also load from public directory to get latest classifications
+    public_vendors_by_id = {}
+    try:
+        public_vendors = load_public_vendors()
+        if public_vendors is not None:
+            public_vendors_by_id = {v.get('vendor_id'): v for v in public_vendors if v.get('vendor_id')}
+            print(f"   📋 Loaded {len(public_vendors_by_id)} classified vendors from public directory")
+    except Exception as e:
+        print(f"   ⚠️  Could not load public vendors: {e}")
+    
+    classifications: Dict[str, tuple] = {}
+    
+    def classification_of(vendor_id: str) -> tuple:
+        """(name, vendor_type, service_category) for a vendor"""
+        if vendor_id not in classifications:
+            vendor = vendor_master.get(vendor_id, {})
+            name = vendor.get('vendor_name_normalized', '')
+            # Use classification from public vendors if available (more up-to-date)
+            if vendor_id in public_vendors_by_id:
+                # Public version uses 'type'/'category', data version uses 'vendor_type'/'service_category'
+                public_vendor = public_vendors_by_id[vendor_id]
+                classifications[vendor_id] = (
+                    public_vendor.get('name', name),
+                    public_vendor.get('type', 'unknown'),
+                    public_vendor.get('category', public_vendor.get('service_category')),
+                )
+            else:
+                classifications[vendor_id] = (
+                    name,
+                    vendor.get('vendor_type', 'unknown'),
+                    vendor.get('service_category'),
+                )
+        return classifications[vendor_id]
+    
+    def vendor_type_of(vendor_id: str) -> str:
+        return classification_of(vendor_id)[1]
+    
+    vendor_year_totals: Dict[str, Dict[int, float]] = {}
+    # vendor_id -> year -> ministry that paid the most that year
+    top_ministries: Dict[str, Dict[int, str]] = {}
+    vendor_ministries: Dict[str, List[str]] = {}
+    # (vendor_type, category, ministry, year) -> exact partial sums, so totals
+    # don't depend on partitioning; the ledger cube and ministry rollups come from these
+    cube_cells: Dict[tuple, List[float]] = defaultdict(list)
+    ministry_candidates: Dict[str, List[tuple]] = defaultdict(list)
+    years = set()
+    
+    for partition in payments.partitions():
+        years.update(partition.fiscal_years)
+        part_totals, part_ministries = sum_partition(partition, name_to_id)
+        vendor_year_totals.update(part_totals)
         
-        vendor_id = name_to_id[normalized]
-        year = payment['fiscal_year']
-        amount = payment['amount_paid']
-        ministry = payment['ministry']
+        for vendor_id, year_ministries in part_ministries.items():
+            _, vendor_type, category = classification_of(vendor_id)
+            vendor_ministries[vendor_id] = sorted({m for ministries in year_ministries.values() for m in ministries})
+            top_ministries[vendor_id] = {}
+            for year, ministries in year_ministries.items():
+                if year < FIRST_YEAR:
+                    continue
+                top_ministries[vendor_id][year] = max(ministries, key=ministries.get)
+                for ministry, amount in ministries.items():
+                    add_exact(cube_cells[vendor_type, category, ministry, year], amount)
         
-        vendor_year_totals[vendor_id][year] += amount
-        vendor_year_ministries[vendor_id][year][ministry] += amount
+        for ministry, candidates in ministry_top_candidates(part_ministries).items():
+            ministry_candidates[ministry].extend(candidates)
+        del part_totals, part_ministries
+    
+    # Restore input order (vendors by first payment) so results don't depend on partitioning
+    vendor_order = {vendor_id: i for i, vendor_id in enumerate(dict.fromkeys(name_to_id.values()))}
+    if len(vendor_year_totals) > 1:
+        vendor_year_totals = dict(sorted(vendor_year_totals.items(), key=lambda item: vendor_order[item[0]]))
     
     # Build payments_by_year structure (only 2018+)
     payments_by_year: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
@@ -364,36 +627,20 @@ def aggregate_payments(payments: List[Dict[str, Any]], name_to_id: Dict[str, str
     for vendor_id, year_totals in vendor_year_totals.items():
         for year, total in year_totals.items():
             # Only include 2018 and later (when Doug Ford took office)
-            if year >= 2018:
+            if year >= FIRST_YEAR:
                 payments_by_year[year].append({
                     'fiscal_year': year,
                     'vendor_id': vendor_id,
                     'vendor_name_normalized': '',  # Will be filled from master
-                    'ministry': '',  # Could aggregate ministries
+                    'ministry': top_ministries[vendor_id][year],  # Ministry that paid the most
                     'total_paid': total,
                 })
     
     # Build system composition
-    vendor_master = load_vendor_master()
-    
-    # Also load from public directory to get latest classifications
-    PUBLIC_VENDORS_FILE = Path(__file__).parent.parent / "public" / "data" / "processed" / "vendors_master.json"
-    public_vendors_by_id = {}
-    if PUBLIC_VENDORS_FILE.exists():
-        try:
-            with open(PUBLIC_VENDORS_FILE, 'r') as f:
-                public_vendors = json.load(f)
-                public_vendors_by_id = {v.get('vendor_id'): v for v in public_vendors if v.get('vendor_id')}
-                print(f"   📋 Loaded {len(public_vendors_by_id)} classified vendors from public directory")
-        except Exception as e:
-            print(f"   ⚠️  Could not load public vendors: {e}")
-    
     system_composition: List[Dict[str, Any]] = []
     
-    years = sorted(set(p['fiscal_year'] for p in payments))
-    
     # Filter to only 2018 and later (when Doug Ford took office)
-    years = [y for y in years if y >= 2018]
+    years = [y for y in sorted(years) if y >= FIRST_YEAR]
     
     for year in years:
         public_total = 0
@@ -403,15 +650,7 @@ def aggregate_payments(payments: List[Dict[str, Any]], name_to_id: Dict[str, str
         
         for vendor_id, year_total in vendor_year_totals.items():
             if year in year_total:
-                vendor = vendor_master.get(vendor_id, {})
-                
-                # Use classification from public vendors if available (more up-to-date)
-                if vendor_id in public_vendors_by_id:
-                    # Public version uses 'type', data version uses 'vendor_type'
-                    vendor_type = public_vendors_by_id[vendor_id].get('type', 'unknown')
-                else:
-                    vendor_type = vendor.get('vendor_type', 'unknown')
-                
+                vendor_type = vendor_type_of(vendor_id)
                 amount = year_total[year]
                 
                 if vendor_type == 'public':
@@ -431,116 +670,349 @@ def aggregate_payments(payments: List[Dict[str, Any]], name_to_id: Dict[str, str
             'unknown_total': unknown_total,
         })
     
-    # Update vendor master with aggregated stats
+    # Update vendor master with aggregated stats, and keep the top vendors
+    # per group as each vendor's totals are finalized
+    rankings = VendorRankings(first_year=FIRST_YEAR)
+    
     for vendor_id, year_totals in vendor_year_totals.items():
+        metrics = derive_metrics(year_totals)
         if vendor_id in vendor_master:
-            years_paid = sorted(year_totals.keys())
-            vendor_master[vendor_id]['first_year_paid'] = years_paid[0] if years_paid else None
-            vendor_master[vendor_id]['last_year_paid'] = years_paid[-1] if years_paid else None
-            vendor_master[vendor_id]['total_paid_all_years'] = sum(year_totals.values())
-            
-            # Calculate growth rate (simple year-over-year)
-            if len(years_paid) >= 2:
-                first_amount = year_totals[years_paid[0]]
-                last_amount = year_totals[years_paid[-1]]
-                if first_amount > 0:
-                    growth = (last_amount - first_amount) / first_amount
-                    vendor_master[vendor_id]['growth_rate'] = growth
+            vendor_master[vendor_id]['first_year_paid'] = metrics['first_year']
+            vendor_master[vendor_id]['last_year_paid'] = metrics['last_year']
+            vendor_master[vendor_id]['total_paid_all_years'] = metrics['total_paid']
+            vendor_master[vendor_id]['growth_rate'] = metrics['growth_rate']
+        
+        name, vendor_type, category = classification_of(vendor_id)
+        rankings.add({
+            'vendor_id': vendor_id,
+            'name': name,
+            'type': vendor_type,
+            'category': category,
+            'total': metrics['total_paid'],
+            'first_year': metrics['first_year'],
+            'last_year': metrics['last_year'],
+            'growth': metrics['growth_rate'],
+        }, year_totals)
     
     save_vendor_master(vendor_master)
     
+    ministry_year_types: Dict[tuple, List[float]] = defaultdict(list)
+    for (vendor_type, _, ministry, year), partials in cube_cells.items():
+        ministry_year_types[ministry, year, vendor_type].extend(partials)
+    
     return {
         'payments_by_year': dict(payments_by_year),
         'system_composition': system_composition,
-        'vendor_year_totals': {k: dict(v) for k, v in vendor_year_totals.items()},
+        'vendor_year_totals': vendor_year_totals,
+        'ministry_composition': build_ministry_composition(
+            {key: fsum(partials) for key, partials in ministry_year_types.items()}
+        ),
+        'ministry_top_vendors': build_ministry_top_vendors(ministry_candidates, vendor_order, vendor_type_of),
+        'rankings': rankings.export(),
+        'vendor_ministries': {vendor_id: vendor_ministries[vendor_id] for vendor_id in vendor_year_totals},
+        'ledger_cube': build_cube(cube_cells),
     }
 
 
-def build_lens_data(vendor_year_totals: Dict[str, Dict[int, float]]) -> Dict[str, List[Dict[str, Any]]]:
+def scale_sample_estimates(aggregated: Dict[str, Any], fraction: float):
     """
-    Build lens-specific datasets
-    Filters vendors by service_category
+    Scale the system and ministry composition totals of a sampled build up
+    to the full population, flagging each record as an estimate. Per-vendor
+    figures are exact (sampled vendors keep all their rows) and are left as is.
     """
-    vendor_master = load_vendor_master()
-    lenses: Dict[str, List[Dict[str, Any]]] = {
-        'staffing': [],
-        'consulting': [],
-        'healthcare': [],
-    }
+    for record in aggregated['system_composition'] + aggregated['ministry_composition']:
+        for field in change_feed.COMPOSITION_FIELDS:
+            record[field] /= fraction
+        record['estimated'] = True
+        record['sample_fraction'] = fraction
     
-    for vendor_id, year_totals in vendor_year_totals.items():
-        vendor = vendor_master.get(vendor_id, {})
-        category = vendor.get('service_category')
+    cube = aggregated['ledger_cube']
+    cube['values'] = [value / fraction for value in cube['values']]
+    cube['estimated'] = True
+    cube['sample_fraction'] = fraction
+
+
+def sum_partition(payments: PaymentTable, name_to_id: Dict[str, str]) -> tuple:
+    """
+    Per-vendor yearly totals and per-vendor, per-year ministry totals for one
+    partition, with vendors in order of their first payment
+    """
+    vendor_year_totals: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+    vendor_year_ministries: Dict[str, Dict[int, Dict[str, float]]] = defaultdict(
+        lambda: defaultdict(lambda: defaultdict(float))
+    )
+    
+    # Resolve each distinct raw name to its vendor once, not once per row
+    vendor_of = [name_to_id.get(normalize_vendor_name(raw_name)) for raw_name in payments.vendor_names.values]
+    ministries = payments.ministries.values
+    
+    for year, name_id, ministry_id, amount in payments.columns():
+        vendor_id = vendor_of[name_id]
+        if vendor_id is None:
+            continue
         
-        if category == 'staffing':
-            lenses['staffing'].append({
-                'vendor_id': vendor_id,
-                'name': vendor.get('vendor_name_normalized', ''),
-                'type': vendor.get('vendor_type', 'unknown'),
-                'category': category,
-                'yearly_payments': {str(k): v for k, v in year_totals.items()},
-            })
-        elif category == 'consulting':
-            lenses['consulting'].append({
-                'vendor_id': vendor_id,
-                'name': vendor.get('vendor_name_normalized', ''),
-                'type': vendor.get('vendor_type', 'unknown'),
-                'category': category,
-                'yearly_payments': {str(k): v for k, v in year_totals.items()},
-            })
-        elif category == 'healthcare_delivery':
-            lenses['healthcare'].append({
+        vendor_year_totals[vendor_id][year] += amount
+        vendor_year_ministries[vendor_id][year][ministries[ministry_id]] += amount
+    
+    return (
+        {vendor_id: dict(years) for vendor_id, years in vendor_year_totals.items()},
+        {vendor_id: {year: dict(m) for year, m in years.items()} for vendor_id, years in vendor_year_ministries.items()},
+    )
+
+
+def add_exact(partials: List[float], x: float):
+    """
+    Add x to a running sum kept as non-overlapping partials (the algorithm
+    behind math.fsum), so fsum(partials) is exact whatever the order of adds
+    """
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+
+
+def build_ministry_composition(ministry_year_types: Dict[tuple, float]) -> List[Dict[str, Any]]:
+    """
+    Roll (ministry, year, vendor_type) totals up into system_composition-shaped
+    records per ministry and year
+    """
+    columns = {
+        'public': 'public_total',
+        'non_profit': 'non_profit_total',
+        'for_profit': 'for_profit_total',
+    }
+    rollup: Dict[tuple, Dict[str, Any]] = {}
+    
+    for (ministry, year, vendor_type), amount in ministry_year_types.items():
+        entry = rollup.get((ministry, year))
+        if entry is None:
+            entry = rollup[ministry, year] = {
+                'ministry': ministry,
+                'year': year,
+                'public_total': 0,
+                'non_profit_total': 0,
+                'for_profit_total': 0,
+                'unknown_total': 0,
+            }
+        entry[columns.get(vendor_type, 'unknown_total')] += amount
+    
+    return [rollup[key] for key in sorted(rollup)]
+
+
+def ministry_top_candidates(
+    vendor_year_ministries: Dict[str, Dict[int, Dict[str, float]]],
+) -> Dict[str, List[tuple]]:
+    """
+    Top vendors per ministry by total paid since 2018 among these vendors, as
+    (vendor_id, {year: amount}). The overall top per ministry is always among
+    the candidates of the partitions it was built from.
+    """
+    ministry_vendor_years: Dict[str, Dict[str, Dict[int, float]]] = defaultdict(dict)
+    
+    for vendor_id, years in vendor_year_ministries.items():
+        for year, ministries in years.items():
+            if year < FIRST_YEAR:
+                continue
+            for ministry, amount in ministries.items():
+                yearly = ministry_vendor_years[ministry].setdefault(vendor_id, {})
+                yearly[year] = amount
+    
+    top = GroupedTopK(MINISTRY_TOP_VENDORS)
+    for ministry, vendors in ministry_vendor_years.items():
+        for vendor_id, yearly in vendors.items():
+            top.push(ministry, sum(yearly.values()), (vendor_id, yearly))
+    return top.results()
+
+
+def build_ministry_top_vendors(
+    ministry_candidates: Dict[str, List[tuple]],
+    vendor_order: Dict[str, int],
+    vendor_type_of,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Top vendors per ministry by total paid since 2018, with their yearly breakdown"""
+    top = GroupedTopK(MINISTRY_TOP_VENDORS)
+    for ministry, candidates in ministry_candidates.items():
+        # Push in input order so ties break the same way however rows were partitioned
+        for vendor_id, yearly in sorted(candidates, key=lambda c: vendor_order[c[0]]):
+            top.push(ministry, sum(yearly.values()), (vendor_id, yearly))
+    
+    return {
+        ministry: [
+            {
                 'vendor_id': vendor_id,
-                'name': vendor.get('vendor_name_normalized', ''),
-                'type': vendor.get('vendor_type', 'unknown'),
-                'category': category,
-                'yearly_payments': {str(k): v for k, v in year_totals.items()},
-            })
+                'type': vendor_type_of(vendor_id),
+                'total_paid': sum(yearly.values()),
+                'yearly_payments': {str(y): amt for y, amt in sorted(yearly.items())},
+            }
+            for vendor_id, yearly in top.top(ministry)
+        ]
+        for ministry in sorted(top.groups())
+    }
+
+
+def build_lens_data(
+    vendors_master_list: List[Dict[str, Any]],
+    vendor_ministries: Optional[Dict[str, List[str]]] = None,
+) -> LensEngine:
+    """
+    Build lens-specific datasets
+    Lenses are declared in lenses.LENSES; vendor lists are built lazily on save
+    """
+    return LensEngine(vendors_master_list, vendor_ministries)
+
+
+def save_lenses(lenses: LensEngine, input_generation: str):
+    """
+    Write lens_*.json, skipping lenses whose definition and inputs are
+    unchanged since the last save
+    """
+    cache_path = PROCESSED_DIR / LENS_CACHE_FILE
+    cache = read_json(cache_path) if cache_path.exists() else {}
+    report = pipeline_metrics.current()
     
-    return lenses
+    for lens_name in lenses.names:
+        key = lenses.cache_key(lens_name, input_generation)
+        lens_path = PROCESSED_DIR / f"lens_{lens_name}.json"
+        public_path = PUBLIC_DIR / lens_path.relative_to(PROCESSED_DIR)
+        if cache.get(lens_name) == key and lens_path.exists() and public_path.exists():
+            report.count('lens_cache_hits')
+            continue
+        
+        write_json(lens_path, lenses.artifact(lens_name))
+        publish(lens_path)
+        cache[lens_name] = key
+        report.count('lens_cache_misses')
+    
+    write_json(cache_path, cache)
+
+
+def build_feed(previous_feed: Optional[Dict[str, Any]], vendors_master_list: List[Dict[str, Any]],
+               previous_composition: Optional[List[Dict[str, Any]]],
+               composition: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The change feed against the published generation, streaming the published
+    vendor master record by record (call before publishing the new one)
+    """
+    previous_path = PUBLIC_DIR / "vendors_master.json"
+    if previous_path.exists():
+        try:
+            feed = change_feed.build_change_feed(previous_feed, iter_json_records(previous_path),
+                                                 vendors_master_list, previous_composition, composition)
+            pipeline_metrics.current().read_bytes(previous_path.stat().st_size)
+            return feed
+        except (OSError, ValueError):
+            pass  # unreadable previous master: nothing to diff against
+    return change_feed.build_change_feed(previous_feed, None, vendors_master_list,
+                                         previous_composition, composition)
 
 
-def save_processed_data(data: Dict[str, Any], lenses: Dict[str, List[Dict[str, Any]]]):
+def save_processed_data(data: Dict[str, Any], lenses: LensEngine):
     """Save all processed datasets to JSON files"""
-    import shutil
-    
     # Also save to public directory for Next.js
-    PUBLIC_DIR = Path(__file__).parent.parent / "public" / "data" / "processed"
     PUBLIC_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = ArtifactManifest(PUBLIC_DIR)
     
-    # Save payments by year (flattened)
-    all_payments = []
-    for year, payments in data['payments_by_year'].items():
-        all_payments.extend(payments)
+    # Previous generation, diffed into the change feed below (the previous
+    # vendor master is streamed during the diff, before it's replaced)
+    previous_feed = read_published(change_feed.FEED_FILE)
+    previous_composition = read_published("system_composition.json")
     
+    # Save payments by year (flattened as they're written)
     payments_path = PROCESSED_DIR / "payments_by_year.json"
-    with open(payments_path, 'w') as f:
-        json.dump(all_payments, f, indent=2)
-    shutil.copy(payments_path, PUBLIC_DIR / "payments_by_year.json")
+    write_json_stream(payments_path, (
+        payment for payments in data['payments_by_year'].values() for payment in payments
+    ))
+    publish(payments_path, manifest)
     
     # Save system composition
     composition_path = PROCESSED_DIR / "system_composition.json"
-    with open(composition_path, 'w') as f:
-        json.dump(data['system_composition'], f, indent=2)
-    shutil.copy(composition_path, PUBLIC_DIR / "system_composition.json")
+    write_json(composition_path, data['system_composition'])
+    publish(composition_path, manifest)
+    
+    # Save ministry rollups (ministry x year x vendor type, top vendors per ministry)
+    ministry_composition_path = PROCESSED_DIR / "ministry_composition.json"
+    write_json(ministry_composition_path, data['ministry_composition'])
+    publish(ministry_composition_path, manifest)
+    
+    ministry_top_path = PROCESSED_DIR / "ministry_top_vendors.json"
+    write_json(ministry_top_path, data['ministry_top_vendors'])
+    publish(ministry_top_path, manifest)
+    
+    # Save the type x category x ministry x year cube with its roll-ups
+    cube_path = PROCESSED_DIR / CUBE_FILE
+    write_json(cube_path, data['ledger_cube'])
+    publish(cube_path, manifest)
+    
+    # Save prebuilt top-K rankings (overall, by type, category and year)
+    rankings_path = PROCESSED_DIR / RANKINGS_FILE
+    write_json(rankings_path, data['rankings'])
+    publish(rankings_path, manifest)
     
     # Save vendor yearly payments (for visualization)
+    vendors_master_list = data.get('vendors_master')
+    if vendors_master_list is None:
+        vendors_master_list = build_public_vendors(data['vendor_year_totals'])
+    
+    # Precomputed totals, growth and ranks so consumers don't re-sum yearly_payments
+    vendors_master_list = add_derived_metrics(vendors_master_list)
+    
+    vendors_path = PROCESSED_DIR / "vendors_master.json"
+    write_json_stream(vendors_path, vendors_master_list)
+    
+    # Save the change feed against the previous generation (plus a short history)
+    feed = build_feed(previous_feed, vendors_master_list, previous_composition, data['system_composition'])
+    publish(vendors_path, manifest)
+    
+    # Lens artifacts are keyed on the vendor master they were built from
+    input_generation = file_sha256(vendors_path)
+    
+    feed_path = PROCESSED_DIR / change_feed.FEED_FILE
+    write_json(feed_path, feed)
+    publish(feed_path, manifest)
+    
+    history_path = change_feed.history_path(PROCESSED_DIR, feed['generation'])
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(history_path, feed)
+    publish(history_path)
+    change_feed.prune_history(PROCESSED_DIR, feed['generation'])
+    change_feed.prune_history(PUBLIC_DIR, feed['generation'])
+    print(f"   Generation {feed['generation']}: {feed['summary']}")
+    
+    # Save lens datasets (unchanged lenses are skipped)
+    save_lenses(lenses, input_generation)
+    for lens_name in lenses.names:
+        manifest.add(PUBLIC_DIR / f"lens_{lens_name}.json")
+    
+    # Hashed copies are immutable; only manifest.json needs revalidating
+    manifest.write(feed['generation'])
+    pipeline_metrics.current().wrote_bytes(manifest.bytes_written)
+    
+    print(f"✅ Saved processed data to {PROCESSED_DIR}")
+    print(f"✅ Copied data to {PUBLIC_DIR} for Next.js")
+
+
+def build_public_vendors(vendor_year_totals: Dict[str, Dict[int, float]]) -> List[Dict[str, Any]]:
+    """Build the public vendor master (name, type, category, yearly_payments per vendor)"""
     vendor_master = load_vendor_master()
     
     # Load classified vendors from public directory to preserve classifications
-    PUBLIC_VENDORS_FILE = Path(__file__).parent.parent / "public" / "data" / "processed" / "vendors_master.json"
     public_vendors_by_id = {}
-    if PUBLIC_VENDORS_FILE.exists():
-        try:
-            with open(PUBLIC_VENDORS_FILE, 'r') as f:
-                public_vendors = json.load(f)
-                public_vendors_by_id = {v.get('vendor_id'): v for v in public_vendors if v.get('vendor_id')}
-        except Exception:
-            pass
+    try:
+        public_vendors = load_public_vendors() or []
+        public_vendors_by_id = {v.get('vendor_id'): v for v in public_vendors if v.get('vendor_id')}
+    except Exception:
+        pass
     
     vendors_master_list = []
     
-    for vendor_id, year_totals in data['vendor_year_totals'].items():
+    for vendor_id, year_totals in vendor_year_totals.items():
         vendor = vendor_master.get(vendor_id, {})
         
         # Use classification from public vendors if available, otherwise from vendor_master
@@ -562,60 +1034,196 @@ def save_processed_data(data: Dict[str, Any], lenses: Dict[str, List[Dict[str, A
             'yearly_payments': {str(k): v for k, v in year_totals.items()},
         })
     
-    vendors_path = PROCESSED_DIR / "vendors_master.json"
-    with open(vendors_path, 'w') as f:
-        json.dump(vendors_master_list, f, indent=2)
-    shutil.copy(vendors_path, PUBLIC_DIR / "vendors_master.json")
-    
-    # Save lens datasets
-    for lens_name, lens_data in lenses.items():
-        lens_obj = {
-            'lens': lens_name,
-            'vendors': lens_data,
-            'description': f"Vendors in the {lens_name} category",
-            'copy_angle': '',  # To be filled manually
-        }
-        
-        lens_path = PROCESSED_DIR / f"lens_{lens_name}.json"
-        with open(lens_path, 'w') as f:
-            json.dump(lens_obj, f, indent=2)
-        shutil.copy(lens_path, PUBLIC_DIR / f"lens_{lens_name}.json")
+    return vendors_master_list
+
+
+def sync_store(path: Path, payments: PaymentTable, name_to_id: Dict[str, str]):
+    """
+    Load this run into the SQLite store: vendors and aliases, payments (bulk
+    inserts), and the current classifications/overrides from the public master
+    """
+    from ledger_store import LedgerStore
     
-    print(f"✅ Saved processed data to {PROCESSED_DIR}")
-    print(f"✅ Copied data to {PUBLIC_DIR} for Next.js")
+    store = LedgerStore(path)
+    store.load_vendors(load_vendor_aliases().aliases, name_to_id)
+    rows = store.load_payments(payments, name_to_id, normalize_vendor_name)
+    pipeline_metrics.current().count('store_payment_rows', rows)
+    
+    public_vendors_file = PUBLIC_DIR / "vendors_master.json"
+    if public_vendors_file.exists():
+        store.sync_classifications(read_json(public_vendors_file))
+    
+    return store
+
+
+def save_outputs(aggregated: Dict[str, Any], report: pipeline_metrics.RunReport):
+    """Build the lens datasets and save every artifact (the lenses and save stages)"""
+    print("\n🔍 Building lens datasets...")
+    with report.stage('lenses'):
+        if 'vendors_master' not in aggregated:
+            aggregated['vendors_master'] = build_public_vendors(aggregated['vendor_year_totals'])
+        lenses = build_lens_data(aggregated['vendors_master'], aggregated['vendor_ministries'])
+        for lens_name in lenses.names:
+            members = len(lenses.members(lens_name))
+            report.count(f'lens_{lens_name}_vendors', members)
+            print(f"   {lens_name}: {members} vendors")
+    
+    print("\n💾 Saving processed data...")
+    with report.stage('save'):
+        save_processed_data(aggregated, lenses)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Process raw Public Accounts CSVs into JSON datasets")
+    parser.add_argument('--report', type=Path,
+                        help="Where to write the JSON run report (default: run_report.json in the "
+                             "processed directory)")
+    parser.add_argument('--profile', action='append', default=[], metavar='STAGE',
+                        choices=['ingest', 'normalize', 'aggregate', 'export', 'store', 'lenses', 'save', 'all'],
+                        help="Wrap a stage in cProfile/tracemalloc and dump the output (repeatable, or 'all')")
+    parser.add_argument('--profile-dir', type=Path, default=PROFILE_DIR,
+                        help="Where --profile output is written (default: data/profiles)")
+    parser.add_argument('--store', type=Path, nargs='?', const=DEFAULT_STORE, metavar='DB',
+                        help="Use the SQLite store as the system of record and export JSON from it "
+                             "(default path: data/processed/ledger.db)")
+    parser.add_argument('--memory-budget', type=float, metavar='MB',
+                        help="Aggregate out of core: spill rows to disk partitioned by vendor so "
+                             "about MB megabytes of rows are held at a time")
+    parser.add_argument('--spill-dir', type=Path,
+                        help="Where --memory-budget spill files go (default: system temp directory)")
+    parser.add_argument('--sample', type=float, metavar='FRACTION',
+                        help="Preview build over a deterministic FRACTION (0-1] of vendors; composition "
+                             "totals are scaled up and flagged as estimates, and every artifact goes "
+                             "under --preview-dir instead of data/processed and public/data/processed")
+    parser.add_argument('--preview-dir', type=Path, default=PREVIEW_DIR, metavar='DIR',
+                        help="Where --sample builds write processed/ and public/ (default: data/preview)")
+    parser.add_argument('--export-columnar', type=Path, nargs='?', const=COLUMNAR_DIR, metavar='DIR',
+                        help="Also export payments (partitioned by fiscal year), vendors, ministries and "
+                             "composition as Parquet, or CSV if pyarrow isn't installed "
+                             "(default: data/columnar, or columnar/ under --preview-dir with --sample)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and rebuild from the affected stage whenever a raw CSV, "
+                             "classify_vendors.py or fix_data_issues.py changes")
+    args = parser.parse_args(argv)
+    if args.memory_budget is not None and args.store:
+        parser.error("--memory-budget can't be combined with --store (the store loads every row)")
+    if args.watch and (args.memory_budget is not None or args.store):
+        parser.error("--watch keeps payments in memory and can't be combined with --memory-budget or --store")
+    if args.watch and args.export_columnar:
+        parser.error("--export-columnar is a one-off export and can't be combined with --watch")
+    if args.sample is not None:
+        if not 0 < args.sample <= 1:
+            parser.error("--sample must be a fraction in (0, 1]")
+        if args.store:
+            parser.error("--sample can't be combined with --store (the store holds every vendor)")
+    
+    if args.sample is not None:
+        # Previews never replace the published artifacts or the classifications they carry
+        use_preview_dir(args.preview_dir)
+        if args.export_columnar == COLUMNAR_DIR:
+            # The default export goes with the preview, not over the real one
+            args.export_columnar = args.preview_dir / "columnar"
+    if args.report is None:
+        args.report = PROCESSED_DIR / "run_report.json"
+    
+    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+    
+    if args.watch:
+        from pipeline_watch import watch
+        if args.sample is not None:
+            print(f"🎲 Sampled preview builds: writing to {args.preview_dir}; the published data is left as is")
+        watch(sys.modules[__name__], args.report, args.sample)
+        return
 
+    report = pipeline_metrics.start_run(set(args.profile), args.profile_dir)
 
-def main():
     print("🔄 Starting data processing pipeline...")
     print()
+    if args.sample is not None:
+        print(f"🎲 Sampled preview build: {args.sample:.1%} of vendors, composition totals are estimates")
+        print(f"   Writing to {args.preview_dir}; the published data is left as is")
+        print()
     
-    # Step 1: Ingest
-    payments = ingest_raw_data()
-    if not payments:
-        print("\n⚠️  No data to process. Exiting.")
-        return
+    spill = None
+    if args.memory_budget is not None:
+        from spill import SpillPartitions
+        input_bytes = sum(f.stat().st_size for f in payment_schedule_files())
+        spill = SpillPartitions.for_budget(input_bytes, args.memory_budget, normalize_vendor_name, args.spill_dir)
+        print(f"💽 Out-of-core run: {spill.count} vendor partitions in {spill.directory}")
+        print()
     
-    # Step 2: Normalize vendors
-    print("\n📝 Normalizing vendor names...")
-    name_to_id = normalize_vendors(payments)
-    print(f"✅ Normalized {len(name_to_id)} unique vendors")
+    try:
+        # Step 1: Ingest
+        with report.stage('ingest'):
+            payments = ingest_raw_data(spill, args.sample)
+            if spill is not None:
+                spill.flush()
+                report.count('spill_partitions', spill.count)
+                report.count('bytes_spilled', spill.bytes_spilled)
+        if not payments:
+            print("\n⚠️  No data to process. Exiting.")
+            return
+        
+        # Step 2: Normalize vendors
+        print("\n📝 Normalizing vendor names...")
+        with report.stage('normalize'):
+            name_to_id = normalize_vendors(payments)
+            report.count('vendors', len(name_to_id))
+        print(f"✅ Normalized {len(name_to_id)} unique vendors")
+        
+        # Step 3: Aggregate
+        print("\n📊 Aggregating payments...")
+        with report.stage('aggregate'):
+            aggregated = aggregate_payments(payments, name_to_id)
+            report.count('vendor_years', sum(len(y) for y in aggregated['vendor_year_totals'].values()))
+            if args.sample is not None:
+                scale_sample_estimates(aggregated, args.sample)
+        print(f"✅ Aggregated data across {len(aggregated['system_composition'])} years "
+              f"and {len(aggregated['ministry_top_vendors'])} ministries")
+        
+        # Optional: columnar export (needs the payment rows, so before spill files go)
+        if args.export_columnar:
+            from columnar_export import export_columnar
+            print(f"\n🧱 Exporting columnar tables to {args.export_columnar}...")
+            with report.stage('export'):
+                if 'vendors_master' not in aggregated:
+                    aggregated['vendors_master'] = build_public_vendors(aggregated['vendor_year_totals'])
+                export = export_columnar(args.export_columnar, payments, name_to_id, normalize_vendor_name,
+                                         aggregated, FIRST_YEAR)
+                report.count('columnar_files', export['files'])
+                report.wrote_bytes(export['bytes'])
+                report.add_section('columnar_export', export)
+            print(f"✅ Wrote {export['rows'].get('payments', 0):,} payment rows and "
+                  f"{export['rows'].get('vendors', 0):,} vendors as {export['format']} "
+                  f"({export['files']} files)")
+    finally:
+        if spill is not None:
+            spill.close()
     
-    # Step 3: Aggregate
-    print("\n📊 Aggregating payments...")
-    aggregated = aggregate_payments(payments, name_to_id)
-    print(f"✅ Aggregated data across {len(aggregated['system_composition'])} years")
+    store = None
+    if args.store:
+        print(f"\n🗄️  Loading SQLite store {args.store}...")
+        with report.stage('store'):
+            store = sync_store(args.store, payments, name_to_id)
+            aggregated['system_composition'] = store.system_composition()
+            aggregated['vendors_master'] = store.vendors_master()
+        print(f"✅ Store holds {store.vendor_count()} vendors")
     
-    # Step 4: Build lenses
-    print("\n🔍 Building lens datasets...")
-    lenses = build_lens_data(aggregated['vendor_year_totals'])
-    for lens_name, lens_data in lenses.items():
-        print(f"   {lens_name}: {len(lens_data)} vendors")
+    # Steps 4 and 5: Build lenses and save
+    save_outputs(aggregated, report)
+    if store:
+        store.close()
     
-    # Step 5: Save
-    print("\n💾 Saving processed data...")
-    save_processed_data(aggregated, lenses)
+    report.write(args.report)
     
     print("\n✅ Data processing complete!")
+    print(f"   Run report: {args.report}")
+    if args.profile:
+        print(f"   Profiles: {args.profile_dir}")
+    if args.sample is not None:
+        print(f"   Preview: {PROCESSED_DIR} (published copy in {PUBLIC_DIR})")
+        return
     print(f"\n📋 Next steps:")
     print(f"   1. Review and classify top vendors in {PROCESSED_DIR / 'vendors_master.json'}")
     print(f"   2. Update vendor_type and service_category fields")
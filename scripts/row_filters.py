@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Row filters for ingesting Public Accounts CSVs
+Resolves which of the known French/English column names a file actually
+has, and decides which rows are excluded (missing vendor, non-positive
+amount, aggregate rows, non-service categories) with one precompiled
+matcher per field. Every exclusion is counted per rule, with the dollars it
+removed per ministry, for the run report.
+"""
+
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+# Column names tried for each field, in order of preference (French and English)
+VENDOR_COLUMNS = ['Bénéficiaire', 'Beneficiaire', 'Recipient', 'Vendor', 'vendor_name', 'vendor', 'recipient']
+AMOUNT_COLUMNS = ['Montant $', 'Montant', 'Amount $', 'Amount', 'amount', 'amount_paid', 'total']
+MINISTRY_COLUMNS = ['Ministère', 'Nom du ministere', 'Ministry', 'ministry', 'department']
+CATEGORY_COLUMNS = ['Categorie', 'Category', 'category']
+
+# Vendor names that mean "no vendor" (whole value, case-insensitive)
+MISSING_VENDOR_NAMES = {'aucune valeur', 'none', 'n/a', ''}
+
+# Exclusion rules: substrings matched case-insensitively against one field.
+# Vendor rules are checked before category rules; within a field, the rule
+# whose pattern occurs first in the value is credited with the exclusion.
+EXCLUSION_RULES: List[Dict[str, Any]] = [
+    {'name': 'aggregate_row', 'field': 'vendor',
+     'patterns': ['accounts under', 'comptes inf', 'payments made for services']},
+    {'name': 'interest_payee', 'field': 'vendor', 'patterns': ['interest on']},
+    {'name': 'no_value', 'field': 'vendor', 'patterns': ['aucune valeur', 'no value']},
+    {'name': 'interest', 'field': 'category', 'patterns': ['interest', 'interet']},
+    {'name': 'salary', 'field': 'category', 'patterns': ['salary', 'traitements']},
+    {'name': 'travel', 'field': 'category', 'patterns': ['travel', 'deplacement']},
+]
+
+# Rejections that aren't pattern rules
+MISSING_VENDOR = 'missing_vendor'
+NON_POSITIVE_AMOUNT = 'non_positive_amount'
+
+
+def _compile(rules: List[Dict[str, Any]]) -> Optional['re.Pattern']:
+    """One alternation per field; the named group that matched is the rule"""
+    if not rules:
+        return None
+    return re.compile('|'.join(
+        f"(?P<{rule['name']}>{'|'.join(re.escape(p) for p in rule['patterns'])})"
+        for rule in rules
+    ))
+
+
+class ColumnMap:
+    """
+    Positions of the columns present in one file for each field. Vendor,
+    amount and ministry take the first non-empty candidate column; category
+    takes the first candidate column present, even if empty.
+    """
+
+    def __init__(self, fieldnames: Sequence[str]):
+        position = {}
+        for i, name in enumerate(fieldnames):
+            position.setdefault(name, i)
+        self.width = len(fieldnames)
+        self.vendor = [position[c] for c in VENDOR_COLUMNS if c in position]
+        self.amount = [position[c] for c in AMOUNT_COLUMNS if c in position]
+        self.ministry = [position[c] for c in MINISTRY_COLUMNS if c in position]
+        self.category = next((position[c] for c in CATEGORY_COLUMNS if c in position), None)
+
+
+def first_value(row: List[str], columns: List[int], default: str = '') -> str:
+    for column in columns:
+        value = row[column]
+        if value:
+            return value
+    return default
+
+
+class RowFilter:
+    """Decides whether an ingested row is excluded, and keeps the tally"""
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None):
+        rules = EXCLUSION_RULES if rules is None else rules
+        self.rules = rules
+        self._vendor = _compile([r for r in rules if r['field'] == 'vendor'])
+        self._category = _compile([r for r in rules if r['field'] == 'category'])
+        self.rows: Dict[str, int] = defaultdict(int)
+        self.dollars: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def exclusion(self, vendor_name: str, amount: float, category: str) -> Optional[str]:
+        """Name of the first rule that excludes the row, or None to keep it"""
+        vendor_lower = vendor_name.lower()
+        if vendor_lower in MISSING_VENDOR_NAMES:
+            return MISSING_VENDOR
+        if amount <= 0:
+            return NON_POSITIVE_AMOUNT
+        if self._vendor is not None:
+            match = self._vendor.search(vendor_lower)
+            if match:
+                return match.lastgroup
+        if category and self._category is not None:
+            match = self._category.search(category.lower())
+            if match:
+                return match.lastgroup
+        return None
+
+    def reject(self, rule: str, ministry: str, amount: float):
+        self.rows[rule] += 1
+        self.dollars[rule][ministry] += amount
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-rule row counts and dollars removed (total and per ministry)"""
+        patterns = {rule['name']: rule for rule in self.rules}
+        summary = {}
+        for name in sorted(self.rows):
+            by_ministry = self.dollars[name]
+            summary[name] = {
+                'field': patterns[name]['field'] if name in patterns else None,
+                'patterns': patterns[name]['patterns'] if name in patterns else None,
+                'rows': self.rows[name],
+                'dollars': round(sum(by_ministry.values()), 2),
+                'dollars_by_ministry': {
+                    ministry: round(amount, 2)
+                    for ministry, amount in sorted(by_ministry.items(), key=lambda item: -item[1])
+                },
+            }
+        return summary
@@ -3,90 +3,121 @@
 Show the privatization (Americanization) drift over time
 """
 
+import argparse
 import json
+import os
+import sys
 from pathlib import Path
+from typing import List, Optional
 
 PUBLIC_DIR = Path(__file__).parent.parent / "public" / "data" / "processed"
-COMPOSITION_FILE = PUBLIC_DIR / "system_composition.json"
-
-def main():
-    with open(COMPOSITION_FILE, 'r') as f:
-        composition = json.load(f)
-    
-    # Sort by year
-    composition.sort(key=lambda x: x['year'])
-    
+DEFAULT_STORE = Path(__file__).parent.parent / "data" / "processed" / "ledger.db"
+
+
+def load_drift(args):
+    """
+    Drift summary and top for-profit vendors, from the SQLite store, a running
+    ledger_server.py, or the JSON artifacts (in that order of preference)
+    """
+    from ledger_cube import CUBE_FILE, LedgerCube
+    from ledger_index import build_drift, scan_vendors
+    from topk import load_rankings, ranked
+
+    if args.store:
+        from ledger_store import LedgerStore
+        try:
+            store = LedgerStore(args.store, readonly=True)
+        except FileNotFoundError as e:
+            sys.exit(f"❌ {e}")
+        with store:
+            return build_drift(store.system_composition()), store.top_vendors(20, vendor_type='for_profit')
+
+    server = args.server or os.environ.get('LEDGER_SERVER')
+    if server:
+        from ledger_server import query_server
+        try:
+            return (query_server(server, '/drift'),
+                    query_server(server, '/top', {'n': 20, 'type': 'for_profit'}))
+        except (OSError, LookupError, ValueError) as e:
+            # Unreachable, an error response, or a body that isn't JSON
+            print(f"⚠️  Ledger server {server} unavailable ({e}), reading JSON directly\n")
+
+    # Prebuilt rankings avoid loading and sorting the full vendor master
+    rankings = load_rankings(PUBLIC_DIR)
+    top = ranked(rankings, 'by_type', 'for_profit', 20) if rankings else None
+    if top is None:
+        # No rankings: stream the vendor master, keeping only the top 20
+        top, _ = scan_vendors(PUBLIC_DIR / "vendors_master.json", 20, vendor_type='for_profit')
+
+    # Yearly totals by type are roll-up lookups in the cube, when it's been built
+    composition = []
+    cube_path = PUBLIC_DIR / CUBE_FILE
+    composition_path = PUBLIC_DIR / "system_composition.json"
+    if cube_path.exists():
+        with open(cube_path, 'r') as f:
+            composition = LedgerCube(json.load(f)).composition()
+    elif composition_path.exists():
+        with open(composition_path, 'r') as f:
+            composition = sorted(json.load(f), key=lambda x: x['year'])
+    return build_drift(composition), top
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Show the privatization drift over time")
+    parser.add_argument('--store', type=Path, nargs='?', const=DEFAULT_STORE, metavar='DB',
+                        help="Query the SQLite store instead of loading the JSON artifacts")
+    parser.add_argument('--server', metavar='URL',
+                        help="Query a running ledger_server.py (http://host:port or unix:/path; "
+                             "default: $LEDGER_SERVER)")
+    args = parser.parse_args(argv)
+
+    drift, forprofit_vendors = load_drift(args)
+
     print("📊 Privatization (Americanization) Drift Analysis\n")
     print(f"{'Year':<8} {'Public':<20} {'Non-Profit':<20} {'For-Profit':<20} {'Unknown':<20} {'For-Profit %':<15}")
     print("-" * 110)
-    
-    first_year = composition[0]
-    first_total = sum([first_year.get('public_total', 0), first_year.get('non_profit_total', 0), 
-                       first_year.get('for_profit_total', 0), first_year.get('unknown_total', 0)])
-    
-    for year_data in composition:
+
+    for year_data in drift['years']:
         year = year_data['year']
         public = year_data.get('public_total', 0)
         nonprofit = year_data.get('non_profit_total', 0)
         forprofit = year_data.get('for_profit_total', 0)
         unknown = year_data.get('unknown_total', 0)
-        
-        total = public + nonprofit + forprofit + unknown
-        
-        if total > 0:
-            forprofit_pct = (forprofit / total) * 100
-        else:
-            forprofit_pct = 0
-        
+        forprofit_pct = year_data['for_profit_pct']
+
         print(f"{year:<8} ${public/1e9:>8.2f}B{'':<8} ${nonprofit/1e9:>8.2f}B{'':<8} ${forprofit/1e9:>8.2f}B{'':<8} ${unknown/1e9:>8.2f}B{'':<8} {forprofit_pct:>6.2f}%")
-    
+
     # Calculate growth rates
     print("\n📈 Growth Rates (2014-2024):")
-    first = composition[0]
-    last = composition[-1]
-    
-    first_public = first.get('public_total', 0)
-    last_public = last.get('public_total', 0)
-    first_forprofit = first.get('for_profit_total', 0)
-    last_forprofit = last.get('for_profit_total', 0)
-    
+    public_growth = drift['growth'].get('public_total', {})
+    forprofit_growth = drift['growth'].get('for_profit_total', {})
+
+    first_public = public_growth.get('first', 0)
+    last_public = public_growth.get('last', 0)
+    first_forprofit = forprofit_growth.get('first', 0)
+    last_forprofit = forprofit_growth.get('last', 0)
+
     if first_public > 0:
-        public_growth = ((last_public - first_public) / first_public) * 100
-        print(f"   Public: {public_growth:+.1f}% (${first_public/1e9:.2f}B → ${last_public/1e9:.2f}B)")
+        print(f"   Public: {public_growth['pct']:+.1f}% (${first_public/1e9:.2f}B → ${last_public/1e9:.2f}B)")
     else:
         print(f"   Public: N/A (no data in first year)")
-    
+
     if first_forprofit > 0:
-        forprofit_growth = ((last_forprofit - first_forprofit) / first_forprofit) * 100
-        print(f"   For-Profit: {forprofit_growth:+.1f}% (${first_forprofit/1e9:.2f}B → ${last_forprofit/1e9:.2f}B)")
+        print(f"   For-Profit: {forprofit_growth['pct']:+.1f}% (${first_forprofit/1e9:.2f}B → ${last_forprofit/1e9:.2f}B)")
     elif last_forprofit > 0:
         print(f"   For-Profit: NEW (appeared, now ${last_forprofit/1e9:.2f}B)")
     else:
         print(f"   For-Profit: N/A")
-    
+
     # Show top for-profit vendors
     print("\n💰 Top For-Profit Vendors:")
-    vendors_file = PUBLIC_DIR / "vendors_master.json"
-    if vendors_file.exists():
-        with open(vendors_file, 'r') as f:
-            vendors = json.load(f)
-        
-        forprofit_vendors = [v for v in vendors if v.get('type') == 'for_profit']
-        
-        # Calculate totals
-        for v in forprofit_vendors:
-            yearly = v.get('yearly_payments', {})
-            v['_total'] = sum(float(amt) for amt in yearly.values() if amt)
-        
-        forprofit_vendors.sort(key=lambda x: x.get('_total', 0), reverse=True)
-        
-        print(f"{'Vendor':<50} {'Total':<20} {'Category':<20}")
-        print("-" * 90)
-        for v in forprofit_vendors[:20]:
-            name = v.get('name', 'Unknown')[:48]
-            total = v.get('_total', 0)
-            category = v.get('category', 'other')
-            print(f"{name:<50} ${total/1e6:>10.2f}M{'':<7} {category:<20}")
+    print(f"{'Vendor':<50} {'Total':<20} {'Category':<20}")
+    print("-" * 90)
+    for v in forprofit_vendors[:20]:
+        name = (v.get('name') or 'Unknown')[:48]
+        total = v.get('total', 0)
+        category = v.get('category') or 'other'
+        print(f"{name:<50} ${total/1e6:>10.2f}M{'':<7} {category:<20}")
 
 if __name__ == "__main__":
     main()
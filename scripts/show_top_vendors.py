@@ -3,49 +3,82 @@
 Show top vendors by total spend for classification
 """
 
-import json
+import argparse
+import os
+import sys
 from pathlib import Path
+from typing import List, Optional
 
 DATA_DIR = Path(__file__).parent.parent / "data" / "processed"
 VENDORS_FILE = DATA_DIR / "vendors_master.json"
 
-def main():
-    with open(VENDORS_FILE, 'r') as f:
-        vendors = json.load(f)
-    
-    # Calculate total paid from yearly_payments and sort
-    for vendor in vendors:
-        yearly = vendor.get('yearly_payments', {})
-        vendor['_total_calculated'] = sum(float(amt) for amt in yearly.values() if amt)
-    
-    vendors_sorted = sorted(vendors, key=lambda v: v.get('_total_calculated', 0), reverse=True)
-    
+
+def load_top_vendors(args, n: int):
+    """
+    Top vendors plus vendor/unclassified counts, from the SQLite store, a
+    running ledger_server.py, the prebuilt rankings.json, or vendors_master.json
+    (in that order of preference)
+    """
+    from ledger_index import scan_vendors, vendor_summary
+    from topk import load_rankings, ranked
+
+    if args.store:
+        from ledger_store import LedgerStore
+        try:
+            store = LedgerStore(args.store, readonly=True)
+        except FileNotFoundError as e:
+            sys.exit(f"❌ {e}")
+        with store:
+            top = [vendor_summary(v) for v in store.top_vendors(n)]
+            return top, store.vendor_count(), store.unclassified_count()
+
+    server = args.server or os.environ.get('LEDGER_SERVER')
+    if server:
+        from ledger_server import query_server
+        try:
+            stats = query_server(server, '/stats')
+            return query_server(server, '/top', {'n': n}), stats['vendors'], stats['unclassified']
+        except (OSError, LookupError, ValueError) as e:
+            # Unreachable, an error response, or a body that isn't JSON
+            print(f"⚠️  Ledger server {server} unavailable ({e}), reading JSON directly\n")
+
+    rankings = load_rankings(DATA_DIR)
+    top = ranked(rankings, 'overall', n=n) if rankings else None
+    if top is not None:
+        return top, rankings['vendor_count'], rankings['type_counts'].get('unknown', 0)
+
+    top, type_counts = scan_vendors(VENDORS_FILE, n)
+    return top, sum(type_counts.values()), type_counts.get('unknown', 0)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Show top vendors by total spend")
+    parser.add_argument('--store', type=Path, nargs='?', const=DATA_DIR / "ledger.db", metavar='DB',
+                        help="Query the SQLite store instead of loading vendors_master.json")
+    parser.add_argument('--server', metavar='URL',
+                        help="Query a running ledger_server.py (http://host:port or unix:/path; "
+                             "default: $LEDGER_SERVER)")
+    args = parser.parse_args(argv)
+
+    vendors_sorted, vendor_count, unclassified = load_top_vendors(args, 50)
+
     print("Top 50 vendors by total spend (need classification):\n")
     print(f"{'Rank':<6} {'Vendor Name':<50} {'Total Paid':<20} {'Years':<10} {'Growth':<10}")
     print("-" * 100)
-    
-    for i, vendor in enumerate(vendors_sorted[:50], 1):
-        total = vendor.get('_total_calculated', 0)
-        name = vendor.get('name', vendor.get('vendor_name_normalized', 'Unknown'))[:48]
-        yearly = vendor.get('yearly_payments', {})
-        years_list = [int(y) for y in yearly.keys() if yearly.get(y, 0) > 0]
-        years = f"{min(years_list)}-{max(years_list)}" if years_list else "?"
-        
-        # Calculate growth rate
-        if len(years_list) >= 2:
-            first_amt = yearly.get(str(min(years_list)), 0)
-            last_amt = yearly.get(str(max(years_list)), 0)
-            growth = ((last_amt - first_amt) / first_amt) if first_amt > 0 else 0
-            growth_str = f"{growth*100:+.1f}%"
-        else:
-            growth_str = "N/A"
-        
+
+    for i, vendor in enumerate(vendors_sorted, 1):
+        total = vendor['total']
+        name = (vendor['name'] or 'Unknown')[:48]
+        first_year, last_year = vendor['first_year'], vendor['last_year']
+        years = f"{first_year}-{last_year}" if first_year else "?"
+        growth = vendor['growth']
+        growth_str = f"{growth*100:+.1f}%" if growth is not None else "N/A"
         total_str = f"${total:,.0f}" if total else "$0"
-        
+
         print(f"{i:<6} {name:<50} {total_str:<20} {years:<10} {growth_str:<10}")
-    
-    print(f"\n\nTotal vendors: {len(vendors)}")
-    print(f"Unclassified vendors: {sum(1 for v in vendors if v.get('vendor_type') == 'unknown')}")
+
+    print(f"\n\nTotal vendors: {vendor_count}")
+    print(f"Unclassified vendors: {unclassified}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Out-of-core payment storage for The Ledger
+Ingested rows are partitioned by crc32 of the normalized vendor name and
+spilled to per-partition column files on disk, so every payment of a vendor
+lands in the same partition. Aggregation then loads one partition at a time,
+keeping memory bounded by the budget rather than by the number of rows.
+"""
+
+import math
+import shutil
+import tempfile
+import zlib
+from array import array
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from ledger_records import PaymentTable, StringTable
+
+# PaymentTable columns and their on-disk bytes per row
+COLUMNS = ['fiscal_years', 'name_ids', 'ministry_ids', 'amounts']
+ROW_BYTES = sum(array(code).itemsize for code in ('H', 'I', 'I', 'd'))
+
+# Buffered rows are flushed once they use this share of the budget
+BUFFER_SHARE = 0.25
+
+# CSV bytes per in-memory row byte; a partition's rows are estimated from
+# its share of the input size (CSV text is several times the packed row)
+CSV_BYTES_PER_ROW_BYTE = 3
+
+
+class SpillPartitions:
+    """
+    Collects payment rows like a PaymentTable (append), spilling them to
+    disk by vendor partition. Vendor names and ministries stay in memory as
+    shared string tables; partitions() yields each partition as a PaymentTable.
+    """
+
+    def __init__(self, partitions: int, normalize: Callable[[str], str], buffer_rows: int,
+                 spill_dir: Optional[Path] = None):
+        self.count = partitions
+        self.normalize = normalize
+        self.buffer_rows = max(1, buffer_rows)
+        self.directory = Path(tempfile.mkdtemp(prefix='ledger-spill-', dir=spill_dir))
+        self.vendor_names = StringTable()
+        self.ministries = StringTable()
+        self.rows = 0
+        self.bytes_spilled = 0
+        self._partition_of: List[int] = []  # vendor name id -> partition
+        self._buffers = [self._new_buffer() for _ in range(partitions)]
+        self._buffered = 0
+
+    @classmethod
+    def for_budget(cls, input_bytes: int, budget_mb: float, normalize: Callable[[str], str],
+                   spill_dir: Optional[Path] = None) -> 'SpillPartitions':
+        """Enough partitions that each one's rows fit in the memory budget"""
+        budget = budget_mb * 1024 * 1024
+        partitions = max(1, math.ceil(input_bytes / CSV_BYTES_PER_ROW_BYTE / budget))
+        return cls(partitions, normalize, int(budget * BUFFER_SHARE / ROW_BYTES), spill_dir)
+
+    def _new_buffer(self) -> PaymentTable:
+        return PaymentTable(self.vendor_names, self.ministries)
+
+    def _path(self, partition: int, column: str) -> Path:
+        return self.directory / f"part{partition:04d}.{column}"
+
+    def append(self, fiscal_year: int, vendor_name_raw: str, amount_paid: float, ministry: str):
+        name_id = self.vendor_names.id_of(vendor_name_raw)
+        if name_id == len(self._partition_of):
+            key = self.normalize(vendor_name_raw).encode('utf-8')
+            self._partition_of.append(zlib.crc32(key) % self.count)
+
+        buffer = self._buffers[self._partition_of[name_id]]
+        buffer.fiscal_years.append(fiscal_year)
+        buffer.name_ids.append(name_id)
+        buffer.ministry_ids.append(self.ministries.id_of(ministry))
+        buffer.amounts.append(amount_paid)
+        self.rows += 1
+
+        self._buffered += 1
+        if self._buffered >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        """Append buffered rows to their partition files"""
+        for partition, buffer in enumerate(self._buffers):
+            if not len(buffer):
+                continue
+            for column in COLUMNS:
+                with open(self._path(partition, column), 'ab') as f:
+                    getattr(buffer, column).tofile(f)
+            self.bytes_spilled += len(buffer) * ROW_BYTES
+            self._buffers[partition] = self._new_buffer()
+        self._buffered = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def partitions(self) -> Iterator[PaymentTable]:
+        """Load each partition in turn (rows keep their input order)"""
+        self.flush()
+        for partition in range(self.count):
+            table = self._new_buffer()
+            for column in COLUMNS:
+                path = self._path(partition, column)
+                if not path.exists():
+                    break
+                values = getattr(table, column)
+                with open(path, 'rb') as f:
+                    values.fromfile(f, path.stat().st_size // values.itemsize)
+            if len(table):
+                yield table
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self) -> 'SpillPartitions':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
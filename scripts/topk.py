@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Top-K selection for The Ledger
+Heap-based top-K over an iterable, and per-group top-K kept incrementally
+(bounded min-heaps) so the pipeline can publish prebuilt rankings and
+reporting scripts can read K rows instead of sorting every vendor.
+"""
+
+import heapq
+import json
+from itertools import count
+from pathlib import Path
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, TypeVar
+
+T = TypeVar('T')
+
+RANKINGS_FILE = "rankings.json"
+# Vendors kept per group (overall, type, category, year) in rankings.json
+RANKING_K = 100
+
+
+def top_k(items: Iterable[T], k: int, key: Callable[[T], float]) -> List[T]:
+    """The k largest items by key, largest first (O(n log k))"""
+    return heapq.nlargest(k, items, key=key)
+
+
+class GroupedTopK:
+    """
+    Keeps the k highest-scoring items for each group as items are pushed.
+    Each group holds a min-heap of at most k entries, so a push costs
+    O(log k) and memory is O(groups * k).
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heaps: Dict[Hashable, List[tuple]] = {}
+        # Tie-breaker so heap entries never compare the items themselves
+        self._seq = count()
+
+    def push(self, group: Hashable, score: float, item: Any):
+        heap = self._heaps.setdefault(group, [])
+        entry = (score, -next(self._seq), item)
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def groups(self) -> List[Hashable]:
+        return list(self._heaps)
+
+    def top(self, group: Hashable) -> List[Any]:
+        """Items for one group, highest score first (earlier pushes win ties)"""
+        return [item for _, _, item in sorted(self._heaps.get(group, []), reverse=True)]
+
+    def results(self) -> Dict[Hashable, List[Any]]:
+        return {group: self.top(group) for group in self._heaps}
+
+
+class VendorRankings:
+    """
+    The rankings.json artifact: the top k vendors overall, by type, by
+    category and by year, plus the vendor count per type. process_data.py
+    adds vendors as their totals are finalized; classify_vendors.py and
+    fix_data_issues.py rebuild it from the vendor master after changing types.
+    """
+
+    def __init__(self, k: int = RANKING_K, first_year: int = 0):
+        self.top = GroupedTopK(k)
+        self.first_year = first_year
+        self.type_counts: Dict[str, int] = defaultdict(int)
+
+    def add(self, entry: Dict[str, Any], yearly: Mapping[Any, float]):
+        """One vendor's summary entry (with 'type', 'category' and 'total') and its yearly totals"""
+        self.type_counts[entry['type']] += 1
+        self.top.push(('overall', None), entry['total'], entry)
+        self.top.push(('by_type', entry['type']), entry['total'], entry)
+        if entry['category']:
+            self.top.push(('by_category', entry['category']), entry['total'], entry)
+        for year, amount in yearly.items():
+            if int(year) >= self.first_year:
+                self.top.push(('by_year', int(year)), amount, (entry, amount))
+
+    def export(self) -> Dict[str, Any]:
+        rankings = self.top
+        exported: Dict[str, Any] = {
+            'k': rankings.k,
+            'vendor_count': sum(self.type_counts.values()),
+            'type_counts': dict(self.type_counts),
+            'overall': rankings.top(('overall', None)),
+            'by_type': {},
+            'by_category': {},
+            'by_year': {},
+        }
+        for view, group in sorted(rankings.groups(), key=lambda g: (g[0], str(g[1]))):
+            if view == 'by_year':
+                exported[view][str(group)] = [dict(entry, year_total=amount) for entry, amount in rankings.top((view, group))]
+            elif view != 'overall':
+                exported[view][group] = rankings.top((view, group))
+        return exported
+
+
+def write_rankings(data_dir: Path, rankings: Dict[str, Any]):
+    """Replace the rankings.json in data_dir (in the layout process_data.py writes)"""
+    with open(Path(data_dir) / RANKINGS_FILE, 'w') as f:
+        json.dump(rankings, f, indent=2)
+
+
+def load_rankings(data_dir: Path) -> Optional[Dict[str, Any]]:
+    """Prebuilt rankings written by process_data.py, or None if absent"""
+    path = Path(data_dir) / RANKINGS_FILE
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def ranked(rankings: Dict[str, Any], view: str, group: Optional[str] = None,
+           n: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Read the top n entries of a prebuilt ranking, e.g. ranked(r, 'overall') or
+    ranked(r, 'by_type', 'for_profit', 20). Returns None when the view doesn't
+    exist or n is deeper than the prebuilt rankings go.
+    """
+    entries = rankings.get(view)
+    if entries is None:
+        return None
+    if group is not None:
+        entries = entries.get(str(group), [])
+    if n is not None and n > rankings.get('k', 0):
+        return None
+    return entries[:n]
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Vendor ID and alias registries for The Ledger
+Maps normalized vendor names to vendor IDs. Names already in the registry
+keep their ID; new names get an ID derived from a hash of the name, so the
+same name gets the same ID whatever order files are ingested in, whether
+the run is full or partial, and whichever worker sees it first.
+The raw-name spellings seen for each vendor are kept in a separate alias
+registry rather than in the vendor master.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+REGISTRY_FILE = "vendor_id_registry.json"
+ALIASES_FILE = "vendor_aliases.json"
+
+# 64-bit hash: collisions stay negligible well past millions of vendors
+ID_DIGEST_BYTES = 8
+
+
+def hashed_vendor_id(normalized: str, attempt: int = 0) -> str:
+    """ID candidate for a name; attempt > 0 re-probes after a collision"""
+    key = normalized if attempt == 0 else f"{normalized}\x00{attempt}"
+    return 'V' + hashlib.blake2b(key.encode('utf-8'), digest_size=ID_DIGEST_BYTES).hexdigest()
+
+
+class VendorIdRegistry:
+    """Persisted {normalized name: vendor_id} with deterministic allocation"""
+
+    def __init__(self, ids: Optional[Dict[str, str]] = None):
+        self.ids: Dict[str, str] = dict(ids or {})
+        self._taken = set(self.ids.values())
+        self.added = 0
+
+    @classmethod
+    def load(cls, path: Path) -> 'VendorIdRegistry':
+        if path.exists():
+            with open(path, 'r') as f:
+                return cls(json.load(f))
+        return cls()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def seed(self, vendors: Iterable[Dict[str, Any]]):
+        """Adopt the IDs of an existing vendor master (data or public format)"""
+        for vendor in vendors:
+            vendor_id = vendor.get('vendor_id')
+            name = vendor.get('vendor_name_normalized') or vendor.get('name')
+            if vendor_id and name and name not in self.ids and vendor_id not in self._taken:
+                self._register(name, vendor_id)
+
+    def _register(self, name: str, vendor_id: str):
+        self.ids[name] = vendor_id
+        self._taken.add(vendor_id)
+
+    def assign(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        IDs for the given names (in the order given), registering new ones.
+        New names are allocated in sorted order, so if two new names collide
+        the outcome doesn't depend on input order.
+        """
+        names = list(names)
+        for name in sorted(set(names) - self.ids.keys()):
+            attempt = 0
+            vendor_id = hashed_vendor_id(name)
+            while vendor_id in self._taken:
+                attempt += 1
+                vendor_id = hashed_vendor_id(name, attempt)
+            self._register(name, vendor_id)
+            self.added += 1
+        return {name: self.ids[name] for name in names}
+
+    def save(self, path: Path):
+        """
+        Write the registry, merged with what's on disk so concurrent runs only
+        ever add names, via an atomic rename. The read-merge-write holds an
+        exclusive lock on a sibling .lock file. If the disk maps one of this
+        run's names (or IDs) differently, this run's artifacts already carry
+        an ID the registry disagrees with, so that raises RuntimeError and
+        nothing is written.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(f".{path.name}.lock"), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            disk: Dict[str, str] = {}
+            if path.exists():
+                with open(path, 'r') as f:
+                    disk = json.load(f)
+
+            owners = {vendor_id: name for name, vendor_id in self.ids.items()}
+            conflicts = [
+                (name, vendor_id) for name, vendor_id in disk.items()
+                if self.ids.get(name, vendor_id) != vendor_id
+                or owners.get(vendor_id, name) != name
+            ]
+            if conflicts:
+                shown = ', '.join(f"{name!r} -> {vendor_id}" for name, vendor_id in conflicts[:5])
+                raise RuntimeError(
+                    f"{path} changed during this run and disagrees with {len(conflicts)} of its "
+                    f"vendor IDs (on disk: {shown}); rerun to pick up the registry"
+                )
+
+            merged = dict(disk)
+            merged.update(self.ids)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(dict(sorted(merged.items())), f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+
+class AliasRegistry:
+    """
+    Raw vendor-name spellings per vendor_id ({vendor_id: [alias, ...]}).
+    Each raw name belongs to one vendor, so adding a name already seen is a
+    single dict lookup and only new aliases change anything.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, List[str]]] = None):
+        self.aliases: Dict[str, List[str]] = {vid: list(names) for vid, names in (aliases or {}).items()}
+        self._owner: Dict[str, str] = {
+            alias: vid for vid, names in self.aliases.items() for alias in names
+        }
+        self.added = 0
+
+    @classmethod
+    def load(cls, path: Path) -> 'AliasRegistry':
+        if path.exists():
+            with open(path, 'r') as f:
+                return cls(json.load(f))
+        return cls()
+
+    def __len__(self) -> int:
+        return len(self._owner)
+
+    def seed(self, vendors: Iterable[Dict[str, Any]]):
+        """Adopt the vendor_name_aliases lists of a legacy vendor master"""
+        for vendor in vendors:
+            for alias in vendor.get('vendor_name_aliases', []):
+                self.add(alias, vendor['vendor_id'])
+
+    def add(self, alias: str, vendor_id: str):
+        owner = self._owner.get(alias)
+        if owner == vendor_id:
+            return
+        if owner is not None:
+            # Normalization changed and the spelling now belongs elsewhere
+            self.aliases[owner].remove(alias)
+        self._owner[alias] = vendor_id
+        self.aliases.setdefault(vendor_id, []).append(alias)
+        self.added += 1
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {vid: sorted(names) for vid, names in sorted(self.aliases.items()) if names}
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Derived per-vendor metrics for The Ledger
+Totals, first/last year, CAGR, year-over-year changes and ranks are computed
+once by the pipeline and written into vendors_master.json, so scripts and the
+frontend read them instead of re-summing yearly_payments.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from topk import VendorRankings
+
+# Only 2018 and later is published (when Doug Ford took office)
+FIRST_YEAR = 2018
+
+
+def derive_metrics(yearly: Mapping[Any, float]) -> Dict[str, Any]:
+    """
+    Metrics for one vendor's yearly totals (keys may be int or str years).
+    Years with no positive payment are ignored for first/last year and growth.
+    """
+    by_year = sorted((int(y), float(amt)) for y, amt in yearly.items() if amt)
+    total = sum(float(amt) for amt in yearly.values() if amt)
+    total_recent = sum(amt for y, amt in by_year if y >= FIRST_YEAR)
+
+    paid = [(y, amt) for y, amt in by_year if amt > 0]
+    first_year = paid[0][0] if paid else None
+    last_year = paid[-1][0] if paid else None
+
+    growth_rate = None
+    cagr = None
+    if len(paid) >= 2:
+        first_amt, last_amt = paid[0][1], paid[-1][1]
+        growth_rate = (last_amt - first_amt) / first_amt
+        span = last_year - first_year
+        if span > 0:
+            cagr = (last_amt / first_amt) ** (1 / span) - 1
+
+    # Change from the previous reported year
+    yoy_change = {
+        str(year): amt - prev_amt
+        for (_, prev_amt), (year, amt) in zip(by_year, by_year[1:])
+    }
+
+    return {
+        'total_paid': total,
+        'total_since_2018': total_recent,
+        'first_year': first_year,
+        'last_year': last_year,
+        'growth_rate': growth_rate,
+        'cagr': cagr,
+        'yoy_change': yoy_change,
+    }
+
+
+def assign_ranks(vendors: List[Dict[str, Any]]):
+    """
+    Set rank_in_type and rank_in_category (1 = largest total) on public
+    vendor records. Run again whenever classifications change.
+    """
+    by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    by_category: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+    for vendor in vendors:
+        by_type[vendor.get('type', vendor.get('vendor_type', 'unknown'))].append(vendor)
+        category = vendor.get('category', vendor.get('service_category'))
+        if category:
+            by_category[category].append(vendor)
+        else:
+            vendor['rank_in_category'] = None
+
+    for field, groups in (('rank_in_type', by_type), ('rank_in_category', by_category)):
+        for group in groups.values():
+            group.sort(key=vendor_total, reverse=True)
+            for rank, vendor in enumerate(group, 1):
+                vendor[field] = rank
+
+
+def build_rankings(vendors: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The rankings.json artifact for public vendor records, as process_data.py
+    builds it. Like assign_ranks, run again whenever classifications change.
+    """
+    rankings = VendorRankings(first_year=FIRST_YEAR)
+    for vendor in vendors:
+        yearly = vendor.get('yearly_payments', {})
+        metrics = vendor if 'total_paid' in vendor else derive_metrics(yearly)
+        rankings.add({
+            'vendor_id': vendor.get('vendor_id'),
+            'name': vendor.get('name', vendor.get('vendor_name_normalized', '')),
+            'type': vendor.get('type', vendor.get('vendor_type', 'unknown')),
+            'category': vendor.get('category', vendor.get('service_category')),
+            'total': metrics['total_paid'],
+            'first_year': metrics['first_year'],
+            'last_year': metrics['last_year'],
+            'growth': metrics['growth_rate'],
+        }, yearly)
+    return rankings.export()
+
+
+def add_derived_metrics(vendors: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Attach derived metrics and ranks to public vendor records (in place)"""
+    vendors = list(vendors)
+    for vendor in vendors:
+        vendor.update(derive_metrics(vendor.get('yearly_payments', {})))
+    assign_ranks(vendors)
+    return vendors
+
+
+def vendor_total(vendor: Dict[str, Any]) -> float:
+    """Total paid across all years, using the precomputed field when present"""
+    total = vendor.get('total_paid')
+    if total is None:
+        total = sum(float(amt) for amt in vendor.get('yearly_payments', {}).values() if amt)
+    return total
+
+
+def vendor_growth(vendor: Dict[str, Any]) -> Optional[float]:
+    """First-to-last year growth, using the precomputed field when present"""
+    if 'growth_rate' in vendor:
+        return vendor['growth_rate']
+    return derive_metrics(vendor.get('yearly_payments', {}))['growth_rate']
@@ -49,6 +49,19 @@ export interface LensData {
   copy_angle: string
 }
 
+// type x category x ministry x year totals with every roll-up (ledger_cube.json).
+// Each dimension's ALL member is at index members[dimension].length.
+export type CubeDimension = 'type' | 'category' | 'ministry' | 'year'
+
+export interface LedgerCube {
+  dimensions: CubeDimension[]
+  members: Record<CubeDimension, (string | number | null)[]>
+  shape: number[]
+  values: number[]
+  estimated?: boolean
+  sample_fraction?: number
+}
+
 // UI state types
 
 export interface LedgerState {
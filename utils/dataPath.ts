@@ -36,3 +36,28 @@ export function getDataFile(filename: string): string {
 export function getPublicDataFile(filename: string): string {
   return getDataPath(`data/${filename}`)
 }
+
+// Logical name -> content-hashed file, from manifest.json (fetched once per page load)
+let manifestFiles: Promise<Record<string, string>> | null = null
+
+function loadManifest(): Promise<Record<string, string>> {
+  if (!manifestFiles) {
+    manifestFiles = fetch(getDataFile('manifest.json'), { cache: 'no-cache' })
+      .then(r => (r.ok ? r.json() : {}))
+      .then(manifest => manifest.files || {})
+      .catch(() => ({}))
+  }
+  return manifestFiles
+}
+
+// URL of a processed data file, preferring its immutable hashed copy.
+// Falls back to the fixed name when there is no manifest or no entry.
+export async function resolveDataFile(filename: string): Promise<string> {
+  const files = await loadManifest()
+  return getDataFile(files[filename] || filename)
+}
+
+// fetch() a processed data file by its logical name
+export async function fetchDataFile(filename: string, init?: RequestInit): Promise<Response> {
+  return fetch(await resolveDataFile(filename), init)
+}
@@ -0,0 +1,35 @@
+import type { CubeDimension, LedgerCube } from '../types'
+
+// Members to select; dimensions left out are rolled up
+export type CubeSlice = Partial<Record<CubeDimension, string | number | null>>
+
+// Total for a slice of the cube: a single index, no scan over vendors
+export function cubeValue(cube: LedgerCube, slice: CubeSlice): number {
+  let index = 0
+  let stride = 1
+  for (let d = cube.dimensions.length - 1; d >= 0; d--) {
+    const dimension = cube.dimensions[d]
+    const members = cube.members[dimension]
+    let position = members.length // ALL
+    if (dimension in slice) {
+      position = members.indexOf(slice[dimension] as string | number | null)
+      if (position < 0) return 0
+    }
+    index += position * stride
+    stride *= cube.shape[d]
+  }
+  return cube.values[index]
+}
+
+// Totals for each member of one dimension (e.g. by year for for-profit staffing)
+export function cubeSeries(
+  cube: LedgerCube,
+  dimension: CubeDimension,
+  slice: CubeSlice = {},
+): Map<string | number | null, number> {
+  const series = new Map<string | number | null, number>()
+  for (const member of cube.members[dimension]) {
+    series.set(member, cubeValue(cube, { ...slice, [dimension]: member }))
+  }
+  return series
+}